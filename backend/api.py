@@ -2,16 +2,29 @@
 FastAPI application exposing FIX engine functionality.
 """
 
+import asyncio
+import contextvars
+import gc
+import json
+import xml.etree.ElementTree as ET
 import time
 import logging
-from typing import Dict, Any, List, Optional
-from fastapi import FastAPI, HTTPException, Request
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.datastructures import MutableHeaders
+from starlette.requests import ClientDisconnect
 
-from .fix_engine import build_fix, parse_fix, validate_fix, explain_exec_report, lookup_tag, normalize_delims
-from .settings import APP_NAME, DEFAULT_FIX_VERSION, LOG_LEVEL, FixVersion, Delimiter
+from . import metrics
+from .executor import EngineExecutor, Overloaded
+from .fixml import FixmlError, FixmlReader, fix_to_fixml
+from .profiling import RequestProfile, SampledProfiler, run_profiled
+from .fix_engine import SpecsRegistry, SpecsWatcher, _value_str, begin_string_for, build_fix, parse_fix, parse_message, validate_fix, explain_exec_report, normalize_delims
+from .settings import (APP_NAME, DEFAULT_FIX_VERSION, LOG_LEVEL, PROFILE_DIR, PROFILE_FLUSH_EVERY, PROFILE_KEEP,
+                       PROFILE_REQUESTS, PROFILE_SAMPLE_RATE, SPECS_WATCH_INTERVAL, WS_MAX_INFLIGHT, FixVersion, Delimiter)
 
 # Configure logging
 logging.basicConfig(level=getattr(logging, LOG_LEVEL))
@@ -59,16 +72,62 @@ class LookupResponse(BaseModel):
     requiredFor: List[str] = Field(description="Message types that require this field")
     description: str = Field(description="Field description")
 
+class SearchResponse(BaseModel):
+    query: str = Field(description="The search query")
+    results: List[Dict[str, Any]] = Field(description="Matching fields, enum values, components and messages, best first")
+
+class BatchRequest(BaseModel):
+    fix_version: FixVersion = Field(default=DEFAULT_FIX_VERSION, description="FIX protocol version")
+    messages: List[str] = Field(description="Raw FIX messages to process")
+    delimiter: Delimiter = Field(default="|", description="Delimiter for FIX fields")
+
+class BatchItem(BaseModel):
+    index: int = Field(description="Position of the message in the request")
+    id: Optional[Any] = Field(default=None, description="Client-supplied id (streaming only)")
+    result: Optional[Dict[str, Any]] = Field(default=None, description="Same shape as the single-message response")
+    error: Optional[Dict[str, Any]] = Field(default=None, description="Error details if this item failed")
+
+class BatchResponse(BaseModel):
+    results: List[BatchItem] = Field(description="Per-message results in request order")
+
 class ErrorResponse(BaseModel):
     error: Dict[str, Any] = Field(description="Error details")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the spec watcher for the worker's lifetime; flush sampled profiles on shutdown."""
+    if SPECS_WATCH_INTERVAL > 0:
+        _WATCHER.start()
+    try:
+        yield
+    finally:
+        _WATCHER.stop()
+        if _SAMPLER is not None:
+            _SAMPLER.flush()
+
 # Create FastAPI app
 app = FastAPI(
     title=APP_NAME,
     description="FIX protocol API for building, parsing, validating, and explaining FIX messages",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Warm the spec registry at import so it is loaded (from the snapshot) before
+# workers fork (e.g. gunicorn --preload); freezing moves it out of GC tracking
+# so collections in the workers don't dirty the shared copy-on-write pages.
+SpecsRegistry()
+gc.freeze()
+metrics.install()
+
+# CPU-bound engine calls run here, off the event loop, with bounded in-flight work
+ENGINE = EngineExecutor()
+
+# Every engine response reports the spec snapshot it was computed with
+SPEC_VERSION_HEADER = "X-Spec-Version"
+metrics.register(metrics.GaugeFunc("fix_engine_inflight", "Engine calls running or queued.", (),
+                                   lambda: [((), ENGINE.inflight)]))
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -76,8 +135,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[SPEC_VERSION_HEADER],
 )
 
+# Spec hot reload: watch the spec sources (FIX_SPECS_WATCH_INTERVAL) in each worker
+# (started and stopped by lifespan)
+_WATCHER = SpecsWatcher(SPECS_WATCH_INTERVAL, on_reload=lambda versions: ENGINE.recycle())
+
+# Load shedding: engine queue full
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Reject with 503 and Retry-After when the engine queue is full."""
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "error": {
+                "code": "OVERLOADED",
+                "message": str(exc),
+                "details": {}
+            }
+        }
+    )
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -97,37 +177,132 @@ async def global_exception_handler(request: Request, exc: Exception):
 # Request/response logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log request/response details."""
-    start_time = time.time()
+    """Log request/response details and record request latency."""
+    start_time = time.perf_counter()
     
     response = await call_next(request)
     
-    duration_ms = int((time.time() - start_time) * 1000)
-    logger.info(f"{request.method} {request.url.path} {response.status_code} {duration_ms}ms")
+    duration = time.perf_counter() - start_time
+    route = request.scope.get("route")
+    metrics.observe_request(request.method, route.path if route else "unmatched", response.status_code, duration)
+    logger.info(f"{request.method} {request.url.path} {response.status_code} {duration * 1000:.3f}ms")
     
     return response
 
+# Request profiling (opt-in): the middleware is only installed when enabled, and only
+# engine calls made through _run_engine while a profile is active are profiled
+PROFILE_HEADER = "X-Fix-Profile"
+_PROFILE: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("fix_request_profile", default=None)
+_SAMPLER = SampledProfiler(PROFILE_SAMPLE_RATE, PROFILE_DIR, PROFILE_FLUSH_EVERY, PROFILE_KEEP) if PROFILE_SAMPLE_RATE > 0 else None
+_PROFILING = PROFILE_REQUESTS or _SAMPLER is not None
+
+def _profile_requested(request: Request) -> bool:
+    flag = request.headers.get(PROFILE_HEADER) or request.query_params.get("profile")
+    return PROFILE_REQUESTS and flag is not None and flag.lower() in ("1", "true", "yes")
+
+async def _with_profile(response: Response, profile: RequestProfile) -> Response:
+    """Add Server-Timing and, for JSON object bodies, a "profile" key with the breakdown."""
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = MutableHeaders(raw=[(k, v) for k, v in response.headers.raw if k != b"content-length"])
+    headers["Server-Timing"] = profile.server_timing()
+    if headers.get("content-type", "").startswith("application/json"):
+        payload = json.loads(body) if body else None
+        if isinstance(payload, dict):
+            payload["profile"] = profile.to_dict()
+            body = json.dumps(payload).encode()
+    return Response(content=body, status_code=response.status_code, headers=dict(headers))
+
+async def profile_requests(request: Request, call_next):
+    """Profile requests flagged with ?profile=1 / X-Fix-Profile: 1, plus a sampled fraction of traffic."""
+    report = _profile_requested(request)
+    sampled = _SAMPLER is not None and _SAMPLER.sample()
+    if not (report or sampled):
+        return await call_next(request)
+    profile = RequestProfile(report=report, sampled=sampled)
+    token = _PROFILE.set(profile)
+    try:
+        response = await call_next(request)
+    finally:
+        _PROFILE.reset(token)
+    if sampled:
+        response.body_iterator = _record_sample(response.body_iterator, profile)
+    if report:
+        return await _with_profile(response, profile)
+    return response
+
+async def _record_sample(body, profile: RequestProfile):
+    """Pass the response body through, then record the sample: a streamed body does its engine work as it is sent."""
+    async for chunk in body:
+        yield chunk
+    if profile.calls:
+        await asyncio.get_running_loop().run_in_executor(None, _SAMPLER.record, profile)
+
+if _PROFILING:
+    app.middleware("http")(profile_requests)
+
 # Health check endpoint
 @app.get("/healthz")
 async def health():
     """Health check endpoint."""
     return {"ok": True}
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Expose request, engine stage and validation metrics in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# Spec hot reload
+@app.post("/specs/reload")
+async def reload_specs(fix_version: FixVersion = DEFAULT_FIX_VERSION, force: bool = False):
+    """Rebuild a version's specs from disk and swap them in; requests in flight finish on the old ones."""
+    previous = None
+    try:
+        registry = SpecsRegistry(fix_version)
+        previous = registry.spec_version
+        loaded = await asyncio.get_running_loop().run_in_executor(None, registry.reload, force)
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": {"code": "VALIDATION_ERROR", "message": str(e), "details": {}}}
+        )
+    except Exception as e:
+        logger.error(f"Error reloading FIX {fix_version} specs: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": {
+                    "code": "INTERNAL_ERROR",
+                    "message": f"Failed to reload specs (still serving {previous}): {str(e)}",
+                    "details": {}
+                }
+            }
+        )
+    changed = loaded.spec_version != previous
+    if changed:
+        ENGINE.recycle()
+    return JSONResponse(
+        headers={SPEC_VERSION_HEADER: loaded.spec_version},
+        content={
+            "fixVersion": fix_version,
+            "specVersion": loaded.spec_version,
+            "previousVersion": previous,
+            "changed": changed,
+            "loadSeconds": round(loaded.load_seconds, 6),
+        }
+    )
+
 # FIX build endpoint
 @app.post("/fix/build", response_model=BuildResponse)
-async def build_fix_message(request: BuildRequest):
+async def build_fix_message(request: BuildRequest, response: Response):
     """Build a FIX message from tag-value pairs."""
     try:
-        # Convert | to SOH for internal processing
-        fields_soh = {k: normalize_delims(v, to_soh=True) if isinstance(v, str) else v 
-                      for k, v in request.fields.items()}
-        
-        # Build FIX message
-        result = build_fix("D", fields_soh, f"FIX.{request.fix_version}")
-        
-        # Convert SOH back to | for response
-        return BuildResponse(raw_fix=normalize_delims(result["raw"], to_soh=False))
+        raw_fix, spec_version = await _run_engine(request.fix_version, _build_one, request.fields, request.fix_version)
+        _set_spec_version(response, spec_version)
+        return BuildResponse(raw_fix=raw_fix)
     
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error building FIX message: {e}")
         raise HTTPException(
@@ -141,115 +316,471 @@ async def build_fix_message(request: BuildRequest):
             }
         )
 
+# Engine work for each endpoint; these run on the ENGINE pool
+async def _engine_call(fn, *args, wait: bool = False) -> Any:
+    """ENGINE.run(fn, ...) for the current request; profiled when the profiling middleware selected it."""
+    profile = _PROFILE.get() if _PROFILING else None
+    if profile is None:
+        return await ENGINE.run(fn, *args, wait=wait)
+    result, stats, seconds = await ENGINE.run(run_profiled, fn, *args, wait=wait)
+    profile.add(stats, seconds)
+    return result
+
+async def _run_engine(fix_version: Optional[str], fn, *args) -> Tuple[Any, Optional[str]]:
+    """fn(*args) on the engine pool with the specs for fix_version pinned; returns (result, spec version)."""
+    return await _engine_call(_pinned, fix_version, fn, *args)
+
+def _pinned(fix_version: Optional[str], fn, *args) -> Tuple[Any, Optional[str]]:
+    """Run fn(*args) with this worker's specs for fix_version pinned; returns (result, spec version)."""
+    try:
+        registry = SpecsRegistry(fix_version)
+    except FileNotFoundError:
+        return fn(*args), None
+    with registry.pin() as loaded:
+        return fn(*args), loaded.spec_version
+
+def _set_spec_version(response: Response, spec_version: Optional[str]) -> None:
+    if spec_version:
+        response.headers[SPEC_VERSION_HEADER] = spec_version
+
+def _current_spec_version(fix_version: Optional[str]) -> Optional[str]:
+    try:
+        return SpecsRegistry(fix_version).spec_version
+    except FileNotFoundError:
+        return None
+
+def _build_one(fields: Dict[str, Any], fix_version: Optional[str] = None) -> str:
+    """Build one message from tag-value pairs; returns it with | delimiters."""
+    # Convert | to SOH for internal processing
+    with metrics.stage("normalize"):
+        fields_soh = {k: normalize_delims(v, to_soh=True) if isinstance(v, str) else v 
+                      for k, v in fields.items()}
+    
+    # Build FIX message (MsgType from the fields, NewOrderSingle by default)
+    msg_type = str(fields_soh.get("35") or "D")
+    with metrics.stage("build"):
+        result = build_fix(msg_type, fields_soh, begin_string_for(fix_version))
+    metrics.count_message("build", msg_type)
+    
+    # Convert SOH back to | for response
+    return normalize_delims(result["raw"], to_soh=False)
+
+def _parse_one(raw_fix: str, fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """Parse one raw message into the ParseResponse shape."""
+    # Parse FIX message (parser accepts | or SOH directly)
+    with metrics.stage("parse"):
+        fields = parse_fix(raw_fix, fix_version)
+    metrics.count_message("parse", fields.get("35"))
+    
+    # Extract metadata
+    meta = {
+        "bodyLength": fields.get("9"),
+        "checkSum": fields.get("10"),
+        "msgType": fields.get("35"),
+        "beginString": fields.get("8")
+    }
+    return {"fields": fields, "meta": meta}
+
+def _validate_one(raw_fix: str, fix_version: Optional[str] = None, known_live_orders: Any = None,
+                  original: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Validate one raw message into the ValidateResponse shape (order context is optional)."""
+    # Parse first to get message type (string values keep IDs/codes intact)
+    with metrics.stage("parse"):
+        fields = parse_message(raw_fix).to_dict()
+    msg_type = fields.get("35")
+    metrics.count_message("validate", msg_type)
+    
+    if not msg_type:
+        return {"ok": False, "errors": [{"field": "35", "message": "Missing MsgType"}]}
+    
+    # Validate message
+    with metrics.stage("validate"):
+        result = validate_fix(msg_type, fields, original=original, known_live_orders=known_live_orders,
+                              fix_version=fix_version)
+    
+    # Convert errors to structured format
+    errors = None
+    if not result["ok"]:
+        errors = [{"message": error} for error in result["errors"]]
+    
+    return {"ok": result["ok"], "errors": errors}
+
+def _explain_one(raw_fix: str, fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """Explain one raw message into the ExplainResponse shape."""
+    # Parse and explain message
+    with metrics.stage("parse"):
+        fields = parse_message(raw_fix).to_dict()
+    metrics.count_message("explain", fields.get("35"))
+    with metrics.stage("explain"):
+        result = explain_exec_report(fields, fix_version=fix_version)
+    return {"explanation": result["summary"]}
+
+def _to_fixml_one(raw_fix: str, fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """Convert one raw message to a standalone FIXML document."""
+    with metrics.stage("convert"):
+        return {"fixml": fix_to_fixml(normalize_delims(raw_fix, to_soh=True), fix_version)}
+
+def _error_detail(action: str, e: Exception) -> Dict[str, Any]:
+    """Structured error body used by every /fix endpoint."""
+    return {
+        "code": "VALIDATION_ERROR",
+        "message": f"Failed to {action} FIX message: {str(e)}",
+        "details": {}
+    }
+
+def _run_item(handler, action: str, index: int, raw_fix: Any, item_id: Any = None,
+              fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """Run a handler on one batch/stream item, capturing errors per item."""
+    item: Dict[str, Any] = {"index": index}
+    if item_id is not None:
+        item["id"] = item_id
+    try:
+        if not isinstance(raw_fix, str):
+            raise ValueError("raw_fix must be a string")
+        item["result"] = handler(raw_fix, fix_version)
+    except Exception as e:
+        item["error"] = _error_detail(action, e)
+    return item
+
+def _batch_results(handler, action: str, messages: List[str], fix_version: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Process a batch in one pass; results are plain dicts."""
+    return [_run_item(handler, action, i, raw, fix_version=fix_version) for i, raw in enumerate(messages)]
+
+async def _run_batch(handler, action: str, messages: List[str], fix_version: Optional[str] = None) -> JSONResponse:
+    """Run a whole batch as one engine job on one spec snapshot; the results are serialized once."""
+    results, spec_version = await _run_engine(fix_version, _batch_results, handler, action, messages, fix_version)
+    return JSONResponse(content={"results": results},
+                        headers={SPEC_VERSION_HEADER: spec_version} if spec_version else None)
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator consumes the request body.
+
+    The stock response listens for disconnects on receive() while streaming,
+    which would race the body iterator for request chunks; here the body
+    iterator is the only reader and sees the disconnect itself.
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+async def _ndjson_lines(request: Request):
+    """Yield each non-empty NDJSON line of the request body as it arrives."""
+    pending = b""
+    try:
+        async for chunk in request.stream():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+    except ClientDisconnect:
+        return
+    if pending.strip():
+        yield pending
+
+def _decode_ndjson_line(line: bytes):
+    """A line is either a JSON string or an object with raw_fix (and optional id)."""
+    obj = json.loads(line)
+    if isinstance(obj, dict):
+        return obj.get("raw_fix"), obj.get("id")
+    return obj, None
+
+def _stream_ndjson(handler, action: str, request: Request,
+                   fix_version: Optional[str] = None) -> NDJSONStreamingResponse:
+    """Process an NDJSON body line by line, writing one NDJSON result per input line."""
+    async def body():
+        index = 0
+        async for line in _ndjson_lines(request):
+            try:
+                raw_fix, item_id = _decode_ndjson_line(line)
+                # streams wait for a slot: the 200 status has already been sent
+                item = await _engine_call(_run_item, handler, action, index, raw_fix, item_id, fix_version, wait=True)
+            except ValueError as e:
+                item = {"index": index, "error": _error_detail(action, e)}
+            index += 1
+            yield json.dumps(item) + "\n"
+    # each line runs on the specs current when it is processed; the header is the version at stream start
+    spec_version = _current_spec_version(fix_version)
+    return NDJSONStreamingResponse(body(), headers={SPEC_VERSION_HEADER: spec_version} if spec_version else None)
+
 # FIX parse endpoint
 @app.post("/fix/parse", response_model=ParseResponse)
-async def parse_fix_message(request: ParseRequest):
+async def parse_fix_message(request: ParseRequest, response: Response):
     """Parse a FIX message into tag-value pairs."""
     try:
-        # Convert | to SOH for internal processing
-        fix_soh = normalize_delims(request.raw_fix, to_soh=True)
-        
-        # Parse FIX message
-        fields = parse_fix(fix_soh)
-        
-        # Extract metadata
-        meta = {
-            "bodyLength": fields.get("9"),
-            "checkSum": fields.get("10"),
-            "msgType": fields.get("35"),
-            "beginString": fields.get("8")
-        }
-        
-        return ParseResponse(fields=fields, meta=meta)
+        result, spec_version = await _run_engine(request.fix_version, _parse_one, request.raw_fix, request.fix_version)
+        _set_spec_version(response, spec_version)
+        return ParseResponse(**result)
     
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error parsing FIX message: {e}")
         raise HTTPException(
             status_code=400,
-            detail={
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": f"Failed to parse FIX message: {str(e)}",
-                    "details": {}
-                }
-            }
+            detail={"error": _error_detail("parse", e)}
         )
 
 # FIX validate endpoint
 @app.post("/fix/validate", response_model=ValidateResponse)
-async def validate_fix_message(request: ValidateRequest):
+async def validate_fix_message(request: ValidateRequest, response: Response):
     """Validate a FIX message against specifications."""
     try:
-        # Convert | to SOH for internal processing
-        fix_soh = normalize_delims(request.raw_fix, to_soh=True)
-        
-        # Parse first to get message type
-        fields = parse_fix(fix_soh)
-        msg_type = fields.get("35")
-        
-        if not msg_type:
-            return ValidateResponse(
-                ok=False,
-                errors=[{"field": "35", "message": "Missing MsgType"}]
-            )
-        
-        # Validate message
-        result = validate_fix(msg_type, fields)
-        
-        # Convert errors to structured format
-        errors = None
-        if not result["ok"]:
-            errors = [{"message": error} for error in result["errors"]]
-        
-        return ValidateResponse(ok=result["ok"], errors=errors)
+        result, spec_version = await _run_engine(request.fix_version, _validate_one, request.raw_fix, request.fix_version)
+        _set_spec_version(response, spec_version)
+        return ValidateResponse(**result)
     
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error validating FIX message: {e}")
         raise HTTPException(
             status_code=400,
-            detail={
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": f"Failed to validate FIX message: {str(e)}",
-                    "details": {}
-                }
-            }
+            detail={"error": _error_detail("validate", e)}
         )
 
 # FIX explain endpoint
 @app.post("/fix/explain", response_model=ExplainResponse)
-async def explain_fix_message(request: ExplainRequest):
+async def explain_fix_message(request: ExplainRequest, response: Response):
     """Explain a FIX message in human-readable terms."""
     try:
-        # Convert | to SOH for internal processing
-        fix_soh = normalize_delims(request.raw_fix, to_soh=True)
-        
-        # Parse and explain message
-        fields = parse_fix(fix_soh)
-        result = explain_exec_report(fields)
-        
-        return ExplainResponse(explanation=result["summary"])
+        result, spec_version = await _run_engine(request.fix_version, _explain_one, request.raw_fix, request.fix_version)
+        _set_spec_version(response, spec_version)
+        return ExplainResponse(**result)
     
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error explaining FIX message: {e}")
         raise HTTPException(
             status_code=400,
-            detail={
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": f"Failed to explain FIX message: {str(e)}",
-                    "details": {}
-                }
-            }
+            detail={"error": _error_detail("explain", e)}
         )
 
+# Batch endpoints: one request, many messages, errors reported per item
+@app.post("/fix/parse/batch", response_model=BatchResponse)
+async def parse_fix_batch(request: BatchRequest):
+    """Parse many FIX messages in one request."""
+    return await _run_batch(_parse_one, "parse", request.messages, request.fix_version)
+
+@app.post("/fix/validate/batch", response_model=BatchResponse)
+async def validate_fix_batch(request: BatchRequest):
+    """Validate many FIX messages in one request."""
+    return await _run_batch(_validate_one, "validate", request.messages, request.fix_version)
+
+@app.post("/fix/explain/batch", response_model=BatchResponse)
+async def explain_fix_batch(request: BatchRequest):
+    """Explain many FIX messages in one request."""
+    return await _run_batch(_explain_one, "explain", request.messages, request.fix_version)
+
+# NDJSON streaming endpoints: results are written back as each input line is processed
+@app.post("/fix/parse/stream")
+async def parse_fix_stream(request: Request, fix_version: FixVersion = DEFAULT_FIX_VERSION):
+    """Parse an NDJSON stream of FIX messages."""
+    return _stream_ndjson(_parse_one, "parse", request, fix_version)
+
+@app.post("/fix/validate/stream")
+async def validate_fix_stream(request: Request, fix_version: FixVersion = DEFAULT_FIX_VERSION):
+    """Validate an NDJSON stream of FIX messages."""
+    return _stream_ndjson(_validate_one, "validate", request, fix_version)
+
+@app.post("/fix/explain/stream")
+async def explain_fix_stream(request: Request, fix_version: FixVersion = DEFAULT_FIX_VERSION):
+    """Explain an NDJSON stream of FIX messages."""
+    return _stream_ndjson(_explain_one, "explain", request, fix_version)
+
+# WebSocket sessions: a long-lived stream of build/parse/validate/explain commands.
+# Each command runs on the ENGINE pool as soon as it arrives and its reply is sent
+# when it completes, so replies can come back out of order; match them by id.
+_WS_OPS = ("build", "parse", "validate", "explain")
+
+class _WsContext:
+    """
+    Per-connection state sent with "context" commands.
+
+    live_orders is the known_live_orders set F messages are validated against;
+    it is replaced, never mutated, so commands already in flight keep the set
+    they were sent with.
+    """
+    __slots__ = ("fix_version", "live_orders")
+
+    def __init__(self, fix_version: str):
+        self.fix_version = fix_version
+        self.live_orders: Optional[frozenset] = None
+
+    def update(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply known_live_orders (replace; null clears), then add_live_orders / remove_live_orders."""
+        live = self.live_orders
+        if "known_live_orders" in command:
+            orders = command["known_live_orders"]
+            live = None if orders is None else frozenset(_value_str(o) for o in _ws_list(orders, "known_live_orders"))
+        if command.get("add_live_orders"):
+            live = (live or frozenset()) | {_value_str(o) for o in _ws_list(command["add_live_orders"], "add_live_orders")}
+        if command.get("remove_live_orders") and live is not None:
+            live = live - {_value_str(o) for o in _ws_list(command["remove_live_orders"], "remove_live_orders")}
+        if "fix_version" in command:
+            self.fix_version = command["fix_version"] or DEFAULT_FIX_VERSION
+        self.live_orders = live
+        return {"fixVersion": self.fix_version, "liveOrders": None if live is None else len(live)}
+
+def _ws_error(command_id: Any, op: Any, message: str) -> Dict[str, Any]:
+    return {"id": command_id, "op": op, "error": {"code": "VALIDATION_ERROR", "message": message, "details": {}}}
+
+def _ws_list(value: Any, key: str) -> List[Any]:
+    if not isinstance(value, list):
+        raise ValueError(f"{key} must be a list")
+    return value
+
+def _ws_execute(op: str, command: Dict[str, Any], fix_version: Optional[str],
+                live_orders: Optional[frozenset]) -> Dict[str, Any]:
+    """Run one WebSocket command on the engine pool; the result has the HTTP endpoint's response shape."""
+    if op == "build":
+        fields = command.get("fields")
+        if not isinstance(fields, dict):
+            raise ValueError("fields must be an object")
+        return {"raw_fix": _build_one(fields, fix_version)}
+    raw_fix = command.get("raw_fix")
+    if not isinstance(raw_fix, str):
+        raise ValueError("raw_fix must be a string")
+    if op == "validate":
+        return _validate_one(raw_fix, fix_version, live_orders, command.get("original"))
+    return (_parse_one if op == "parse" else _explain_one)(raw_fix, fix_version)
+
+async def _ws_run(op: str, command: Dict[str, Any], fix_version: str, live_orders: Optional[frozenset],
+                  outbox: asyncio.Queue, slots: asyncio.Semaphore) -> None:
+    """
+    Run one command and queue its reply; the in-flight slot is released when it completes.
+
+    fix_version and live_orders are the connection context as of the command's
+    frame, captured by the reader so later "context" frames cannot leak in.
+    """
+    start_time = time.perf_counter()
+    reply: Dict[str, Any] = {"id": command.get("id"), "op": op}
+    status = 200
+    try:
+        reply["result"], spec_version = await ENGINE.run(_pinned, fix_version, _ws_execute, op, command,
+                                                         fix_version, live_orders)
+        if spec_version:
+            reply["specVersion"] = spec_version
+    except Overloaded as e:
+        status = 503
+        reply["error"] = {"code": "OVERLOADED", "message": str(e), "details": {"retryAfter": e.retry_after}}
+    except Exception as e:
+        status = 400
+        reply["error"] = _error_detail(op, e)
+    finally:
+        slots.release()
+    metrics.observe_request("WS", f"/fix/ws:{op}", status, time.perf_counter() - start_time)
+    outbox.put_nowait(reply)
+
+async def _ws_writer(websocket: WebSocket, outbox: asyncio.Queue) -> None:
+    """Single writer for a connection: replies are sent in completion order."""
+    while True:
+        reply = await outbox.get()
+        await websocket.send_text(json.dumps(reply))
+
+@app.websocket("/fix/ws")
+async def fix_websocket(websocket: WebSocket, fix_version: FixVersion = DEFAULT_FIX_VERSION):
+    """
+    Pipelined engine commands over one connection.
+
+    Each text frame is a JSON command {"id", "op", ...}: "build" takes fields,
+    "parse"/"validate"/"explain" take raw_fix (validate also takes original for G),
+    and any command may set fix_version. "context" updates connection state
+    (known_live_orders / add_live_orders / remove_live_orders, fix_version) and is
+    applied before the next frame is read. Replies are {"id", "op", "result",
+    "specVersion"} or {"id", "op", "error"}. Once FIX_WS_MAX_INFLIGHT commands are
+    running, reading pauses until one completes.
+    """
+    await websocket.accept()
+    ctx = _WsContext(fix_version)
+    outbox: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(WS_MAX_INFLIGHT)
+    pending = set()
+    writer = asyncio.create_task(_ws_writer(websocket, outbox))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("text") if message.get("text") is not None else message.get("bytes")
+            try:
+                command = json.loads(data)
+                if not isinstance(command, dict):
+                    raise ValueError("command must be a JSON object")
+            except ValueError as e:
+                outbox.put_nowait(_ws_error(None, None, f"Invalid command: {e}"))
+                continue
+            op = command.get("op")
+            if op == "context":
+                try:
+                    outbox.put_nowait({"id": command.get("id"), "op": op, "result": ctx.update(command)})
+                except Exception as e:
+                    outbox.put_nowait(_ws_error(command.get("id"), op, f"Invalid context: {e}"))
+                continue
+            if op not in _WS_OPS:
+                outbox.put_nowait(_ws_error(command.get("id"), op, f"Unknown op {op!r}; expected context, {', '.join(_WS_OPS)}"))
+                continue
+            await slots.acquire()
+            task = asyncio.create_task(_ws_run(op, command, command.get("fix_version") or ctx.fix_version,
+                                               ctx.live_orders, outbox, slots))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    finally:
+        # replies can no longer be delivered; engine calls already running finish on their workers
+        for task in pending:
+            task.cancel()
+        writer.cancel()
+
+# FIXML conversion: batch FIX -> FIXML, streamed FIXML document -> FIX
+@app.post("/fix/fixml/encode/batch", response_model=BatchResponse)
+async def fixml_encode_batch(request: BatchRequest):
+    """Convert many FIX messages to FIXML in one request."""
+    return await _run_batch(_to_fixml_one, "convert", request.messages, request.fix_version)
+
+@app.post("/fix/fixml/decode/stream")
+async def fixml_decode_stream(request: Request, fix_version: FixVersion = DEFAULT_FIX_VERSION):
+    """Convert a FIXML document (any size, read as it arrives) to FIX; one NDJSON result per message."""
+    reader = FixmlReader(fix_version=fix_version)
+    loop = asyncio.get_running_loop()
+
+    def lines(items) -> str:
+        out = []
+        for index, raw in items:
+            if isinstance(raw, FixmlError):
+                out.append(json.dumps({"index": index, "error": _error_detail("convert", raw)}))
+            else:
+                out.append(json.dumps({"index": index, "result": {"raw_fix": normalize_delims(raw.decode(), to_soh=False)}}))
+        return "".join(line + "\n" for line in out)
+
+    async def body():
+        # the reader keeps parser state, so it runs on a thread rather than the (possibly process) ENGINE pool
+        try:
+            try:
+                async for chunk in request.stream():
+                    yield await loop.run_in_executor(None, lambda c=chunk: lines(reader.feed(c)))
+            except ClientDisconnect:
+                return
+            yield await loop.run_in_executor(None, lambda: lines(reader.close()))
+        except ET.ParseError as e:
+            yield json.dumps({"index": reader.messages, "error": _error_detail("parse FIXML for", e)}) + "\n"
+    spec_version = _current_spec_version(fix_version)
+    return NDJSONStreamingResponse(body(), headers={SPEC_VERSION_HEADER: spec_version} if spec_version else None)
+
 # FIX lookup endpoint
 @app.get("/fix/lookup", response_model=LookupResponse)
-async def lookup_fix_field(tag: str, fix_version: FixVersion = DEFAULT_FIX_VERSION):
+async def lookup_fix_field(tag: str, response: Response, fix_version: FixVersion = DEFAULT_FIX_VERSION):
     """Look up FIX field information by tag."""
     try:
         # Look up field
-        field_info = lookup_tag(tag)
+        loaded = SpecsRegistry(fix_version).current()
+        field_info = loaded.lookup_tag(tag)
+        _set_spec_version(response, loaded.spec_version)
         
         if not field_info:
             raise HTTPException(
@@ -274,6 +805,11 @@ async def lookup_fix_field(tag: str, fix_version: FixVersion = DEFAULT_FIX_VERSI
     
     except HTTPException:
         raise
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": {"code": "VALIDATION_ERROR", "message": str(e), "details": {}}}
+        )
     except Exception as e:
         logger.error(f"Error looking up FIX field: {e}")
         raise HTTPException(
@@ -286,3 +822,33 @@ async def lookup_fix_field(tag: str, fix_version: FixVersion = DEFAULT_FIX_VERSI
                 }
             }
         )
+
+# FIX dictionary search endpoint
+@app.get("/fix/search", response_model=SearchResponse)
+async def search_fix_dictionary(q: str, response: Response, limit: int = 10, kind: Optional[str] = None,
+                                fix_version: FixVersion = DEFAULT_FIX_VERSION):
+    """Ranked full-text search over field names, descriptions, FIXML elements, enum meanings, components and messages."""
+    try:
+        loaded = SpecsRegistry(fix_version).current()
+        kinds = [k.strip() for k in kind.split(",")] if kind else None
+        results = loaded.search(q, max(1, min(limit, 100)), kinds)
+        _set_spec_version(response, loaded.spec_version)
+        return SearchResponse(query=q, results=results)
+    
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": {"code": "VALIDATION_ERROR", "message": str(e), "details": {}}}
+        )
+    except Exception as e:
+        logger.error(f"Error searching FIX dictionary: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": {
+                    "code": "INTERNAL_ERROR",
+                    "message": f"Failed to search FIX dictionary: {str(e)}",
+                    "details": {}
+                }
+            }
+        )
@@ -0,0 +1,362 @@
+"""
+Arrow / Parquet Export
+
+Streams a FIX log into columnar files for a warehouse: one file per MsgType
+(out_dir/MsgType=<type>/part-0.parquet, or part-0.arrows for the Arrow IPC
+stream format) with one column per tag, typed from the data dictionary.
+
+- Each MsgType's schema is declared up front: the header fields, then every
+  tag in the data dictionary plus any its message spec and rules read (the
+  ColumnarValidator tag list) and the dictionary-encoded tags, then any extra
+  tags asked for. Tags outside the
+  dictionary, repeats of a tag and values that do not parse as their type go,
+  as strings, into the "_other" map column, so no field is lost. "_index" is
+  the message's position in the input.
+- Types follow FieldDecoder: int64 (int, SeqNum, Length, NumInGroup),
+  decimal128(28, 8) (Price, Qty, Amt, PriceOffset, Percentage), float64,
+  timestamp[us, UTC], date32, time64[us] and bool; everything else is a string,
+  dictionary-encoded for low-cardinality tags (DICTIONARY_TAGS).
+- Rows are buffered per MsgType and written as one row group every
+  row_group_rows rows, or sooner (largest buffer first) once the buffers'
+  estimated size passes memory_limit_mb.
+
+Usage:
+    python -m backend.arrow_export session.log warehouse/ [--format arrow] [--tags 58,1]
+
+Requires pyarrow.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .columnar import get_columnar_validator
+from .fix_engine import (SOH, SpecsRegistry, _DATE_TYPES, _DECIMAL_TYPES, _FLOAT_TYPES, _INT_TYPES,
+                         _TIME_TYPES, _TIMESTAMP_TYPES)
+from .fix_stream import FixStreamReader
+from .settings import DEFAULT_FIX_VERSION
+
+# Low-cardinality tags stored as dictionary<int32, string>
+# (OrdStatus, OrdType, SenderCompID, Side, Symbol, TargetCompID, TimeInForce, ExecType)
+DICTIONARY_TAGS = ("39", "40", "49", "54", "55", "56", "59", "150")
+DECIMAL_TYPE = pa.decimal128(28, 8)
+TIMESTAMP_TYPE = pa.timestamp("us", tz="UTC")
+OTHER_TYPE = pa.map_(pa.string(), pa.string())
+FORMATS = {"parquet": "parquet", "arrow": "arrows"}
+
+# Framing and MsgType are implied by the file
+_SKIP_TAGS = frozenset({"8", "9", "10", "35"})
+_EXTRA_HEADER_TAGS = ("56",)
+# Rough in-memory size of a buffered row (dict + str objects) per byte of wire message
+_BUFFER_OVERHEAD = 8
+
+# FIX wire formats rewritten to ISO 8601 so Arrow's casts can parse them (sub-microsecond digits dropped)
+_TS_PATTERN, _TS_ISO = r"^(\d{4})(\d{2})(\d{2})-(\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)\d*$", r"\1-\2-\3T\4Z"
+_DATE_PATTERN, _DATE_ISO = r"^(\d{4})(\d{2})(\d{2})$", r"\1-\2-\3"
+_TIME_PATTERN, _TIME_ISO = r"^(\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)\d*$", r"1970-01-01T\1Z"
+_BOOL_VALUES = pa.array(["Y", "N"])
+
+
+def arrow_type(ftype: Optional[str], dictionary: bool = False) -> pa.DataType:
+    """Arrow type for a FIX data dictionary type."""
+    if ftype in _INT_TYPES:
+        return pa.int64()
+    if ftype in _DECIMAL_TYPES:
+        return DECIMAL_TYPE
+    if ftype in _FLOAT_TYPES:
+        return pa.float64()
+    if ftype in _TIMESTAMP_TYPES:
+        return TIMESTAMP_TYPE
+    if ftype in _DATE_TYPES:
+        return pa.date32()
+    if ftype in _TIME_TYPES:
+        return pa.time64("us")
+    if ftype == "Boolean":
+        return pa.bool_()
+    return pa.dictionary(pa.int32(), pa.string()) if dictionary else pa.string()
+
+
+def _convert(values: pa.Array, ftype: Optional[str]) -> pa.Array:
+    """Vectorized wire string -> typed array; raises pa.ArrowInvalid if any value does not parse."""
+    if ftype in _INT_TYPES:
+        return pc.cast(values, pa.int64())
+    if ftype in _DECIMAL_TYPES:
+        return pc.cast(values, DECIMAL_TYPE)
+    if ftype in _FLOAT_TYPES:
+        return pc.cast(values, pa.float64())
+    if ftype in _TIMESTAMP_TYPES:
+        return pc.cast(pc.replace_substring_regex(values, _TS_PATTERN, _TS_ISO), TIMESTAMP_TYPE)
+    if ftype in _DATE_TYPES:
+        return pc.cast(pc.replace_substring_regex(values, _DATE_PATTERN, _DATE_ISO), pa.date32())
+    if ftype in _TIME_TYPES:
+        stamps = pc.cast(pc.replace_substring_regex(values, _TIME_PATTERN, _TIME_ISO), TIMESTAMP_TYPE)
+        return pc.cast(stamps, pa.time64("us"))
+    if ftype == "Boolean":
+        if not pc.all(pc.or_(pc.is_in(values, value_set=_BOOL_VALUES), pc.is_null(values))).as_py():
+            raise pa.ArrowInvalid("expected Y or N")
+        return pc.equal(values, "Y")
+    return values
+
+
+def _typed_column(values: List[Optional[str]], ftype: Optional[str], atype: pa.DataType) -> Tuple[pa.Array, List[int]]:
+    """Typed array for one column plus the rows whose value did not parse (those are null)."""
+    arr = pa.array(values, pa.string())
+    if pa.types.is_dictionary(atype):
+        return pc.dictionary_encode(arr), []
+    if pa.types.is_string(atype):
+        return arr, []
+    try:
+        return _convert(arr, ftype), []
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        pass
+    # slow path, only for a row group with bad values: find them one by one
+    bad: List[int] = []
+    for i, v in enumerate(values):
+        if v is None:
+            continue
+        try:
+            _convert(pa.array([v], pa.string()), ftype)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            bad.append(i)
+    cleaned = list(values)
+    for i in bad:
+        cleaned[i] = None
+    return _convert(pa.array(cleaned, pa.string()), ftype), bad
+
+
+class _TypeBuffer:
+    """One MsgType: its schema, rows waiting for the next row group, and its file writer."""
+
+    __slots__ = ("msg_type", "tags", "declared", "ftypes", "schema", "path", "writer",
+                 "rows", "others", "indexes", "size", "row_groups", "rows_written")
+
+    def __init__(self, msg_type: str, tags: Sequence[str], ftypes: Dict[str, Optional[str]],
+                 schema: pa.Schema, path: str):
+        self.msg_type = msg_type
+        self.tags = tuple(tags)
+        self.declared = frozenset(tags)
+        self.ftypes = ftypes
+        self.schema = schema
+        self.path = path
+        self.writer: Any = None
+        self.rows: List[Dict[str, str]] = []
+        self.others: List[List[Tuple[str, str]]] = []
+        self.indexes: List[int] = []
+        self.size = 0
+        self.row_groups = 0
+        self.rows_written = 0
+
+
+class ArrowExporter:
+    """
+    Buffers parsed messages per MsgType and writes them as Parquet or Arrow IPC row groups.
+
+    add() takes one raw frame (bytes or str, SOH or | delimited); close() flushes
+    the remaining rows, closes the files and returns run statistics.
+    """
+
+    def __init__(self, out_dir: str, fmt: str = "parquet", fix_version: Optional[str] = None,
+                 extra_tags: Iterable[Any] = (), dictionary_tags: Iterable[Any] = DICTIONARY_TAGS,
+                 row_group_rows: int = 131072, memory_limit_mb: float = 256, compression: str = "zstd"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.fix_version = fix_version or DEFAULT_FIX_VERSION
+        self.extra_tags = tuple(str(t) for t in extra_tags)
+        self.dictionary_tags = frozenset(str(t) for t in dictionary_tags)
+        self.row_group_rows = max(1, row_group_rows)
+        self.memory_limit = int(memory_limit_mb * (1 << 20))
+        self.compression = compression
+        registry = SpecsRegistry(fix_version)
+        self._loaded = registry.current()
+        self._types = self._loaded.get_decoder().types
+        fields_json = self._loaded.specs.get("fields_json", {})
+        self._names = {tag: e.get("name") for tag, e in fields_json.get("fields", {}).items() if isinstance(e, dict)}
+        header = [str(t) for t in (fields_json.get("groups") or {}).get("header", [])] + list(_EXTRA_HEADER_TAGS)
+        self._header_tags = tuple(dict.fromkeys(t for t in header if t not in _SKIP_TAGS))
+        self._dictionary_tags = tuple(t for t in fields_json.get("fields", {}) if t.isdigit())
+        self._buffers: Dict[str, _TypeBuffer] = {}
+        self._buffered = 0
+        self.messages = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.invalid: Dict[str, int] = {}
+        self._start = time.perf_counter()
+
+    def declared_tags(self, msg_type: str) -> List[str]:
+        """Columns declared for a MsgType: header fields, then dictionary tags and the tags its spec and rules read, then extra tags."""
+        validator = get_columnar_validator(msg_type, self.fix_version)
+        spec = self._loaded.get_message_spec(msg_type) or {}
+        read = list(validator.tags if validator else ()) + [str(t) for t in spec.get("required", [])]
+        body = sorted({t for t in read + list(self._dictionary_tags) + list(self.dictionary_tags) if t.isdigit()}, key=int)
+        return [t for t in dict.fromkeys(list(self._header_tags) + body + list(self.extra_tags)) if t not in _SKIP_TAGS]
+
+    def schema_for(self, msg_type: str) -> pa.Schema:
+        """Arrow schema of a MsgType's file."""
+        return self._schema(msg_type, self.declared_tags(msg_type))
+
+    def _schema(self, msg_type: str, tags: Sequence[str]) -> pa.Schema:
+        fields = [pa.field("_index", pa.int64(), nullable=False)]
+        for tag in tags:
+            ftype = self._types.get(tag)
+            meta = {"tag": tag, "fixType": ftype or "String"}
+            if self._names.get(tag):
+                meta["name"] = self._names[tag]
+            fields.append(pa.field(tag, arrow_type(ftype, tag in self.dictionary_tags), metadata=meta))
+        fields.append(pa.field("_other", OTHER_TYPE))
+        return pa.schema(fields, metadata={"msgType": msg_type, "fixVersion": self.fix_version,
+                                           "specVersion": self._loaded.spec_version})
+
+    def _buffer(self, msg_type: str) -> _TypeBuffer:
+        buf = self._buffers.get(msg_type)
+        if buf is None:
+            tags = self.declared_tags(msg_type)
+            path = os.path.join(self.out_dir, f"MsgType={msg_type}", f"part-0.{FORMATS[self.fmt]}")
+            buf = self._buffers[msg_type] = _TypeBuffer(msg_type, tags, {t: self._types.get(t) for t in tags},
+                                                        self._schema(msg_type, tags), path)
+        return buf
+
+    def add(self, frame: Any) -> None:
+        """Buffer one message, writing a row group when its MsgType or the memory cap calls for one."""
+        text = bytes(frame).decode("utf-8", "replace") if isinstance(frame, (bytes, bytearray, memoryview)) else frame
+        index = self.messages
+        self.messages += 1
+        self.bytes_in += len(text)
+        fields = [f.partition("=") for f in text.split(SOH if SOH in text else "|") if f]
+        msg_type = next((v for t, _, v in fields if t == "35"), None)
+        if not msg_type:
+            self.skipped += 1
+            return
+        buf = self._buffer(msg_type)
+        declared = buf.declared
+        row: Dict[str, str] = {}
+        other: List[Tuple[str, str]] = []
+        for tag, _, value in fields:
+            if tag in declared and tag not in row:
+                row[tag] = value
+            elif tag not in _SKIP_TAGS:
+                other.append((tag, value))
+        buf.rows.append(row)
+        buf.others.append(other)
+        buf.indexes.append(index)
+        size = len(text) * _BUFFER_OVERHEAD
+        buf.size += size
+        self._buffered += size
+        if len(buf.rows) >= self.row_group_rows:
+            self._flush(buf)
+        elif self._buffered > self.memory_limit:
+            self._flush(max(self._buffers.values(), key=lambda b: b.size))
+
+    def _flush(self, buf: _TypeBuffer) -> None:
+        """Write buf's rows as one row group."""
+        if not buf.rows:
+            return
+        rows, others = buf.rows, buf.others
+        arrays = [pa.array(buf.indexes, pa.int64())]
+        for i, tag in enumerate(buf.tags):
+            arr, bad = _typed_column([r.get(tag) for r in rows], buf.ftypes[tag], buf.schema.field(i + 1).type)
+            for j in bad:
+                others[j].append((tag, rows[j][tag]))
+            if bad:
+                self.invalid[tag] = self.invalid.get(tag, 0) + len(bad)
+            arrays.append(arr)
+        arrays.append(pa.array(others, OTHER_TYPE))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=buf.schema)
+        if buf.writer is None:
+            buf.writer = self._open(buf)
+        if self.fmt == "parquet":
+            buf.writer.write_batch(batch, row_group_size=batch.num_rows)
+        else:
+            buf.writer.write_batch(batch)
+        buf.row_groups += 1
+        buf.rows_written += batch.num_rows
+        self._buffered -= buf.size
+        buf.rows, buf.others, buf.indexes, buf.size = [], [], [], 0
+
+    def _open(self, buf: _TypeBuffer) -> Any:
+        os.makedirs(os.path.dirname(buf.path), exist_ok=True)
+        if self.fmt == "parquet":
+            dict_columns = [t for t in buf.tags if t in self.dictionary_tags]
+            return pq.ParquetWriter(buf.path, buf.schema, compression=self.compression, use_dictionary=dict_columns)
+        # the stream format allows each batch its own dictionaries; the IPC file format does not
+        options = pa.ipc.IpcWriteOptions(compression=None if self.compression == "none" else self.compression)
+        return pa.ipc.new_stream(buf.path, buf.schema, options=options)
+
+    def close(self) -> Dict[str, Any]:
+        """Flush all buffers, close every file and return run statistics."""
+        for buf in self._buffers.values():
+            self._flush(buf)
+            if buf.writer is not None:
+                buf.writer.close()
+        elapsed = time.perf_counter() - self._start
+        files = {mt: {"path": b.path, "rows": b.rows_written, "rowGroups": b.row_groups, "bytes": os.path.getsize(b.path)}
+                 for mt, b in sorted(self._buffers.items()) if b.writer is not None}
+        return {
+            "messages": self.messages,
+            "skipped": self.skipped,
+            "invalidValues": self.invalid,
+            "bytesIn": self.bytes_in,
+            "bytesOut": sum(f["bytes"] for f in files.values()),
+            "files": files,
+            "seconds": round(elapsed, 3),
+            "messagesPerSec": round(self.messages / elapsed) if elapsed > 0 else None,
+        }
+
+    def __enter__(self) -> "ArrowExporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if exc[0] is None:
+            return
+        for buf in self._buffers.values():
+            if buf.writer is not None:
+                buf.writer.close()
+
+
+def export_log(source: Any, out_dir: str, fmt: str = "parquet", verify_checksum: bool = False,
+               **options: Any) -> Dict[str, Any]:
+    """Export a FIX log (path or binary stream) to out_dir; options are ArrowExporter's."""
+    exporter = ArrowExporter(out_dir, fmt, **options)
+    with exporter:
+        for frame in FixStreamReader(source, verify_checksum=verify_checksum).frames():
+            exporter.add(frame)
+        return exporter.close()
+
+
+def _tag_list(value: str) -> List[str]:
+    return [t.strip() for t in value.split(",") if t.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export a FIX log to Parquet / Arrow IPC, one typed file per MsgType.")
+    parser.add_argument("path", help="FIX log file, or '-' for stdin")
+    parser.add_argument("out_dir", help="output directory (MsgType=<type>/part-0.<ext> per MsgType)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--fix-version", default=None, help="dictionary version (default: DEFAULT_FIX_VERSION)")
+    parser.add_argument("--tags", type=_tag_list, default=[], help="extra tags to give their own column, e.g. 58,1")
+    parser.add_argument("--dictionary-tags", type=_tag_list, default=list(DICTIONARY_TAGS),
+                        help=f"tags stored dictionary-encoded (default {','.join(DICTIONARY_TAGS)})")
+    parser.add_argument("--row-group-rows", type=int, default=131072, help="rows per row group")
+    parser.add_argument("--memory-limit-mb", type=float, default=256, help="cap on buffered rows across all MsgTypes")
+    parser.add_argument("--compression", default="zstd", help="zstd (default), lz4, snappy (Parquet only) or none")
+    parser.add_argument("--verify-checksum", action="store_true", help="drop messages whose CheckSum(10) is wrong")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin.buffer if args.path == "-" else args.path
+    stats = export_log(source, args.out_dir, args.format, args.verify_checksum, fix_version=args.fix_version,
+                       extra_tags=args.tags, dictionary_tags=args.dictionary_tags, row_group_rows=args.row_group_rows,
+                       memory_limit_mb=args.memory_limit_mb, compression=args.compression)
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+FIX Engine Micro-Benchmarks
+
+Times the engine hot paths on synthetic D/F/G/8 order flow and compares the
+results against a saved JSON baseline.
+
+Usage:
+    python -m backend.bench                              # run and print
+    python -m backend.bench --save bench_baseline.json   # record a baseline
+    python -m backend.bench --compare bench_baseline.json --threshold 0.15
+    python -m backend.bench --filter validate_fix
+
+--compare exits with status 1 when any benchmark is slower than its baseline
+by more than the threshold (best-of-N ns/op, so noise mostly cancels out).
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from statistics import median
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .fix_engine import (
+    CompiledValidator, SpecsRegistry, build_fix, explain_exec_report, parse_fix, parse_message, validate_fix,
+)
+from .columnar import validate_fix_batch
+from .order_book import OrderBook
+from .synthetic import message_mix, raw_messages
+
+Bench = Tuple[str, Callable[[], None], int]
+
+
+def _loop(fn: Callable[..., Any], inputs: List[Any]) -> Callable[[], None]:
+    def run() -> None:
+        for x in inputs:
+            fn(x)
+    return run
+
+
+def _loop_star(fn: Callable[..., Any], inputs: List[Tuple[Any, ...]]) -> Callable[[], None]:
+    def run() -> None:
+        for args in inputs:
+            fn(*args)
+    return run
+
+
+def check_mix(mix: List[Tuple[str, Dict[str, str]]], fix_version: Optional[str] = None) -> None:
+    """Raise AssertionError unless every message validates clean against an order book replaying the mix."""
+    book = OrderBook(fix_version)
+    for i, (msg_type, fields) in enumerate(mix):
+        payload = dict(fields, **{"35": msg_type})
+        result = validate_fix(msg_type, payload, order_book=book, fix_version=fix_version)
+        if not result["ok"]:
+            raise AssertionError(f"synthetic message {i} ({msg_type}) is invalid: {result['errors']}")
+        book.apply(payload)
+
+
+def build_benchmarks(n_messages: int = 2000, seed: int = 0, fix_version: Optional[str] = None) -> List[Bench]:
+    """(name, run, ops per run) for every benchmark; the synthetic mix must validate clean."""
+    registry = SpecsRegistry(fix_version)
+    mix = message_mix(n_messages, seed)
+    check_mix(mix, fix_version)
+    raws = raw_messages(mix, fix_version)
+    by_type: Dict[str, List[Dict[str, str]]] = {}
+    for msg_type, fields in mix:
+        by_type.setdefault(msg_type, []).append(dict(fields, **{"35": msg_type}))
+
+    benches: List[Bench] = [
+        ("parse_fix/mix", _loop(parse_fix, raws), len(raws)),
+        ("parse_message/mix", _loop(parse_message, raws), len(raws)),
+        ("parse_message+to_dict/mix", _loop(lambda r: parse_message(r).to_dict(), raws), len(raws)),
+    ]
+    for msg_type, payloads in sorted(by_type.items()):
+        args = [(msg_type, p, None, None, None, fix_version) for p in payloads]
+        benches.append((f"validate_fix/{msg_type}", _loop_star(validate_fix, args), len(args)))
+    mix_args = [(mt, dict(f, **{"35": mt}), None, None, None, fix_version) for mt, f in mix]
+    benches.append(("validate_fix/mix", _loop_star(validate_fix, mix_args), len(mix_args)))
+    for msg_type, payloads in sorted(by_type.items()):
+        benches.append((f"validate_fix_batch/{msg_type}",
+                        lambda mt=msg_type, ps=payloads: validate_fix_batch(mt, ps, fix_version=fix_version),
+                        len(payloads)))
+
+    # one benchmark per rule, over the messages it applies to
+    for msg_type, payloads in sorted(by_type.items()):
+        validator = registry.get_validator(msg_type)
+        if validator is None:
+            continue
+        for rule in validator.rules:
+            single = CompiledValidator(msg_type, [], [rule])
+            benches.append((f"rule/{rule[0]}/{msg_type}", _loop(single.validate_rules, payloads), len(payloads)))
+
+    for msg_type, payloads in sorted(by_type.items()):
+        args = [(msg_type, p) for p in payloads]
+        benches.append((f"build_fix/{msg_type}", _loop_star(build_fix, args), len(args)))
+
+    reports = [(p, None, fix_version) for p in by_type.get("8", [])]
+    benches.append(("explain_exec_report", _loop_star(explain_exec_report, reports), len(reports)))
+
+    fields = registry.specs.get("fields_json", {}).get("fields", {})
+    keys = list(fields)[:200] + [f.get("name", "") for f in list(fields.values())[:200]]
+    keys = [k for k in keys if k] or ["35"]
+    benches.append(("lookup_tag", _loop(registry.lookup_tag, keys), len(keys)))
+    queries = ["stop limit", "order quantity", "comission", "cumulative qty", "execution report", "ClOrdID"]
+    benches.append(("search_dictionary", _loop(registry.search, queries), len(queries)))
+    return benches
+
+
+def time_benchmark(run: Callable[[], None], ops: int, repeat: int = 5, min_time: float = 0.2) -> Dict[str, Any]:
+    """Best and median ns/op over repeat rounds, each looping run until min_time elapses."""
+    run()  # warm caches and lazy compilation
+    samples: List[float] = []
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter_ns()
+        while True:
+            run()
+            loops += 1
+            elapsed = time.perf_counter_ns() - start
+            if elapsed >= min_time * 1e9:
+                break
+        samples.append(elapsed / (loops * ops))
+    return {"ns_per_op": round(min(samples), 1), "median_ns": round(median(samples), 1),
+            "ops_per_sec": round(1e9 / min(samples)), "rounds": repeat}
+
+
+def run_benchmarks(name_filter: Optional[str] = None, repeat: int = 5, min_time: float = 0.2,
+                   n_messages: int = 2000, fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """Run every benchmark (optionally only names containing name_filter); returns the baseline document."""
+    results = {}
+    for name, run, ops in build_benchmarks(n_messages, fix_version=fix_version):
+        if name_filter and name_filter not in name:
+            continue
+        if ops == 0:
+            continue
+        results[name] = time_benchmark(run, ops, repeat, min_time)
+        print(f"{name:<32} {results[name]['ns_per_op']:>12,.1f} ns/op {results[name]['ops_per_sec']:>12,} ops/s",
+              file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "messages": n_messages,
+            "fix_version": fix_version or SpecsRegistry(fix_version).fix_version,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Per-benchmark change vs baseline; entries slower than threshold are flagged as regressions."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        change = cur["ns_per_op"] / base["ns_per_op"] - 1
+        rows.append({"name": name, "baseline_ns": base["ns_per_op"], "current_ns": cur["ns_per_op"],
+                     "change": round(change, 4), "regression": change > threshold})
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark fix_engine hot paths and compare against a JSON baseline.")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before failing (default 0.15 = 15%%)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per benchmark (best is kept)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per round")
+    parser.add_argument("--messages", type=int, default=2000, help="synthetic messages per benchmark input set")
+    parser.add_argument("--fix-version", default=None, help="spec version to benchmark (default: DEFAULT_FIX_VERSION)")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.filter, args.repeat, args.min_time, args.messages, args.fix_version)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if not args.compare:
+        if not args.save:
+            print(json.dumps(current, indent=2))
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:<32} {row['baseline_ns']:>10,.1f} -> {row['current_ns']:>10,.1f} ns/op "
+              f"{row['change']:>+8.1%} {flag}")
+    regressions = [r["name"] for r in rows if r["regression"]]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
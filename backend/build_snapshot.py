@@ -0,0 +1,32 @@
+"""
+Spec Snapshot Builder
+
+Compiles specs/fix_knowledge into the single snapshot file SpecsRegistry loads
+at startup. Run it at image build time so workers never parse JSON; the
+registry also rebuilds the snapshot itself whenever the source JSON changes.
+
+Usage:
+    python -m backend.build_snapshot [--fix-version 4.4] [--out PATH]
+"""
+
+import argparse
+import os
+import time
+
+from .fix_engine import SpecsRegistry
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compile the FIX spec directory into a snapshot file.")
+    parser.add_argument("--fix-version", default=None, help="FIX version to compile (default: DEFAULT_FIX_VERSION)")
+    parser.add_argument("--out", default=None, help="snapshot path (default: <spec dir>/.specs.snapshot)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    path = SpecsRegistry.build_snapshot(args.fix_version, args.out)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Wrote {path} ({os.path.getsize(path)} bytes) in {elapsed_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Bulk Validation Engine
+
+Fans large message sets out to a process pool so validate_fix runs on every
+core. Messages are shipped to workers as raw str/bytes chunks and parsed
+there; each worker warms its own SpecsRegistry once at startup. The number of
+chunks in flight is capped, so memory stays bounded regardless of input size.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .fix_engine import SpecsRegistry, parse_message, validate_fix
+from .fix_stream import FixStreamReader
+from .settings import BULK_CHUNK_SIZE, BULK_COLUMNAR, BULK_WORKERS
+
+RawMessage = Union[str, bytes]
+
+
+def _init_worker(fix_version: Optional[str] = None) -> None:
+    """Process-pool initializer: load specs and compile validators once per worker."""
+    SpecsRegistry(fix_version)
+
+
+def validate_chunk(base: int, chunk: List[RawMessage], fix_version: Optional[str] = None,
+                   columnar: bool = False) -> List[Dict[str, Any]]:
+    """Parse and validate a chunk of raw messages; index numbering starts at base."""
+    if columnar:
+        return _validate_chunk_columnar(base, chunk, fix_version)
+    out: List[Dict[str, Any]] = []
+    for i, raw in enumerate(chunk):
+        msg_type = None
+        try:
+            payload = parse_message(raw).to_dict()
+            msg_type = payload.get("35")
+            if not msg_type:
+                result = {"ok": False, "errors": ["Missing MsgType(35)"]}
+            else:
+                result = validate_fix(msg_type, payload, fix_version=fix_version)
+        except Exception as e:
+            result = {"ok": False, "errors": [f"Failed to validate FIX message: {e}"]}
+        out.append({"index": base + i, "msgType": msg_type, "ok": result["ok"], "errors": result["errors"]})
+    return out
+
+
+def _validate_chunk_columnar(base: int, chunk: List[RawMessage], fix_version: Optional[str]) -> List[Dict[str, Any]]:
+    """validate_chunk via columnar.validate_batch (one vectorized pass per MsgType in the chunk)."""
+    from .columnar import validate_batch
+
+    out: List[Optional[Dict[str, Any]]] = [None] * len(chunk)
+    parsed: List[Dict[str, Any]] = []
+    slots: List[int] = []
+    for i, raw in enumerate(chunk):
+        try:
+            parsed.append(parse_message(raw).to_dict())
+            slots.append(i)
+        except Exception as e:
+            out[i] = {"index": base + i, "msgType": None, "ok": False,
+                      "errors": [f"Failed to validate FIX message: {e}"]}
+    for i, result in zip(slots, validate_batch(parsed, fix_version=fix_version)):
+        out[i] = {"index": base + i, **result}
+    return out
+
+
+class BulkValidationEngine:
+    """
+    Validate many messages across a process pool.
+
+    workers defaults to BULK_WORKERS (or the CPU count); workers=1 runs
+    in-process without a pool. At most max_pending chunks are queued at once.
+    columnar=True (default BULK_COLUMNAR) validates each chunk column-wise.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 max_pending: Optional[int] = None, fix_version: Optional[str] = None,
+                 columnar: Optional[bool] = None):
+        self.fix_version = fix_version
+        self.columnar = BULK_COLUMNAR if columnar is None else columnar
+        self.workers = workers or BULK_WORKERS or os.cpu_count() or 1
+        self.chunk_size = chunk_size or BULK_CHUNK_SIZE
+        self.max_pending = max_pending or self.workers * 2
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "BulkValidationEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.fix_version,))
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _chunks(self, messages: Iterable[RawMessage]) -> Iterator[List[RawMessage]]:
+        it = iter(messages)
+        while True:
+            chunk = list(islice(it, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def validate(self, messages: Iterable[RawMessage], ordered: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Yield one result per message: {index, msgType, ok, errors}.
+
+        ordered=True yields in input order; ordered=False yields chunks as they
+        complete, which keeps workers busier when chunk costs vary.
+        """
+        if self.workers == 1:
+            base = 0
+            for chunk in self._chunks(messages):
+                yield from validate_chunk(base, chunk, self.fix_version, self.columnar)
+                base += len(chunk)
+            return
+
+        pool = self._executor()
+        pending: "deque[Future]" = deque()
+        base = 0
+        for chunk in self._chunks(messages):
+            if len(pending) >= self.max_pending:
+                yield from self._drain(pending, ordered)
+            pending.append(pool.submit(validate_chunk, base, chunk, self.fix_version, self.columnar))
+            base += len(chunk)
+        while pending:
+            yield from self._drain(pending, ordered)
+
+    @staticmethod
+    def _drain(pending: "deque[Future]", ordered: bool) -> Iterator[Dict[str, Any]]:
+        """Yield results of the oldest chunk (ordered) or of whichever chunks finished first."""
+        if ordered:
+            yield from pending.popleft().result()
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            pending.remove(fut)
+            yield from fut.result()
+
+    def validate_file(self, path: Union[str, os.PathLike], ordered: bool = True,
+                      verify_checksum: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream-frame a FIX log and validate every message across the pool."""
+        reader = FixStreamReader(path, verify_checksum=verify_checksum)
+        return self.validate(reader.frames(), ordered=ordered)
+
+
+def validate_bulk(messages: Iterable[RawMessage], workers: Optional[int] = None,
+                  ordered: bool = True, fix_version: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Validate a collection of raw messages across a process pool and return all results."""
+    with BulkValidationEngine(workers=workers, fix_version=fix_version) as engine:
+        return list(engine.validate(messages, ordered=ordered))
@@ -0,0 +1,452 @@
+"""
+Columnar Batch Validation
+
+Batch mode of validate_fix: N payloads of one MsgType are turned into a
+ColumnTable (tag -> wire-string array plus presence mask, with numeric views
+built on demand) and every message-spec and rules.json constraint
+(present/must_have/one-of/in/equals/equation, if/then/else, if_any_of, cases,
+all_of) is evaluated as a NumPy mask over the whole batch. Error strings are
+only rendered for failing rows, and match validate_fix message for message.
+
+    results = validate_fix_batch("8", payloads)          # one MsgType
+    results = validate_batch(messages)                   # mixed, grouped internally
+
+Requires numpy.
+"""
+
+from operator import methodcaller
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .fix_engine import SpecsRegistry, _compile_equation_terms, _context_errors, _to_float, _value_str
+
+# A vectorized check takes (table, active rows mask) and returns
+# [(failing rows mask, render(row) -> error string), ...] in check order.
+Failure = Tuple[np.ndarray, Callable[[int], str]]
+VCheck = Callable[["ColumnTable", np.ndarray], List[Failure]]
+VCond = Callable[["ColumnTable"], np.ndarray]
+
+
+class ColumnTable:
+    """
+    Columnar view of a list of payloads.
+
+    Each tag becomes an object array of its raw values plus a presence mask;
+    wire-string and float views are derived on demand. The tags a validator
+    needs are gathered in one row-wise pass (each payload dict is touched once
+    while it is hot in cache); any other tag is loaded lazily.
+    """
+
+    def __init__(self, payloads: Sequence[Dict[str, Any]], tags: Sequence[str] = ()):
+        self.payloads = payloads
+        self.n = len(payloads)
+        self._raw: Dict[str, np.ndarray] = {}
+        self._present: Dict[str, np.ndarray] = {}
+        self._values: Dict[str, np.ndarray] = {}
+        self._numbers: Dict[Tuple[str, float], np.ndarray] = {}
+        tags = tuple(tags)
+        if tags and self.n:
+            rows = [tuple(map(p.get, tags)) for p in payloads]
+            try:
+                grid = np.array(rows, dtype=object)
+            except ValueError:
+                grid = None
+            if grid is not None and grid.shape == (self.n, len(tags)):
+                for j, tag in enumerate(tags):
+                    self._raw[tag] = grid[:, j]
+
+    def raw(self, tag: str) -> np.ndarray:
+        col = self._raw.get(tag)
+        if col is None:
+            col = self._raw[tag] = np.fromiter(map(methodcaller("get", tag), self.payloads), dtype=object, count=self.n)
+        return col
+
+    def present(self, tag: str) -> np.ndarray:
+        mask = self._present.get(tag)
+        if mask is None:
+            mask = self._present[tag] = self.raw(tag) != None  # noqa: E711 (elementwise)
+        return mask
+
+    def values(self, tag: str) -> np.ndarray:
+        """Wire strings as _value_str renders them (missing -> "None", 2.0 -> "2")."""
+        col = self._values.get(tag)
+        if col is None:
+            raw = self.raw(tag)
+            if set(map(type, raw)) <= _PLAIN:
+                col = np.where(self.present(tag), raw, "None")
+            else:
+                col = _VALUE_STR(raw)
+            self._values[tag] = col
+        return col
+
+    def numbers(self, tag: str, default: float) -> np.ndarray:
+        """Float column with _to_float semantics (missing or non-numeric -> default)."""
+        key = (tag, default)
+        col = self._numbers.get(key)
+        if col is None:
+            raw = self.raw(tag)
+            try:
+                col = np.where(self.present(tag), raw.astype(np.float64), default)
+            except (TypeError, ValueError):
+                col = np.fromiter((_to_float(v, default) for v in raw), dtype=np.float64, count=self.n)
+            self._numbers[key] = col
+        return col
+
+
+_PLAIN = {str, type(None)}
+_VALUE_STR = np.frompyfunc(_value_str, 1, 1)
+
+
+def _isin(values: np.ndarray, allowed: Tuple[str, ...]) -> np.ndarray:
+    """values in allowed, elementwise (object arrays compare without copying to unicode)."""
+    if len(allowed) > 8:
+        return _CONTAINS(values, frozenset(allowed)).astype(bool)
+    out = values == allowed[0]
+    for a in allowed[1:]:
+        out |= values == a
+    return out
+
+
+_CONTAINS = np.frompyfunc(lambda v, allowed: v in allowed, 2, 1)
+
+
+# ---------- Constraint compilation (mirrors fix_engine._compile_constraint) ----------
+
+def _v_present(tags: List[Any]) -> VCheck:
+    keys = tuple(str(t) for t in tags)
+
+    def check(table: ColumnTable, active: np.ndarray) -> List[Failure]:
+        missing = {k: ~table.present(k) for k in keys}
+        fail = active.copy()
+        any_missing = np.zeros(table.n, dtype=bool)
+        for m in missing.values():
+            any_missing |= m
+        fail &= any_missing
+        return [(fail, lambda i: f"Missing required: {','.join(k for k in keys if missing[k][i])}")]
+    return check
+
+
+def _v_one_of(tags: List[Any]) -> VCheck:
+    keys = tuple(str(t) for t in tags)
+    msg = f"One of required: {','.join(keys)}"
+
+    def check(table: ColumnTable, active: np.ndarray) -> List[Failure]:
+        found = np.zeros(table.n, dtype=bool)
+        for k in keys:
+            found |= table.present(k)
+        return [(active & ~found, lambda i: msg)]
+    return check
+
+
+def _v_in(mapping: Dict[str, Any]) -> List[VCheck]:
+    checks = []
+    for tag, arr in mapping.items():
+        key = str(tag)
+        allowed = tuple(sorted({str(x) for x in arr}))
+        msg = f"Invalid value for {tag}. Expected one of {','.join(map(str, arr))}"
+
+        def check(table: ColumnTable, active: np.ndarray, key=key, allowed=allowed, msg=msg) -> List[Failure]:
+            return [(active & ~_isin(table.values(key), allowed), lambda i: msg)]
+        checks.append(check)
+    return checks
+
+
+def _v_equals(mapping: Dict[str, Any]) -> List[VCheck]:
+    checks = []
+    for tag, val in mapping.items():
+        key = str(tag)
+        expected = str(val)
+        msg = f"Invalid value for {tag}. Expected {val}"
+
+        def check(table: ColumnTable, active: np.ndarray, key=key, expected=expected, msg=msg) -> List[Failure]:
+            return [(active & (table.values(key) != expected), lambda i: msg)]
+        checks.append(check)
+    return checks
+
+
+def _v_equation(eq: Dict[str, Any]) -> VCheck:
+    terms = _compile_equation_terms(eq["lhs"])
+    rhs_tag = str(eq["equals"])
+    prefix = f"Equation failed: {' '.join(map(str, eq['lhs']))} = {eq['equals']}"
+
+    def check(table: ColumnTable, active: np.ndarray) -> List[Failure]:
+        total = np.zeros(table.n, dtype=np.float64)
+        for tag, sign in terms:
+            total = total + sign * table.numbers(tag, 0.0)
+        rhs = table.numbers(rhs_tag, float("nan"))
+        fail = active & ~(rhs == total)
+        return [(fail, lambda i: f"{prefix} ({float(total[i])} != {float(rhs[i])})")]
+    return check
+
+
+def _v_cond(cond: Optional[Dict[str, Any]]) -> Optional[VCond]:
+    """Compile an if-condition to a row mask; None for conditions that can never hold."""
+    if not cond or not isinstance(cond, dict):
+        return None
+    pairs: List[Tuple[str, Tuple[str, ...]]] = []
+    if "equals" in cond or "in" in cond:
+        for tag, val in (cond.get("equals") or {}).items():
+            pairs.append((str(tag), (str(val),)))
+        for tag, arr in (cond.get("in") or {}).items():
+            pairs.append((str(tag), tuple(sorted({str(x) for x in arr}))))
+    else:
+        for tag, val in cond.items():
+            pairs.append((str(tag), (str(val),)))
+    if not pairs:
+        return None
+
+    def mask(table: ColumnTable) -> np.ndarray:
+        out = np.ones(table.n, dtype=bool)
+        for key, allowed in pairs:
+            out &= _isin(table.values(key), allowed)
+        return out
+    return mask
+
+
+def _v_then(th: Any) -> List[VCheck]:
+    if not th:
+        return []
+    if isinstance(th, list):
+        checks: List[VCheck] = []
+        for item in th:
+            checks += _v_then(item)
+        return checks
+    checks = []
+    if "present" in th:
+        checks.append(_v_present(th["present"]))
+    if "must_have" in th:
+        checks.append(_v_present(th["must_have"]))
+    if "must_have_one_of" in th:
+        checks.append(_v_one_of(th["must_have_one_of"]))
+    if "in" in th:
+        checks += _v_in(th["in"])
+    if "equals" in th:
+        checks += _v_equals(th["equals"])
+    if "equation" in th:
+        checks.append(_v_equation(th["equation"]))
+    return checks
+
+
+def _v_run(checks: Sequence[VCheck], table: ColumnTable, active: np.ndarray) -> List[Failure]:
+    out: List[Failure] = []
+    for c in checks:
+        out += c(table, active)
+    return out
+
+
+def _v_conditional(cond: Optional[VCond], then: List[VCheck], otherwise: List[VCheck]) -> Optional[VCheck]:
+    if cond is None:
+        if not otherwise:
+            return None
+        return lambda table, active: _v_run(otherwise, table, active)
+
+    def check(table: ColumnTable, active: np.ndarray) -> List[Failure]:
+        hit = cond(table)
+        # a row is in exactly one branch, so concatenating keeps per-row error order
+        return _v_run(then, table, active & hit) + _v_run(otherwise, table, active & ~hit)
+    return check
+
+
+def _v_constraint(c: Dict[str, Any]) -> List[VCheck]:
+    """Vectorized counterpart of fix_engine._compile_constraint (same keys, same order)."""
+    if not isinstance(c, dict):
+        return []
+    checks: List[VCheck] = []
+    if "all_of" in c:
+        for sub in c["all_of"] or []:
+            checks += _v_constraint(sub)
+    if "present" in c:
+        checks.append(_v_present(c["present"]))
+    if "must_have" in c:
+        checks.append(_v_present(c["must_have"]))
+    if "must_have_one_of" in c:
+        checks.append(_v_one_of(c["must_have_one_of"]))
+    if "at_least_one_of_present_to_replace" in c:
+        checks.append(_v_one_of(c["at_least_one_of_present_to_replace"]))
+    if "equation" in c:
+        checks.append(_v_equation(c["equation"]))
+    if "if" in c:
+        chk = _v_conditional(_v_cond(c["if"]), _v_then(c.get("then")), _v_then(c.get("else")))
+        if chk:
+            checks.append(chk)
+    elif "if_any_of" in c:
+        conds = [cd for cd in (_v_cond(x) for x in c["if_any_of"] or []) if cd]
+        if conds:
+            def any_of(table: ColumnTable, conds=tuple(conds)) -> np.ndarray:
+                out = np.zeros(table.n, dtype=bool)
+                for cd in conds:
+                    out |= cd(table)
+                return out
+            chk = _v_conditional(any_of, _v_then(c.get("then")), [])
+            if chk:
+                checks.append(chk)
+    elif "then" in c and "cases" not in c:
+        checks += _v_then(c["then"])
+    if "cases" in c:
+        for k in c["cases"] or []:
+            chk = _v_conditional(_v_cond(k.get("if")), _v_then(k.get("then")), [])
+            if chk:
+                checks.append(chk)
+    return checks
+
+
+def _v_spec_checks(spec: Dict[str, Any], components: Optional[Dict[str, Any]] = None) -> List[VCheck]:
+    """Vectorized counterpart of fix_engine._compile_spec_checks."""
+    components = components or {}
+    checks: List[VCheck] = []
+    req: List[str] = []
+    for x in spec.get("required", []) or []:
+        comp = components.get(str(x))
+        if comp is None:
+            req.append(str(x))
+            continue
+        comp_tags = [str(f["tag"]) for f in comp.get("fields", []) if isinstance(f, dict) and "tag" in f]
+        if comp_tags:
+            checks.append(_v_one_of(comp_tags))
+    if req:
+        checks.insert(0, _v_present(req))
+    for c in spec.get("constraints", []) or []:
+        checks += _v_constraint(c)
+    return checks
+
+
+def _constraint_tags(c: Any, out: Dict[str, None]) -> None:
+    """Collect (in order) every tag a constraint reads, so ColumnTable can gather them in one pass."""
+    if isinstance(c, list):
+        for item in c:
+            _constraint_tags(item, out)
+        return
+    if not isinstance(c, dict):
+        return
+    for key in ("present", "must_have", "must_have_one_of", "at_least_one_of_present_to_replace"):
+        for t in c.get(key) or []:
+            out[str(t)] = None
+    for key in ("in", "equals"):
+        if isinstance(c.get(key), dict):
+            for t in c[key]:
+                out[str(t)] = None
+    eq = c.get("equation")
+    if isinstance(eq, dict):
+        for t, _sign in _compile_equation_terms(eq.get("lhs") or []):
+            out[t] = None
+        out[str(eq.get("equals"))] = None
+    conds = [c["if"]] if "if" in c else list(c.get("if_any_of") or [])
+    for cond in conds:
+        if not isinstance(cond, dict):
+            continue
+        if "equals" in cond or "in" in cond:
+            _constraint_tags(cond, out)
+        else:
+            out.update(dict.fromkeys(map(str, cond)))
+    for key in ("then", "else", "all_of", "cases"):
+        _constraint_tags(c.get(key), out)
+
+
+class ColumnarValidator:
+    """Vectorized message-spec and rule checks for one MsgType."""
+
+    def __init__(self, msg_type: str, spec: Dict[str, Any], rules: Optional[Dict[str, Any]] = None,
+                 components: Optional[Dict[str, Any]] = None):
+        self.msg_type = msg_type
+        self.spec_checks = _v_spec_checks(spec, components)
+        tags: Dict[str, None] = {}
+        for x in spec.get("required", []) or []:
+            comp = (components or {}).get(str(x))
+            fields = comp.get("fields", []) if comp is not None else [{"tag": x}]
+            tags.update((str(f["tag"]), None) for f in fields if isinstance(f, dict) and "tag" in f)
+        _constraint_tags(spec.get("constraints", []), tags)
+        self.rules: List[Tuple[str, Optional[str], List[VCheck]]] = []
+        for r in (rules or {}).get("rules", []):
+            if r.get("applies_to") and msg_type not in r["applies_to"]:
+                continue
+            checks = _v_constraint(r.get("logic", {}))
+            if checks:
+                self.rules.append((r.get("id", ""), r.get("error_on_fail"), checks))
+                _constraint_tags(r.get("logic", {}), tags)
+        self.tags = tuple(tags)
+
+    def validate(self, table: ColumnTable) -> List[List[str]]:
+        """Errors per row, identical to CompiledValidator.validate on each payload."""
+        errors: List[List[str]] = [[] for _ in range(table.n)]
+        everyone = np.ones(table.n, dtype=bool)
+        for fail, render in _v_run(self.spec_checks, table, everyone):
+            for i in np.flatnonzero(fail):
+                errors[i].append(render(i))
+        for _rule_id, message, checks in self.rules:
+            failures = _v_run(checks, table, everyone)
+            any_fail = np.zeros(table.n, dtype=bool)
+            for fail, _ in failures:
+                any_fail |= fail
+            for i in np.flatnonzero(any_fail):
+                if message:
+                    errors[i].append(message)
+                else:
+                    errors[i].append("; ".join(render(i) for fail, render in failures if fail[i]))
+        return errors
+
+
+_VALIDATORS: Dict[Tuple[str, str, str], ColumnarValidator] = {}
+
+
+def get_columnar_validator(msg_type: str, fix_version: Optional[str] = None) -> Optional[ColumnarValidator]:
+    """Cached ColumnarValidator for a MsgType (None if the version has no spec for it)."""
+    loaded = SpecsRegistry(fix_version).current()
+    specs = loaded.specs
+    key = (loaded.fix_version, loaded.spec_version, msg_type)
+    v = _VALIDATORS.get(key)
+    if v is None:
+        spec = loaded.get_message_spec(msg_type)
+        if spec is None:
+            return None
+        if len(_VALIDATORS) > 256:
+            _VALIDATORS.clear()
+        v = _VALIDATORS[key] = ColumnarValidator(msg_type, spec, specs.get("rules"), specs.get("components"))
+    return v
+
+
+def validate_fix_batch(msg_type: str, payloads: Sequence[Dict[str, Any]], known_live_orders: Any = None,
+                       order_book: Any = None, fix_version: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Validate many payloads of one MsgType; returns one {"ok", "errors"} per payload, in order.
+
+    Results equal [validate_fix(msg_type, p, ...) for p in payloads]; the
+    order-context checks for F/G (known_live_orders / order_book) run per
+    message after the vectorized pass.
+    """
+    msg_type = _value_str(msg_type)
+    validator = get_columnar_validator(msg_type, fix_version)
+    if validator is None:
+        return [{"ok": False, "errors": [f"Unknown MsgType {msg_type}"]} for _ in payloads]
+    errors = validator.validate(ColumnTable(payloads, validator.tags))
+    if msg_type in ("F", "G") and (known_live_orders is not None or order_book is not None):
+        if known_live_orders is None:
+            known_live_orders = order_book
+        for p, errs in zip(payloads, errors):
+            original = None
+            if msg_type == "G" and order_book is not None:
+                original = order_book.original_for(_value_str(p.get("41", "")))
+            _context_errors(msg_type, p, original, known_live_orders, errs, [])
+    return [{"ok": not errs, "errors": errs} for errs in errors]
+
+
+def validate_batch(messages: Iterable[Any], fix_version: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Validate a mixed batch of parsed messages (dicts or FixMessage) grouped by MsgType(35).
+
+    Returns {"msgType", "ok", "errors"} per message in input order.
+    """
+    payloads = [m if isinstance(m, dict) else m.to_dict() for m in messages]
+    groups: Dict[str, List[int]] = {}
+    for i, p in enumerate(payloads):
+        mt = p.get("35")
+        groups.setdefault("" if mt is None else _value_str(mt), []).append(i)
+    out: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+    for mt, idx in groups.items():
+        if not mt:
+            results = [{"ok": False, "errors": ["Missing MsgType(35)"]} for _ in idx]
+        else:
+            results = validate_fix_batch(mt, [payloads[i] for i in idx], fix_version=fix_version)
+        for i, r in zip(idx, results):
+            out[i] = {"msgType": mt or None, "ok": r["ok"], "errors": r["errors"]}
+    return out
@@ -0,0 +1,105 @@
+"""
+Engine Executor
+
+Runs CPU-bound engine calls (parse/validate/build/explain) off the event loop
+on a thread or process pool, so a slow message never stalls other requests
+or /healthz. In-flight work is capped at workers + max_queue: once full,
+run() raises Overloaded (the API answers 503 with Retry-After) while
+run(..., wait=True) waits for a free slot instead (used by streams, which
+cannot change their status mid-response).
+
+Mode is "thread" (default), "process" or "inline" (run on the event loop, as
+before). Process workers load specs once at startup (recycle() replaces them
+after a spec reload); engine stage metrics recorded inside process workers
+are not reported by the parent's /metrics.
+"""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from .fix_engine import SpecsRegistry
+from . import metrics
+from .settings import ENGINE_EXECUTOR, ENGINE_MAX_QUEUE, ENGINE_RETRY_AFTER, ENGINE_WORKERS
+
+
+class Overloaded(Exception):
+    """Raised when the engine queue is full; retry_after is the suggested back-off in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Engine queue full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _init_process_worker() -> None:
+    """Process-pool initializer: warm the default spec registry once per worker."""
+    SpecsRegistry()
+
+
+class EngineExecutor:
+    """Bounded offload of synchronous engine calls for async handlers."""
+
+    def __init__(self, mode: Optional[str] = None, workers: Optional[int] = None,
+                 max_queue: Optional[int] = None, retry_after: Optional[int] = None):
+        self.mode = mode or ENGINE_EXECUTOR
+        if self.mode not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown engine executor mode: {self.mode}")
+        self.workers = workers or ENGINE_WORKERS or os.cpu_count() or 1
+        self.max_queue = ENGINE_MAX_QUEUE if max_queue is None else max_queue
+        self.retry_after = retry_after or ENGINE_RETRY_AFTER
+        self.limit = self.workers + self.max_queue
+        self.inflight = 0
+        self._pool: Optional[Executor] = None
+        self._slot_freed: Optional[asyncio.Event] = None
+
+    def _executor(self) -> Executor:
+        # created on first use so preforked servers start their pools after the fork
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_process_worker)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fix-engine")
+        return self._pool
+
+    def recycle(self) -> None:
+        """
+        Replace the process pool after a spec reload; threads share the registry and need nothing.
+
+        Calls already submitted finish on the old workers (and old specs); new
+        calls start fresh workers that load the current specs.
+        """
+        if self.mode == "process" and self._pool is not None:
+            old, self._pool = self._pool, None
+            old.shutdown(wait=False)
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _wait_for_slot(self) -> None:
+        while self.inflight >= self.limit:
+            if self._slot_freed is None:
+                self._slot_freed = asyncio.Event()
+            await self._slot_freed.wait()
+            self._slot_freed.clear()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, wait: bool = False) -> Any:
+        """Run fn(*args) on the pool; raises Overloaded when full unless wait=True."""
+        if self.mode == "inline":
+            return fn(*args)
+        if self.inflight >= self.limit:
+            if not wait:
+                metrics.count_shed()
+                raise Overloaded(self.retry_after)
+            await self._wait_for_slot()
+        self.inflight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), partial(fn, *args))
+        finally:
+            self.inflight -= 1
+            if self._slot_freed is not None:
+                self._slot_freed.set()
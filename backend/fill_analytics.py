@@ -0,0 +1,292 @@
+"""
+Fill Analytics
+
+Columnar, NumPy-vectorized analytics over batches or streams of
+ExecutionReports (35=8). Reports are gathered once into float64 columns for
+CumQty(14), LeavesQty(151), OrderQty(38), LastPx(31), LastQty(32) and
+AvgPx(6) plus integer codes for order (OrderID(37), else ClOrdID(11)) and
+Symbol(55); every metric after that is whole-array arithmetic and grouped
+reductions (bincount / ufunc.at) instead of per-message Python.
+
+    fa = FillAnalytics.from_messages(read_fix_log("session.log"))
+    fa.symbol_summary()      # VWAP, fill rate, time-to-fill per symbol
+    fa.qty_mismatches()      # rows where 14 + 151 != 38
+
+Usage:
+    python -m backend.fill_analytics session.log [--orders]
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .fix_engine import _value_str
+
+NUMERIC_TAGS = {"cum_qty": "14", "leaves_qty": "151", "order_qty": "38",
+                "last_px": "31", "last_qty": "32", "avg_px": "6"}
+# OrdStatus values after which LeavesQty is legitimately 0 regardless of CumQty
+CLOSED_STATUSES = ("3", "4", "8", "C")
+
+
+def _floats(values: List[Any]) -> np.ndarray:
+    """Column of tag values as float64 (missing or unparsable -> NaN)."""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+def _iso_time(value: Any) -> str:
+    """FIX UTCTimestamp (YYYYMMDD-HH:MM:SS[.sss]) or ISO-8601 as a datetime64-parsable string."""
+    if not value:
+        return "NaT"
+    v = str(value).rstrip("Z")
+    if len(v) >= 17 and v[8] == "-" and v[4] != "-":
+        return f"{v[:4]}-{v[4:6]}-{v[6:8]}T{v[9:]}"
+    return v
+
+
+def _times(values: List[Any]) -> np.ndarray:
+    """Column of timestamps as datetime64[ms] (missing or unparsable -> NaT)."""
+    iso = [_iso_time(v) for v in values]
+    try:
+        return np.array(iso, dtype="datetime64[ms]")
+    except ValueError:
+        out = np.empty(len(iso), dtype="datetime64[ms]")
+        for i, v in enumerate(iso):
+            try:
+                out[i] = np.datetime64(v, "ms")
+            except ValueError:
+                out[i] = np.datetime64("NaT")
+        return out
+
+
+def _group_first(codes: np.ndarray, n_groups: int, values: np.ndarray) -> np.ndarray:
+    """values at the first row of each group (rows are in arrival order)."""
+    first = np.full(n_groups, len(codes), dtype=np.int64)
+    np.minimum.at(first, codes, np.arange(len(codes)))
+    return values[first]
+
+
+def _group_last(codes: np.ndarray, n_groups: int, values: np.ndarray) -> np.ndarray:
+    """values at the last row of each group."""
+    last = np.zeros(n_groups, dtype=np.int64)
+    np.maximum.at(last, codes, np.arange(len(codes)))
+    return values[last]
+
+
+class FillAnalytics:
+    """Columns of an ExecutionReport batch plus vectorized fill metrics."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], order_ids: np.ndarray, order_codes: np.ndarray,
+                 symbols: np.ndarray, symbol_codes: np.ndarray):
+        self.columns = columns
+        self.order_ids = order_ids
+        self.order_codes = order_codes
+        self.symbols = symbols
+        self.symbol_codes = symbol_codes
+
+    def __len__(self) -> int:
+        return len(self.order_codes)
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[Any]) -> "FillAnalytics":
+        """
+        Build columns from parsed messages (dicts or FixMessage); non-8 messages are skipped.
+
+        This is the only per-message pass; for very large logs feed a
+        generator (e.g. read_fix_log) so only the columns are held in memory.
+        """
+        raw: Dict[str, List[Any]] = {name: [] for name in NUMERIC_TAGS}
+        orders: List[str] = []
+        symbols: List[str] = []
+        statuses: List[str] = []
+        times: List[Any] = []
+        for msg in messages:
+            d = msg if isinstance(msg, dict) else msg.to_dict()
+            msg_type = d.get("35")
+            if msg_type is not None and _value_str(msg_type) != "8":
+                continue
+            for name, tag in NUMERIC_TAGS.items():
+                raw[name].append(d.get(tag))
+            order = d.get("37") or d.get("11")
+            orders.append("" if order is None else _value_str(order))
+            symbols.append(str(d.get("55", "")))
+            status = d.get("39")
+            statuses.append("" if status is None else _value_str(status))
+            times.append(d.get("60"))
+
+        columns = {name: _floats(values) for name, values in raw.items()}
+        columns["ord_status"] = np.array(statuses, dtype=str)
+        columns["transact_time"] = _times(times)
+        order_ids, order_codes = np.unique(np.array(orders, dtype=str), return_inverse=True)
+        symbol_names, symbol_codes = np.unique(np.array(symbols, dtype=str), return_inverse=True)
+        return cls(columns, order_ids, order_codes.ravel(), symbol_names, symbol_codes.ravel())
+
+    # -- row-level checks ------------------------------------------------
+
+    def qty_mismatches(self, tol: float = 1e-9, include_closed: bool = True) -> np.ndarray:
+        """
+        Row indices where CumQty(14) + LeavesQty(151) != OrderQty(38).
+
+        Rows missing any of the three are not checked. include_closed=False
+        skips Canceled/DoneForDay/Rejected/Expired reports, whose LeavesQty is 0.
+        """
+        c = self.columns
+        diff = np.abs(c["cum_qty"] + c["leaves_qty"] - c["order_qty"])
+        bad = diff > tol   # NaN compares False, so incomplete rows drop out
+        if not include_closed:
+            bad &= ~np.isin(c["ord_status"], CLOSED_STATUSES)
+        return np.flatnonzero(bad)
+
+    def _fills(self) -> np.ndarray:
+        q = self.columns["last_qty"]
+        return (q > 0) & ~np.isnan(self.columns["last_px"])
+
+    def expected_avg_px(self) -> np.ndarray:
+        """Running volume-weighted LastPx per order at each row (NaN before the first fill)."""
+        c = self.columns
+        fills = self._fills()
+        qty = np.where(fills, c["last_qty"], 0.0)
+        notional = np.where(fills, c["last_qty"] * c["last_px"], 0.0)
+        # stable sort by order so cumulative sums run within each order in arrival order
+        order = np.argsort(self.order_codes, kind="stable")
+        codes = self.order_codes[order]
+        cum_qty = np.cumsum(qty[order])
+        cum_notional = np.cumsum(notional[order])
+        starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+        offsets_q = np.repeat(np.r_[0.0, cum_qty][starts], np.diff(np.r_[starts, len(codes)]))
+        offsets_n = np.repeat(np.r_[0.0, cum_notional][starts], np.diff(np.r_[starts, len(codes)]))
+        grp_qty = cum_qty - offsets_q
+        grp_notional = cum_notional - offsets_n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            expected_sorted = np.where(grp_qty > 0, grp_notional / grp_qty, np.nan)
+        expected = np.empty_like(expected_sorted)
+        expected[order] = expected_sorted
+        return expected
+
+    def avg_px_mismatches(self, rel_tol: float = 1e-4, abs_tol: float = 1e-6) -> np.ndarray:
+        """Row indices whose AvgPx(6) differs from the running VWAP of the order's fills."""
+        expected = self.expected_avg_px()
+        reported = self.columns["avg_px"]
+        bad = np.abs(reported - expected) > np.maximum(abs_tol, rel_tol * np.abs(expected))
+        return np.flatnonzero(bad)
+
+    # -- per-order / per-symbol aggregates -------------------------------
+
+    def order_metrics(self) -> Dict[str, np.ndarray]:
+        """Per order: VWAP, filled and ordered quantity, fill rate, time-to-fill (s), symbol."""
+        c = self.columns
+        n = len(self.order_ids)
+        fills = self._fills()
+        codes = self.order_codes
+        filled = np.bincount(codes[fills], weights=c["last_qty"][fills], minlength=n)
+        notional = np.bincount(codes[fills], weights=(c["last_qty"] * c["last_px"])[fills], minlength=n)
+        order_qty = _group_last(codes, n, c["order_qty"])
+        # reports without LastQty still carry CumQty: take the larger of the two views
+        last_cum = _group_last(codes, n, np.nan_to_num(c["cum_qty"]))
+        filled_qty = np.maximum(filled, last_cum)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(filled > 0, notional / filled, np.nan)
+            fill_rate = np.where(order_qty > 0, filled_qty / order_qty, np.nan)
+
+        times = c["transact_time"].astype(np.int64)
+        valid_time = ~np.isnat(c["transact_time"])
+        first_ms = np.full(n, np.iinfo(np.int64).max)
+        np.minimum.at(first_ms, codes[valid_time], times[valid_time])
+        done = valid_time & (c["ord_status"] == "2")
+        done_ms = np.full(n, np.iinfo(np.int64).max)
+        np.minimum.at(done_ms, codes[done], times[done])
+        reached = done_ms != np.iinfo(np.int64).max
+        time_to_fill = np.where(reached, (done_ms - first_ms) / 1000.0, np.nan)
+
+        return {
+            "order_id": self.order_ids,
+            "symbol": self.symbols[_group_first(codes, n, self.symbol_codes)] if n else self.symbols,
+            "order_qty": order_qty,
+            "filled_qty": filled_qty,
+            "fill_rate": fill_rate,
+            "vwap": vwap,
+            "time_to_fill": time_to_fill,
+        }
+
+    def symbol_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per symbol: VWAP, fill counts, ordered/filled quantity, fill rate and time-to-fill stats."""
+        c = self.columns
+        n_sym = len(self.symbols)
+        fills = self._fills()
+        sc = self.symbol_codes
+        volume = np.bincount(sc[fills], weights=c["last_qty"][fills], minlength=n_sym)
+        notional = np.bincount(sc[fills], weights=(c["last_qty"] * c["last_px"])[fills], minlength=n_sym)
+        n_fills = np.bincount(sc[fills], minlength=n_sym)
+
+        orders = self.order_metrics()
+        order_sym = np.searchsorted(self.symbols, orders["symbol"]) if len(self.order_ids) else np.array([], dtype=np.int64)
+        has_qty = ~np.isnan(orders["order_qty"])
+        ordered = np.bincount(order_sym[has_qty], weights=orders["order_qty"][has_qty], minlength=n_sym)
+        filled = np.bincount(order_sym[has_qty], weights=orders["filled_qty"][has_qty], minlength=n_sym)
+        n_orders = np.bincount(order_sym, minlength=n_sym)
+        ttf = orders["time_to_fill"]
+
+        out: Dict[str, Dict[str, Any]] = {}
+        for i, sym in enumerate(self.symbols):
+            sym_ttf = ttf[(order_sym == i) & ~np.isnan(ttf)]
+            out[str(sym)] = {
+                "orders": int(n_orders[i]),
+                "fills": int(n_fills[i]),
+                "volume": float(volume[i]),
+                "vwap": float(notional[i] / volume[i]) if volume[i] else None,
+                "orderedQty": float(ordered[i]),
+                "filledQty": float(filled[i]),
+                "fillRate": float(filled[i] / ordered[i]) if ordered[i] else None,
+                "medianTimeToFill": float(np.median(sym_ttf)) if len(sym_ttf) else None,
+                "p95TimeToFill": float(np.percentile(sym_ttf, 95)) if len(sym_ttf) else None,
+            }
+        return out
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly report: counts, consistency failures and the per-symbol table."""
+        return {
+            "reports": len(self),
+            "orders": len(self.order_ids),
+            "qtyMismatches": int(len(self.qty_mismatches())),
+            "avgPxMismatches": int(len(self.avg_px_mismatches())),
+            "symbols": self.symbol_summary(),
+        }
+
+
+def analyze(messages: Iterable[Any]) -> Dict[str, Any]:
+    """One-shot summary of an iterable of parsed ExecutionReports."""
+    return FillAnalytics.from_messages(messages).summary()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .fix_stream import read_fix_log
+
+    parser = argparse.ArgumentParser(description="Vectorized fill analytics (VWAP, fill rate, time-to-fill) over a FIX log.")
+    parser.add_argument("path", help="FIX log file, or '-' for stdin")
+    parser.add_argument("--orders", action="store_true", help="also print per-order metrics as NDJSON")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin.buffer if args.path == "-" else args.path
+    fa = FillAnalytics.from_messages(read_fix_log(source))
+    print(json.dumps(fa.summary(), indent=2))
+    if args.orders:
+        metrics = fa.order_metrics()
+        for i in range(len(fa.order_ids)):
+            row = {k: (v[i].item() if hasattr(v[i], "item") else v[i]) for k, v in metrics.items()}
+            print(json.dumps({k: (None if isinstance(v, float) and v != v else v) for k, v in row.items()}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,51 +2,408 @@
 FIX Engine Core Module
 
 Provides core FIX protocol functionality including parsing, validation, building,
-and execution report explanation. Uses a singleton SpecsRegistry for efficient
-JSON spec loading.
+and execution report explanation. Uses a per-version SpecsRegistry (one shared
+instance per FIX version, loaded on demand) for efficient JSON spec loading.
 """
 
+import bisect
+import hashlib
+import heapq
 import json
+import logging
+import marshal
+import math
 import os
 import re
-from typing import Dict, Any, List, Optional, Union
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
 
 SOH = "\x01"
 
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout changes so stale files are rebuilt
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_NAME = ".specs.snapshot"
+
+DEFAULT_FIX_VERSION = os.getenv("DEFAULT_FIX_VERSION", "4.4")
+# Loaded versions are evicted least-recently-used once their spec sources exceed this
+SPECS_MEMORY_BUDGET = int(float(os.getenv("FIX_SPECS_MEMORY_BUDGET_MB", "64")) * 1024 * 1024)
+
+# BeginString(8) per FIX version; 5.0 application versions ride on the FIXT.1.1 session layer
+BEGIN_STRINGS = {"4.2": "FIX.4.2", "4.4": "FIX.4.4", "5.0SP2": "FIXT.1.1"}
+
+# Instrumentation sink (see metrics.py); None leaves the hot paths untouched
+_metrics: Any = None
+
+
+def set_metrics_sink(sink: Any) -> None:
+    """Install (or clear with None) the object receiving engine stage timings and rule failures."""
+    global _metrics
+    _metrics = sink
+
+
+def begin_string_for(fix_version: Optional[str] = None) -> str:
+    """BeginString(8) for a FIX version (e.g. '4.4' -> 'FIX.4.4')."""
+    version = fix_version or DEFAULT_FIX_VERSION
+    return BEGIN_STRINGS.get(version, f"FIX.{version}")
+
+
+class LoadedSpecs:
+    """
+    One immutable load of a version's specs: parsed JSON, compiled validators,
+    field indexes and a spec_version derived from the source files.
+
+    SpecsRegistry swaps whole LoadedSpecs objects on reload, so a caller holding
+    one (or running under SpecsRegistry.pin) sees a consistent spec set.
+    """
+
+    __slots__ = ("fix_version", "spec_version", "specs", "validators", "indexes", "fingerprint", "size",
+                 "load_seconds", "search_index", "_decoder", "_fixml")
+
+    def __init__(self, fix_version: str, specs: Dict[str, Any], validators: Dict[str, "CompiledValidator"],
+                 indexes: Dict[str, Any], fingerprint: List[Tuple[str, int, int]], load_seconds: float):
+        self.fix_version = fix_version
+        self.specs = specs
+        self.validators = validators
+        self.indexes = indexes
+        self.fingerprint = fingerprint
+        self.size = sum(size for _, _, size in fingerprint)
+        self.spec_version = hashlib.sha1(repr(fingerprint).encode()).hexdigest()[:12]
+        self.load_seconds = load_seconds
+        self.search_index = SearchIndex.from_specs(specs)
+        self._decoder: Optional["FieldDecoder"] = None
+        self._fixml: Optional["FixmlTables"] = None
+
+    def get_message_spec(self, msg_type: str) -> Optional[Dict[str, Any]]:
+        """Get message specification by message type."""
+        return self.specs["messages"].get(msg_type)
+
+    def get_validator(self, msg_type: str) -> Optional["CompiledValidator"]:
+        """Get the precompiled validator for a message type."""
+        return self.validators.get(msg_type)
+
+    def get_decoder(self) -> "FieldDecoder":
+        """Typed field decoder for this version, compiled from the data dictionary on first use."""
+        if self._decoder is None:
+            self._decoder = FieldDecoder.from_specs(self.specs)
+        return self._decoder
+
+    def get_fixml_tables(self) -> "FixmlTables":
+        """Tag <-> FIXML name tables for this version, built on first use."""
+        if self._fixml is None:
+            self._fixml = FixmlTables.from_specs(self.specs)
+        return self._fixml
+
+    def get_component(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get component specification by name."""
+        return self.specs["components"].get(name)
+
+    def lookup_tag(self, tag_or_name: str) -> Any:
+        """Returns the field entry from fields.json/core_fields.json by tag (e.g., '99'), by name (e.g., 'StopPx') or by FIXML element (e.g., 'StopPx')."""
+        tag = self.resolve_tag(tag_or_name)
+        return self.indexes["fields"][tag] if tag is not None else None
+
+    def resolve_tag(self, tag_or_name: Any) -> Optional[str]:
+        """Resolve a tag number, field name (case-insensitive) or FIXML element to its tag."""
+        key = str(tag_or_name)
+        idx = self.indexes
+        if key in idx["fields"]:
+            return key
+        tag = idx["by_name"].get(key.lower())
+        if tag is None:
+            tag = idx["by_fixml"].get(key)
+        return tag
+
+    def tag_for_fixml(self, element: str) -> Optional[str]:
+        """Get the tag for a FIXML element/attribute name (e.g., 'Px' -> '44')."""
+        return self.indexes["by_fixml"].get(element)
+
+    def enum_meaning(self, tag: Any, code: Any) -> Optional[str]:
+        """Get the meaning of an enum code for a tag (e.g., ('54', '1') -> 'Buy')."""
+        return self.indexes["enums"].get((str(tag), str(code)))
+
+    def order_state(self, exec_type: Any, ord_status: Any) -> Optional[Dict[str, Any]]:
+        """Get the order_state.json row for an (ExecType, OrdStatus) pair."""
+        return self.indexes["order_states"].get((str(exec_type), str(ord_status)))
+
+    def lookup_tags(self, tags_or_names: List[Any]) -> Dict[str, Any]:
+        """Bulk lookup_tag: maps each requested key to its field entry (or None)."""
+        fields = self.indexes["fields"]
+        out: Dict[str, Any] = {}
+        for k in tags_or_names:
+            tag = self.resolve_tag(k)
+            out[str(k)] = fields[tag] if tag is not None else None
+        return out
+
+    def enum_meanings(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        """Bulk enum_meaning over a parsed message: {tag: meaning} for every enumerated value."""
+        enums = self.indexes["enums"]
+        out: Dict[str, str] = {}
+        for tag, val in payload.items():
+            meaning = enums.get((str(tag), _value_str(val)))
+            if meaning is not None:
+                out[str(tag)] = meaning
+        return out
+
+    def search(self, query: str, limit: int = 10, kinds: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Ranked full-text search over fields, enum values, components and messages (see SearchIndex)."""
+        return self.search_index.search(query, limit, kinds)
+
+
+# Per-thread pins set by SpecsRegistry.pin(): {fix_version: LoadedSpecs}
+_pinned = threading.local()
+
 
 class SpecsRegistry:
-    """Singleton registry for FIX knowledge base specs."""
+    """
+    Registry for FIX knowledge base specs, one shared instance per FIX version.
+
+    SpecsRegistry() returns the default version; SpecsRegistry("4.2") loads
+    specs/fix_knowledge/fix4.2 on first use. Versions are kept in LRU order and
+    the least recently used are dropped once the loaded spec sources exceed
+    FIX_SPECS_MEMORY_BUDGET_MB. Identical field definitions are shared between
+    versions.
+
+    The loaded specs live in an immutable LoadedSpecs; reload() builds a new
+    one from disk and swaps it in with a single assignment, so readers never
+    see a half-updated spec set. pin() keeps a thread on one LoadedSpecs for
+    the duration of a request.
+    """
     
-    _instance = None
-    _specs = None
+    _instances: "OrderedDict[str, SpecsRegistry]" = OrderedDict()
+    _shared_fields: Dict[Tuple[str, bytes], Dict[str, Any]] = {}
+    _lock = threading.Lock()
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(SpecsRegistry, cls).__new__(cls)
-        return cls._instance
+    def __new__(cls, fix_version: Optional[str] = None):
+        version = fix_version or DEFAULT_FIX_VERSION
+        with cls._lock:
+            inst = cls._instances.get(version)
+            if inst is None:
+                inst = super(SpecsRegistry, cls).__new__(cls)
+                inst.fix_version = version
+                inst._loaded = None
+                inst._reload_lock = threading.Lock()
+                cls._instances[version] = inst
+            cls._instances.move_to_end(version)
+        return inst
     
-    def __init__(self):
-        if self._specs is None:
-            self._specs = self._load_specs()
+    def __init__(self, fix_version: Optional[str] = None):
+        if self._loaded is None:
+            try:
+                with self._reload_lock:
+                    if self._loaded is None:
+                        self._loaded = self._load(self._find_base_dir(self.fix_version))
+            except FileNotFoundError:
+                with self._lock:
+                    self._instances.pop(self.fix_version, None)
+                raise
+            self._evict()
     
-    def _load_specs(self) -> Dict[str, Any]:
-        """Load all JSON specs from the knowledge base directory."""
-        # Try relative paths first, then absolute paths
+    def _load(self, base_dir: str, fingerprint: Optional[List[Tuple[str, int, int]]] = None) -> LoadedSpecs:
+        """Load (snapshot file or JSON) and compile one LoadedSpecs."""
+        started = time.perf_counter()
+        if fingerprint is None:
+            fingerprint = self._source_fingerprint(base_dir)
+        specs, indexes = self._load_snapshot_or_specs(base_dir, fingerprint)
+        self._share_fields(specs, indexes)
+        validators = self._compile_validators(specs)
+        return LoadedSpecs(self.fix_version, specs, validators, indexes, fingerprint,
+                           time.perf_counter() - started)
+    
+    def reload(self, force: bool = False) -> LoadedSpecs:
+        """
+        Rebuild from disk if the spec sources changed (always with force) and swap it in.
+
+        Returns the current LoadedSpecs (the same object when nothing changed).
+        Errors leave the previous specs in place. Calls holding the old
+        LoadedSpecs, or pinned to it, finish on it.
+        """
+        with self._reload_lock:
+            old = self._loaded
+            base_dir = self._find_base_dir(self.fix_version)
+            fingerprint = self._source_fingerprint(base_dir)
+            if old is not None and not force and fingerprint == old.fingerprint:
+                return old
+            new = self._load(base_dir, fingerprint)
+            self._loaded = new
+        self._evict()
+        logger.info(f"Reloaded FIX {self.fix_version} specs: {old.spec_version if old else None} -> "
+                    f"{new.spec_version} ({new.load_seconds * 1000:.1f} ms)")
+        return new
+    
+    def current(self) -> LoadedSpecs:
+        """The LoadedSpecs this thread should use: its pin, if any, else the latest."""
+        pins = getattr(_pinned, "by_version", None)
+        if pins:
+            loaded = pins.get(self.fix_version)
+            if loaded is not None:
+                return loaded
+        return self._loaded
+    
+    @contextmanager
+    def pin(self, loaded: Optional[LoadedSpecs] = None) -> Iterator[LoadedSpecs]:
+        """Keep this thread on one LoadedSpecs (default: current()) until the block exits."""
+        loaded = loaded or self.current()
+        pins = _pinned.__dict__.setdefault("by_version", {})
+        previous = pins.get(self.fix_version)
+        pins[self.fix_version] = loaded
+        try:
+            yield loaded
+        finally:
+            if previous is None:
+                del pins[self.fix_version]
+            else:
+                pins[self.fix_version] = previous
+    
+    @property
+    def spec_version(self) -> str:
+        """Version id of the current specs (a hash of the source files' paths, mtimes and sizes)."""
+        return self.current().spec_version
+    
+    @property
+    def load_seconds(self) -> float:
+        return self.current().load_seconds
+    
+    @classmethod
+    def loaded_versions(cls) -> List[str]:
+        """Loaded versions, least recently used first."""
+        return [v for v, inst in cls._instances.items() if inst._loaded is not None]
+    
+    @classmethod
+    def _evict(cls) -> None:
+        """Drop least recently used versions while over the memory budget (the newest always stays)."""
+        with cls._lock:
+            loaded = [v for v, inst in cls._instances.items() if inst._loaded is not None]
+            total = sum(cls._instances[v]._loaded.size for v in loaded)
+            for version in loaded[:-1]:
+                if total <= SPECS_MEMORY_BUDGET:
+                    break
+                total -= cls._instances.pop(version)._loaded.size
+                logger.info(f"Evicted FIX {version} specs from the registry")
+            live = {id(e) for inst in cls._instances.values() if inst._loaded is not None
+                    for e in inst._loaded.specs.get("fields_json", {}).get("fields", {}).values()}
+            for key in [k for k, e in cls._shared_fields.items() if id(e) not in live]:
+                del cls._shared_fields[key]
+    
+    @classmethod
+    def _share_fields(cls, specs: Dict[str, Any], indexes: Dict[str, Any]) -> None:
+        """Replace field definitions identical to ones already loaded for another version with the shared copy."""
+        fields = specs.get("fields_json", {}).get("fields", {})
+        with cls._lock:
+            for tag, entry in fields.items():
+                key = (tag, marshal.dumps(entry))
+                shared = cls._shared_fields.setdefault(key, entry)
+                if shared is not entry:
+                    fields[tag] = shared
+        indexes["fields"] = fields
+    
+    @staticmethod
+    def _find_base_dir(fix_version: Optional[str] = None) -> str:
+        """Locate a version's knowledge base directory (under FIX_SPECS_ROOT, next to this module, then CWD)."""
+        sub = f"fix{fix_version or DEFAULT_FIX_VERSION}"
         possible_paths = [
-            "specs/fix_knowledge/fix4.4",
-            "backend/specs/fix_knowledge/fix4.4",
-            os.path.join(os.path.dirname(__file__), "specs/fix_knowledge/fix4.4")
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "specs/fix_knowledge", sub),
+            os.path.join("specs/fix_knowledge", sub),
+            os.path.join("backend/specs/fix_knowledge", sub),
         ]
+        if os.getenv("FIX_SPECS_ROOT"):
+            possible_paths.insert(0, os.path.join(os.environ["FIX_SPECS_ROOT"], sub))
         
-        base_dir = None
         for path in possible_paths:
             if os.path.isdir(path):
-                base_dir = path
-                break
-                
-        if not base_dir:
-            raise FileNotFoundError(f"Knowledge dir not found. Tried: {', '.join(possible_paths)}")
+                return path
+        raise FileNotFoundError(f"Knowledge dir not found. Tried: {', '.join(possible_paths)}")
+    
+    @staticmethod
+    def _source_fingerprint(base_dir: str) -> List[Tuple[str, int, int]]:
+        """(relative path, mtime_ns, size) of every JSON source file; cheap to compute, no parsing."""
+        out = []
+        for sub in ("", "components", "messages"):
+            d = os.path.join(base_dir, sub)
+            if not os.path.isdir(d):
+                continue
+            for fn in sorted(os.listdir(d)):
+                if fn.endswith(".json"):
+                    st = os.stat(os.path.join(d, fn))
+                    out.append((os.path.join(sub, fn), st.st_mtime_ns, st.st_size))
+        return out
+    
+    @classmethod
+    def build_snapshot(cls, fix_version: Optional[str] = None, path: Optional[str] = None) -> str:
+        """Compile a version's spec directory into a single snapshot file; returns its path."""
+        base_dir = cls._find_base_dir(fix_version)
+        path = path or os.path.join(base_dir, SNAPSHOT_NAME)
+        specs = cls._load_specs(base_dir)
+        indexes = cls._build_field_indexes(specs)
+        cls._write_snapshot(path, cls._source_fingerprint(base_dir), specs, indexes)
+        return path
+    
+    @staticmethod
+    def _write_snapshot(path: str, fingerprint: List[Tuple[str, int, int]],
+                        specs: Dict[str, Any], indexes: Dict[str, Any]) -> None:
+        """Write the snapshot atomically (temp file + rename)."""
+        # fields is shared with fields_json; re-linked on load instead of stored twice
+        indexes = {k: v for k, v in indexes.items() if k != "fields"}
+        blob = marshal.dumps({
+            "format": SNAPSHOT_FORMAT,
+            "python": list(sys.version_info[:2]),
+            "fingerprint": [list(x) for x in fingerprint],
+            "specs": specs,
+            "indexes": indexes,
+        })
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+    
+    @classmethod
+    def _load_snapshot_or_specs(cls, base_dir: str, fingerprint: Optional[List[Tuple[str, int, int]]] = None
+                                ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Load specs and indexes from the snapshot when it matches the source JSON.
+
+        A missing, stale or unreadable snapshot falls back to parsing the JSON
+        and rewrites the snapshot (best effort; a read-only tree just skips it).
+        Set FIX_SPECS_SNAPSHOT=0 to disable snapshots.
+        """
+        if os.getenv("FIX_SPECS_SNAPSHOT", "") == "0":
+            specs = cls._load_specs(base_dir)
+            return specs, cls._build_field_indexes(specs)
+        path = os.path.join(base_dir, SNAPSHOT_NAME)
+        if fingerprint is None:
+            fingerprint = cls._source_fingerprint(base_dir)
+        
+        try:
+            with open(path, "rb") as f:
+                snap = marshal.load(f)
+            if (snap.get("format") == SNAPSHOT_FORMAT and snap.get("python") == list(sys.version_info[:2])
+                    and snap.get("fingerprint") == [list(x) for x in fingerprint]):
+                specs, indexes = snap["specs"], snap["indexes"]
+                specs["base_dir"] = base_dir
+                indexes["fields"] = specs.get("fields_json", {}).get("fields", {})
+                return specs, indexes
+        except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+            pass
         
+        specs = cls._load_specs(base_dir)
+        indexes = cls._build_field_indexes(specs)
+        try:
+            cls._write_snapshot(path, fingerprint, specs, indexes)
+        except OSError as e:
+            logger.warning(f"Could not write spec snapshot {path}: {e}")
+        return specs, indexes
+    
+    @staticmethod
+    def _load_specs(base_dir: str) -> Dict[str, Any]:
+        """Load all JSON specs from the knowledge base directory."""
         # fields or core_fields
         fields_path = None
         for cand in ("fields.json", "core_fields.json"):
@@ -108,33 +465,150 @@ class SpecsRegistry:
             "order_state": order_state,
         }
     
+    @staticmethod
+    def _compile_validators(specs: Dict[str, Any]) -> Dict[str, "CompiledValidator"]:
+        """Precompile one validator per MsgType (message spec + applicable rules)."""
+        return {
+            mt: compile_validator(mt, spec, specs.get("rules"), specs.get("components"))
+            for mt, spec in specs["messages"].items()
+        }
+    
+    @staticmethod
+    def _build_field_indexes(specs: Dict[str, Any]) -> Dict[str, Dict[Any, Any]]:
+        """Build reverse indexes over fields.json: name, FIXML element and enum code lookups."""
+        fields = specs.get("fields_json", {}).get("fields", {})
+        by_name: Dict[str, str] = {}
+        by_fixml: Dict[str, str] = {}
+        enums: Dict[Tuple[str, str], str] = {}
+        for tag, entry in fields.items():
+            if not isinstance(entry, dict):
+                continue
+            name = entry.get("name")
+            if name:
+                by_name.setdefault(str(name).lower(), tag)
+            elem = entry.get("fixml_element")
+            if elem:
+                by_fixml.setdefault(str(elem), tag)
+            for key in ("enum", "enum_subset", "enum_hint"):
+                vals = entry.get(key)
+                if not isinstance(vals, list):
+                    continue
+                for e in vals:
+                    if isinstance(e, dict) and "code" in e:
+                        enums.setdefault((tag, str(e["code"])), e.get("meaning", ""))
+        # order_state.json rows keyed by (ExecType, OrdStatus)
+        states: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for row in (specs.get("order_state") or {}).get("states", []):
+            states.setdefault((str(row.get("execType")), str(row.get("ordStatus"))), row)
+        return {"fields": fields, "by_name": by_name, "by_fixml": by_fixml, "enums": enums, "order_states": states}
+    
     @property
     def specs(self) -> Dict[str, Any]:
         """Get the loaded specs."""
-        return self._specs
+        return self.current().specs
     
     def get_message_spec(self, msg_type: str) -> Optional[Dict[str, Any]]:
         """Get message specification by message type."""
-        return self._specs["messages"].get(msg_type)
+        return self.current().get_message_spec(msg_type)
+    
+    def get_validator(self, msg_type: str) -> Optional["CompiledValidator"]:
+        """Get the precompiled validator for a message type."""
+        return self.current().validators.get(msg_type)
+    
+    def get_decoder(self) -> "FieldDecoder":
+        """Typed field decoder for the current specs."""
+        return self.current().get_decoder()
+    
+    def get_fixml_tables(self) -> "FixmlTables":
+        """Tag <-> FIXML name tables for the current specs."""
+        return self.current().get_fixml_tables()
     
     def get_component(self, name: str) -> Optional[Dict[str, Any]]:
         """Get component specification by name."""
-        return self._specs["components"].get(name)
+        return self.current().get_component(name)
     
     def lookup_tag(self, tag_or_name: str) -> Any:
-        """Returns the field entry from fields.json/core_fields.json by tag (e.g., '99') or by name (e.g., 'StopPx')."""
-        fj = self._specs.get("fields_json", {})
-        # Fields are nested under "fields" key
-        fields = fj.get("fields", {})
-        key = str(tag_or_name)
-        # direct by tag
-        if key in fields:
-            return fields[key]
-        # by name (best-effort scan)
-        for k, v in fields.items():
-            if isinstance(v, dict) and str(v.get("name", "")).lower() == key.lower():
-                return v
-        return None
+        """Returns the field entry by tag, name or FIXML element (see LoadedSpecs.lookup_tag)."""
+        return self.current().lookup_tag(tag_or_name)
+    
+    def resolve_tag(self, tag_or_name: Any) -> Optional[str]:
+        """Resolve a tag number, field name (case-insensitive) or FIXML element to its tag."""
+        return self.current().resolve_tag(tag_or_name)
+    
+    def tag_for_fixml(self, element: str) -> Optional[str]:
+        """Get the tag for a FIXML element/attribute name (e.g., 'Px' -> '44')."""
+        return self.current().tag_for_fixml(element)
+    
+    def enum_meaning(self, tag: Any, code: Any) -> Optional[str]:
+        """Get the meaning of an enum code for a tag (e.g., ('54', '1') -> 'Buy')."""
+        return self.current().enum_meaning(tag, code)
+    
+    def order_state(self, exec_type: Any, ord_status: Any) -> Optional[Dict[str, Any]]:
+        """Get the order_state.json row for an (ExecType, OrdStatus) pair."""
+        return self.current().order_state(exec_type, ord_status)
+    
+    def lookup_tags(self, tags_or_names: List[Any]) -> Dict[str, Any]:
+        """Bulk lookup_tag: maps each requested key to its field entry (or None)."""
+        return self.current().lookup_tags(tags_or_names)
+    
+    def enum_meanings(self, payload: Dict[str, Any]) -> Dict[str, str]:
+        """Bulk enum_meaning over a parsed message: {tag: meaning} for every enumerated value."""
+        return self.current().enum_meanings(payload)
+    
+    def search(self, query: str, limit: int = 10, kinds: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Ranked full-text search over fields, enum values, components and messages."""
+        return self.current().search(query, limit, kinds)
+
+
+class SpecsWatcher:
+    """
+    Background thread that reloads loaded FIX versions whose spec sources changed.
+
+    Every interval seconds it compares each loaded version's source fingerprint
+    (a few stat calls) and calls SpecsRegistry.reload on change; on_reload gets
+    the list of versions that were swapped. A failed reload is logged and the
+    previous specs stay in service.
+    """
+
+    def __init__(self, interval: float = 2.0, on_reload: Optional[Callable[[List[str]], None]] = None):
+        self.interval = interval
+        self.on_reload = on_reload
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> List[str]:
+        """Reload every changed version now; returns the versions that were swapped."""
+        changed = []
+        for version in SpecsRegistry.loaded_versions():
+            registry = SpecsRegistry._instances.get(version)
+            if registry is None:
+                continue
+            before = registry._loaded
+            try:
+                if registry.reload() is not before:
+                    changed.append(version)
+            except Exception as e:
+                logger.error(f"Reloading FIX {version} specs failed, keeping {before.spec_version}: {e}")
+        if changed and self.on_reload is not None:
+            self.on_reload(changed)
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> "SpecsWatcher":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="fix-specs-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
 
 
 def normalize_delims(text: str, to_soh: bool) -> str:
@@ -145,19 +619,684 @@ def normalize_delims(text: str, to_soh: bool) -> str:
         return text.replace(SOH, "|")
 
 
-def parse_fix(fix_str: str) -> Dict[str, Any]:
-    """Parse FIX string into a tag-value dictionary."""
-    s = normalize_delims(fix_str, to_soh=True)
+_NUMERIC_RE = re.compile(r"-?\d+(\.\d+)?")
+
+
+class FixMessage:
+    """
+    Parsed FIX message that keeps wire order, duplicate tags and raw values.
+
+    Fields are stored as parallel arrays (tag, value start, value end) over the
+    original buffer, so parsing copies no values: only each field's short tag
+    slice is taken to convert it to an int, and values are sliced and decoded
+    when accessed. The buffer may be str, bytes, bytearray or mmap. Lookups by
+    tag return the last occurrence, matching the dict view.
+    """
+
+    __slots__ = ("buf", "tags", "starts", "ends", "_index", "_typed")
+
+    def __init__(self, buf: Any, tags: array, starts: array, ends: array):
+        self.buf = buf
+        self.tags = tags
+        self.starts = starts
+        self.ends = ends
+        self._index: Optional[Dict[int, int]] = None
+        self._typed: Optional[Tuple[Any, Dict[int, Any]]] = None
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def __contains__(self, tag: Any) -> bool:
+        return self._pos(tag) is not None
+
+    def __getitem__(self, tag: Any) -> str:
+        i = self._pos(tag)
+        if i is None:
+            raise KeyError(tag)
+        return self.value_at(i)
+
+    def _pos(self, tag: Any) -> Optional[int]:
+        """Position of the last occurrence of tag, via a lazily built index."""
+        if self._index is None:
+            self._index = {t: i for i, t in enumerate(self.tags)}
+        try:
+            return self._index.get(int(tag))
+        except (TypeError, ValueError):
+            return None
+
+    def value_at(self, i: int) -> str:
+        """Decoded value of the i-th field in wire order."""
+        v = self.buf[self.starts[i]:self.ends[i]]
+        return v if isinstance(v, str) else v.decode("utf-8", "replace")
+
+    def raw_at(self, i: int) -> Union[memoryview, str]:
+        """Raw value of the i-th field as a zero-copy memoryview (str slice for str input)."""
+        if isinstance(self.buf, str):
+            return self.buf[self.starts[i]:self.ends[i]]
+        return memoryview(self.buf)[self.starts[i]:self.ends[i]]
+
+    def get(self, tag: Any, default: Any = None) -> Any:
+        """Value of tag (last occurrence) or default."""
+        i = self._pos(tag)
+        return default if i is None else self.value_at(i)
+
+    def get_all(self, tag: Any) -> List[str]:
+        """All values of tag in wire order (repeating groups)."""
+        t = int(tag)
+        return [self.value_at(i) for i, x in enumerate(self.tags) if x == t]
+
+    def items(self):
+        """Iterate (tag, value) pairs in wire order, duplicates included."""
+        for i, t in enumerate(self.tags):
+            yield str(t), self.value_at(i)
+
+    def typed(self, tag: Any, default: Any = None, decoder: Optional["FieldDecoder"] = None) -> Any:
+        """
+        Value of tag decoded by its dictionary type (Decimal, int, datetime, ...), or default.
+
+        Decoded on first access and cached on the message; raises FixDecodeError
+        for values that do not fit the type or enum.
+        """
+        i = self._pos(tag)
+        if i is None:
+            return default
+        decoder = decoder or get_decoder()
+        if self._typed is None or self._typed[0] is not decoder:
+            self._typed = (decoder, {})
+        cache = self._typed[1]
+        if i not in cache:
+            cache[i] = decoder.decode(self.tags[i], self.value_at(i))
+        return cache[i]
+
+    def to_typed_dict(self, decoder: Optional["FieldDecoder"] = None,
+                      errors: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Dict view with every value decoded by its dictionary type (last occurrence wins).
+
+        Invalid values raise FixDecodeError, or when errors is given are kept as
+        raw strings and the error message appended there.
+        """
+        decoder = decoder or get_decoder()
+        converters = decoder.converters
+        out: Dict[str, Any] = {}
+        for i, t in enumerate(self.tags):
+            tag = str(t)
+            v = self.value_at(i)
+            conv = converters.get(tag)
+            if conv is not None and conv is not str:
+                try:
+                    v = decoder.decode(tag, v)
+                except FixDecodeError as e:
+                    if errors is None:
+                        raise
+                    errors.append(str(e))
+            out[tag] = v
+        return out
+
+    @property
+    def msg_type(self) -> Optional[str]:
+        """MsgType (35), if present."""
+        return self.get(35)
+
+    def to_dict(self, coerce_numbers: bool = False) -> Dict[str, Any]:
+        """
+        Dict view keyed by tag string (last occurrence wins).
+
+        coerce_numbers=True returns every purely numeric value as a float (the
+        original parse_fix output); see to_typed_dict for dictionary types.
+        """
+        out: Dict[str, Any] = {}
+        for i, t in enumerate(self.tags):
+            v = self.value_at(i)
+            if coerce_numbers and _NUMERIC_RE.fullmatch(v):
+                v = float(v)
+            out[str(t)] = v
+        return out
+
+
+def _as_buffer(data: Any) -> Any:
+    """Return an object supporting .find() for the parser; only partial memoryviews are copied."""
+    if isinstance(data, memoryview):
+        obj = data.obj
+        if data.contiguous and hasattr(obj, "find") and data.nbytes == len(obj):
+            return obj
+        return data.tobytes()
+    return data
+
+
+def parse_message(data: Union[str, bytes, bytearray, memoryview], start: int = 0, end: Optional[int] = None) -> FixMessage:
+    """
+    Parse a FIX message in a single scan of data[start:end].
+
+    Accepts SOH- or '|'-delimited input without normalizing it first (SOH wins
+    when present). Fields without '=' or with a non-numeric tag are skipped.
+    """
+    buf = _as_buffer(data)
+    if end is None:
+        end = len(buf)
+    if isinstance(buf, str):
+        soh, pipe, eq = SOH, "|", "="
+    else:
+        soh, pipe, eq = b"\x01", b"|", b"="
+    find = buf.find
+    sep = soh if find(soh, start, end) != -1 else pipe
+
+    tags, starts, ends = array("q"), array("q"), array("q")
+    pos = start
+    while pos < end:
+        stop = find(sep, pos, end)
+        if stop == -1:
+            stop = end
+        eq_at = find(eq, pos, stop)
+        if eq_at > pos:
+            try:
+                tag = int(buf[pos:eq_at])
+            except ValueError:
+                tag = -1
+            if 0 <= tag < 1 << 62:
+                tags.append(tag)
+                starts.append(eq_at + 1)
+                ends.append(stop)
+        pos = stop + 1
+    return FixMessage(buf, tags, starts, ends)
+
+
+def parse_fix(fix_str: Union[str, bytes], fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse FIX string into a tag-value dictionary.
+
+    Numeric-looking values become floats, except for tags the data dictionary
+    types as text (IDs, char codes), which stay strings. Use parse_typed for
+    exact Decimal/int/timestamp values.
+    """
+    text_tags = get_decoder(fix_version).text_tags
     out: Dict[str, Any] = {}
-    for part in filter(None, s.split(SOH)):
-        if "=" not in part:
-            continue
-        tag, val = part.split("=", 1)
-        # keep as string unless purely numeric
-        out[tag] = float(val) if re.fullmatch(r"-?\d+(\.\d+)?", val or "") else val
+    for tag, v in parse_message(fix_str).items():
+        if tag not in text_tags and _NUMERIC_RE.fullmatch(v):
+            v = float(v)
+        out[tag] = v
     return out
 
 
+def parse_typed(fix_str: Union[str, bytes], fix_version: Optional[str] = None,
+                errors: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Parse FIX string into {tag: typed value} using the version's data dictionary (see FieldDecoder)."""
+    return parse_message(fix_str).to_typed_dict(get_decoder(fix_version), errors)
+
+
+# ---------- Typed decoding ----------
+#
+# fields.json (plus component field lists) records each tag's FIX type. A
+# FieldDecoder turns that into one converter per tag, compiled once per
+# version: ints for counters and lengths, Decimal for prices/quantities (no
+# float rounding), datetime/date/time for timestamps, bool for Y/N flags and
+# enum checks for coded fields. Nothing is converted until a field is read.
+
+_INT_TYPES = frozenset({"int", "Length", "SeqNum", "NumInGroup", "TagNum", "DayOfMonth"})
+_DECIMAL_TYPES = frozenset({"Price", "Qty", "Amt", "PriceOffset", "Percentage"})
+_FLOAT_TYPES = frozenset({"float"})
+_TIMESTAMP_TYPES = frozenset({"UTCTimestamp", "TZTimestamp"})
+_DATE_TYPES = frozenset({"UTCDateOnly", "UTCDate", "LocalMktDate"})
+_TIME_TYPES = frozenset({"UTCTimeOnly", "TZTimeOnly"})
+_NUMERIC_TYPES = _INT_TYPES | _DECIMAL_TYPES | _FLOAT_TYPES
+
+Converter = Callable[[str], Any]
+
+
+class FixDecodeError(ValueError):
+    """A field value that does not match its dictionary type or enum."""
+
+    def __init__(self, tag: str, value: str, reason: str):
+        super().__init__(f"Invalid value for {tag}: {value!r} ({reason})")
+        self.tag = tag
+        self.value = value
+        self.reason = reason
+
+
+def _fraction_us(frac: str) -> int:
+    """Microseconds from the digits after the seconds dot (ms, us or ns precision)."""
+    return int((frac + "000000")[:6]) if frac else 0
+
+
+def _decode_timestamp(v: str) -> datetime:
+    # YYYYMMDD-HH:MM:SS[.sss[sss[sss]]], sliced by hand (strptime is ~10x slower)
+    if len(v) < 17 or v[8] != "-" or v[11] != ":" or v[14] != ":" or (len(v) > 17 and v[17] != "."):
+        raise ValueError("expected YYYYMMDD-HH:MM:SS[.sss]")
+    return datetime(int(v[0:4]), int(v[4:6]), int(v[6:8]), int(v[9:11]), int(v[12:14]), int(v[15:17]),
+                    _fraction_us(v[18:]), tzinfo=timezone.utc)
+
+
+def _decode_date(v: str) -> date:
+    if len(v) != 8 or not v.isdigit():
+        raise ValueError("expected YYYYMMDD")
+    return date(int(v[0:4]), int(v[4:6]), int(v[6:8]))
+
+
+def _decode_time(v: str) -> dt_time:
+    if len(v) < 8 or v[2] != ":" or v[5] != ":" or (len(v) > 8 and v[8] != "."):
+        raise ValueError("expected HH:MM:SS[.sss]")
+    return dt_time(int(v[0:2]), int(v[3:5]), int(v[6:8]), _fraction_us(v[9:]))
+
+
+def _decode_decimal(v: str) -> Decimal:
+    try:
+        d = Decimal(v)
+    except InvalidOperation:
+        raise ValueError("not a decimal") from None
+    if not d.is_finite():
+        raise ValueError("not a decimal")
+    return d
+
+
+def _decode_bool(v: str) -> bool:
+    if v == "Y":
+        return True
+    if v == "N":
+        return False
+    raise ValueError("expected Y or N")
+
+
+def _enum_codes(entry: Dict[str, Any]) -> Optional[frozenset]:
+    """Complete enum code set for a field; enum_subset/enum_hint are partial and not enforced."""
+    vals = entry.get("enum")
+    if not isinstance(vals, list) or not vals:
+        return None
+    return frozenset(str(e["code"]) for e in vals if isinstance(e, dict) and "code" in e)
+
+
+def _compile_converter(ftype: str, codes: Optional[frozenset]) -> Converter:
+    """One converter for a FIX type (plus its enum codes, if any)."""
+    if ftype in _INT_TYPES:
+        return int
+    if ftype in _DECIMAL_TYPES:
+        return _decode_decimal
+    if ftype in _FLOAT_TYPES:
+        return float
+    if ftype in _TIMESTAMP_TYPES:
+        return _decode_timestamp
+    if ftype in _DATE_TYPES:
+        return _decode_date
+    if ftype in _TIME_TYPES:
+        return _decode_time
+    if ftype == "Boolean":
+        return _decode_bool
+    if codes is None:
+        return str
+    if ftype in ("MultipleValueString", "MultipleCharValue", "MultipleStringValue"):
+        def multi(v: str) -> str:
+            bad = [x for x in v.split(" ") if x not in codes]
+            if bad:
+                raise ValueError(f"not in enum: {','.join(bad)}")
+            return v
+        return multi
+
+    def enum(v: str) -> str:
+        if v not in codes:
+            raise ValueError("not in enum")
+        return v
+    return enum
+
+
+class FieldDecoder:
+    """
+    Per-tag typed converters compiled from a version's data dictionary.
+
+    decode(tag, value) returns the typed value or raises FixDecodeError; tags
+    missing from the dictionary pass through as str.
+    """
+
+    __slots__ = ("converters", "types", "text_tags")
+
+    def __init__(self, types: Dict[str, Tuple[str, Optional[frozenset]]]):
+        self.types = {tag: ftype for tag, (ftype, _) in types.items()}
+        self.converters: Dict[str, Converter] = {
+            tag: _compile_converter(ftype, codes) for tag, (ftype, codes) in types.items()
+        }
+        # typed, but not as a number: parse_fix must not turn these into floats
+        self.text_tags = frozenset(tag for tag, ftype in self.types.items() if ftype not in _NUMERIC_TYPES)
+
+    @classmethod
+    def from_specs(cls, specs: Dict[str, Any]) -> "FieldDecoder":
+        """Build from fields.json, filling in tags only typed by component field lists."""
+        types: Dict[str, Tuple[str, Optional[frozenset]]] = {}
+        for tag, entry in specs.get("fields_json", {}).get("fields", {}).items():
+            if isinstance(entry, dict) and entry.get("type"):
+                types[str(tag)] = (str(entry["type"]), _enum_codes(entry))
+        for comp in (specs.get("components") or {}).values():
+            for f in comp.get("fields", []) or []:
+                if isinstance(f, dict) and "tag" in f and f.get("type"):
+                    types.setdefault(str(f["tag"]), (str(f["type"]), _enum_codes(f)))
+        return cls(types)
+
+    def converter(self, tag: Any) -> Converter:
+        return self.converters.get(str(tag), str)
+
+    def decode(self, tag: Any, value: str) -> Any:
+        """Typed value for one field."""
+        conv = self.converters.get(str(tag))
+        if conv is None or conv is str:
+            return value
+        try:
+            return conv(value)
+        except (TypeError, ValueError) as e:
+            raise FixDecodeError(str(tag), value, f"{self.types[str(tag)]}: {e}") from None
+
+
+def get_decoder(fix_version: Optional[str] = None) -> FieldDecoder:
+    """Cached FieldDecoder for a FIX version (default DEFAULT_FIX_VERSION)."""
+    return SpecsRegistry(fix_version).get_decoder()
+
+
+# FIXML message elements by MsgType (a message spec's own "fixml_element" takes precedence)
+FIXML_MESSAGES = {
+    "8": "ExecRpt", "9": "OrdCxlRej", "D": "Order", "E": "NewOrdList", "F": "OrdCxlReq",
+    "G": "OrdCxlRplcReq", "H": "OrdStatReq", "J": "AllocInstrctn", "P": "AllocInstrctnAck",
+    "Q": "DkTrd", "R": "QuotReq", "S": "Quot", "V": "MktDataReq", "W": "MktDataFull",
+    "X": "MktDataInc", "c": "SecDefReq", "d": "SecDef", "j": "BizMsgRej", "x": "SecListReq",
+    "y": "SecList", "AB": "NewOrdMleg", "AC": "MlegOrdCxlRplc", "AD": "TrdCaptRptReq",
+    "AE": "TrdCaptRpt", "AR": "TrdCaptRptAck",
+}
+# Standard header fields carried on <Hdr> besides those in fields.json "groups.header"
+_FIXML_HEADER_TAGS = ("34", "43", "49", "50", "52", "56", "57", "97", "115", "116", "122", "128", "129",
+                      "142", "143", "144", "145")
+_FIXML_TAG_ATTR = re.compile(r"T(\d+)$")
+
+
+class FixmlTables:
+    """
+    Tag <-> FIXML name tables compiled from a version's data dictionary.
+
+    Fields use their fixml_element as the attribute name; tags without one are
+    written as "T<tag>" so every field round-trips. A NumInGroup field's name
+    is also the element name of each entry of its repeating group.
+    """
+
+    __slots__ = ("attrs", "tags", "elements", "msg_types", "header_tags", "group_tags")
+
+    def __init__(self, attrs: Dict[str, str], elements: Dict[str, str], header_tags: Iterable[str],
+                 group_tags: Iterable[str]):
+        self.attrs = attrs
+        self.tags = {attr: tag for tag, attr in attrs.items()}
+        self.elements = elements
+        self.msg_types = {elem: mt for mt, elem in elements.items()}
+        self.header_tags = frozenset(header_tags) - _RESERVED_TAGS
+        self.group_tags = frozenset(group_tags)
+
+    @classmethod
+    def from_specs(cls, specs: Dict[str, Any]) -> "FixmlTables":
+        """Build from fields.json (names, header group, NumInGroup types), component fields and message specs."""
+        fields_json = specs.get("fields_json", {})
+        attrs: Dict[str, str] = {}
+        group_tags = set()
+        seen = set()
+        for tag, entry in fields_json.get("fields", {}).items():
+            if not isinstance(entry, dict):
+                continue
+            elem = entry.get("fixml_element")
+            if elem and str(elem) not in seen:
+                attrs[str(tag)] = str(elem)
+                seen.add(str(elem))
+            if entry.get("type") == "NumInGroup":
+                group_tags.add(str(tag))
+        for comp in (specs.get("components") or {}).values():
+            for f in comp.get("fields", []) or []:
+                if isinstance(f, dict) and f.get("type") == "NumInGroup" and "tag" in f:
+                    group_tags.add(str(f["tag"]))
+        elements = dict(FIXML_MESSAGES)
+        for mt, spec in (specs.get("messages") or {}).items():
+            if isinstance(spec, dict) and spec.get("fixml_element"):
+                elements[str(mt)] = str(spec["fixml_element"])
+        header = set(_FIXML_HEADER_TAGS)
+        header.update(str(t) for t in (fields_json.get("groups") or {}).get("header", []))
+        return cls(attrs, elements, header, group_tags)
+
+    def attr(self, tag: str) -> str:
+        """FIXML attribute (or group entry element) name for a tag."""
+        return self.attrs.get(tag) or f"T{tag}"
+
+    def tag(self, attr: str) -> Optional[str]:
+        """Tag for a FIXML attribute or element name, or None if the dictionary does not know it."""
+        tag = self.tags.get(attr)
+        if tag is None:
+            m = _FIXML_TAG_ATTR.match(attr)
+            if m:
+                tag = m.group(1)
+        return tag
+
+    def element(self, msg_type: str) -> Optional[str]:
+        """FIXML message element for a MsgType (None when there is no mapping)."""
+        return self.elements.get(msg_type)
+
+    def msg_type(self, element: str) -> Optional[str]:
+        """MsgType for a FIXML message element."""
+        return self.msg_types.get(element)
+
+
+_WORD_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_TERM_RE = re.compile(r"[a-z0-9]+")
+_ENUM_HINT_RE = re.compile(r"\s*([^=,]+?)\s*=\s*([^,]+)")
+# FIX/FIXML abbreviations in names and elements, so "stop price" finds StopPx
+_ABBREVIATIONS = {
+    "acct": "account", "adv": "advertisement", "amt": "amount", "avg": "average", "ccy": "currency",
+    "cl": "client", "comm": "commission", "cpcty": "capacity", "cum": "cumulative", "exec": "execution",
+    "handl": "handling", "id": "identifier", "ind": "indicator", "inst": "instruction", "ioi": "indication",
+    "mkt": "market", "no": "number", "num": "number", "ord": "order", "orig": "original", "pct": "percent",
+    "px": "price", "qlty": "quality", "qty": "quantity", "ref": "reference", "sec": "security",
+    "seq": "sequence", "snd": "sender", "sndg": "sending", "src": "source", "stat": "status",
+    "tm": "time", "typ": "type",
+}
+_STOP_WORDS = frozenset(
+    "a an and are be by can do does field fields find for from has hold holds how i in is it me of on or "
+    "show tag tags that the this to use used value what when where which with".split())
+# term weight by where it occurs in a document
+_W_NAME, _W_ALIAS, _W_TEXT = 3.0, 2.0, 1.0
+# score factor by how a query term matched an index term
+_MATCH_PREFIX, _MATCH_TYPO = 0.6, 0.45
+_NAME_LENGTH_PENALTY = 0.05   # per extra name term, so "Stop" outranks "Trailing stop peg"
+_MIN_TYPO_LEN = 4
+_MAX_PREFIX_TERMS = 64
+
+
+def _name_words(name: Any) -> List[str]:
+    """CamelCase / FIXML name split into lowercase words: 'ClOrdID' -> ['cl', 'ord', 'id']."""
+    return [w.lower() for w in _WORD_RE.findall(str(name))]
+
+
+def _deletes(term: str) -> List[str]:
+    return [term[:i] + term[i + 1:] for i in range(len(term))]
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Whether a and b differ by at most one insertion, deletion, substitution or adjacent transposition."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    i = 0
+    while i < min(la, lb) and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        return a[i + 1:] == b[i + 1:] or (a[i + 1:i + 2] == b[i:i + 1] and a[i:i + 1] == b[i + 1:i + 2]
+                                          and a[i + 2:] == b[i + 2:])
+    return a[i + 1:] == b[i:] if la > lb else a[i:] == b[i + 1:]
+
+
+class SearchIndex:
+    """
+    Inverted index over a version's data dictionary: fields (name, FIXML
+    element, description), enum values (meaning), components and messages.
+
+    search() ranks documents by an idf-weighted score in which each query term
+    matches index terms exactly, by prefix, or within one typo, weighted by
+    where in the document the term occurs (name > FIXML element/abbreviation >
+    description), scaled by the share of query terms matched and slightly
+    favouring short names.
+    """
+
+    __slots__ = ("docs", "norms", "postings", "idf", "vocab", "deletes", "by_key")
+
+    def __init__(self, docs: List[Tuple[Dict[str, Any], Dict[str, float], List[str]]]):
+        self.docs = [doc for doc, _, _ in docs]
+        self.norms = [1.0 + _NAME_LENGTH_PENALTY * max(0, sum(w == _W_NAME for w in terms.values()) - 1)
+                      for _, terms, _ in docs]
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        by_key: Dict[str, List[int]] = {}
+        for i, (_, terms, keys) in enumerate(docs):
+            for term, weight in terms.items():
+                postings.setdefault(term, []).append((i, weight))
+            for key in keys:
+                by_key.setdefault(key, []).append(i)
+        self.postings = postings
+        self.by_key = by_key
+        self.idf = {t: math.log(1 + len(docs) / len(p)) for t, p in postings.items()}
+        self.vocab = sorted(postings)
+        deletes: Dict[str, List[str]] = {}
+        for term in self.vocab:
+            if len(term) >= _MIN_TYPO_LEN - 1:
+                for d in _deletes(term):
+                    deletes.setdefault(d, []).append(term)
+        self.deletes = deletes
+
+    @classmethod
+    def from_specs(cls, specs: Dict[str, Any]) -> "SearchIndex":
+        """Index fields.json plus the field, enum and description text of components and messages."""
+        docs: List[Tuple[Dict[str, Any], Dict[str, float], List[str]]] = []
+        fields: Dict[str, int] = {}
+
+        def add(terms: Dict[str, float], words: Iterable[str], weight: float) -> None:
+            for w in words:
+                if w not in _STOP_WORDS and terms.get(w, 0.0) < weight:
+                    terms[w] = weight
+
+        def add_name(terms: Dict[str, float], name: Any, weight: float, alias_weight: float) -> None:
+            words = _name_words(name)
+            add(terms, words, weight)
+            add(terms, ["".join(words)], weight)
+            add(terms, [_ABBREVIATIONS[w] for w in words if w in _ABBREVIATIONS], alias_weight)
+
+        def add_enum(tag: str, field_name: str, code: Any, meaning: Any) -> None:
+            terms: Dict[str, float] = {}
+            add(terms, _TERM_RE.findall(str(meaning).lower()), _W_NAME)
+            add_name(terms, field_name, _W_TEXT, _W_TEXT)
+            docs.append(({"kind": "enum", "tag": tag, "name": field_name, "code": str(code),
+                          "meaning": str(meaning)}, terms, []))
+
+        def add_field(tag: str, entry: Dict[str, Any], text_key: str) -> None:
+            i = fields.get(tag)
+            if i is not None:
+                # already indexed: only pick up extra notes
+                add(docs[i][1], _TERM_RE.findall(str(entry.get(text_key) or "").lower()), _W_TEXT)
+                return
+            name = str(entry.get("name") or tag)
+            terms: Dict[str, float] = {tag: _W_NAME}
+            add_name(terms, name, _W_NAME, _W_ALIAS)
+            elem = entry.get("fixml_element")
+            if elem:
+                add_name(terms, elem, _W_ALIAS, _W_ALIAS)
+            description = str(entry.get("description") or entry.get(text_key) or "")
+            add(terms, _TERM_RE.findall(description.lower()), _W_TEXT)
+            doc = {"kind": "field", "tag": tag, "name": name, "type": entry.get("type"),
+                   "fixmlElement": elem, "description": description}
+            fields[tag] = len(docs)
+            docs.append((doc, terms, sorted({tag, name.lower(), str(elem or name).lower()})))
+            enums = [e for key in ("enum", "enum_subset", "enum_hint") if isinstance(entry.get(key), list)
+                     for e in entry[key] if isinstance(e, dict) and "code" in e]
+            if isinstance(entry.get("enum_hint"), str):
+                enums += [{"code": c, "meaning": m} for c, m in _ENUM_HINT_RE.findall(entry["enum_hint"])]
+            for e in enums:
+                add_enum(tag, name, e["code"], e.get("meaning", ""))
+
+        for tag, entry in specs.get("fields_json", {}).get("fields", {}).items():
+            if isinstance(entry, dict):
+                add_field(str(tag), entry, "description")
+        for name, comp in (specs.get("components") or {}).items():
+            terms = {}
+            add_name(terms, name, _W_NAME, _W_ALIAS)
+            description = str(comp.get("description") or "")
+            add(terms, _TERM_RE.findall(description.lower()), _W_TEXT)
+            docs.append(({"kind": "component", "name": name, "description": description}, terms, [name.lower()]))
+            for f in comp.get("fields", []) or []:
+                if isinstance(f, dict) and "tag" in f:
+                    add_field(str(f["tag"]), f, "notes")
+        for msg_type, spec in (specs.get("messages") or {}).items():
+            name = str(spec.get("name") or msg_type)
+            terms = {msg_type.lower(): _W_NAME}
+            add_name(terms, name, _W_NAME, _W_ALIAS)
+            description = str(spec.get("purpose") or spec.get("description") or "")
+            add(terms, _TERM_RE.findall(description.lower()), _W_TEXT)
+            docs.append(({"kind": "message", "msgType": msg_type, "name": name, "description": description},
+                         terms, ["".join(_name_words(name))]))
+            msg_fields = spec.get("fields")
+            if isinstance(msg_fields, dict):
+                for tag, f in msg_fields.items():
+                    if isinstance(f, dict):
+                        add_field(str(tag), dict(f, notes=f.get("notes") or f.get("role")), "notes")
+        return cls(docs)
+
+    def _matches(self, q: str) -> Iterator[Tuple[str, float]]:
+        """(index term, match factor) for one query term: exact, prefix and one-typo matches."""
+        postings = self.postings
+        if q in postings:
+            yield q, 1.0
+        if len(q) >= 2:
+            vocab = self.vocab
+            i = bisect.bisect_left(vocab, q)
+            end = min(len(vocab), i + _MAX_PREFIX_TERMS)
+            while i < end and vocab[i].startswith(q):
+                if vocab[i] != q:
+                    yield vocab[i], _MATCH_PREFIX
+                i += 1
+        if len(q) >= _MIN_TYPO_LEN:
+            deletes = self.deletes
+            candidates = set(deletes.get(q, ()))
+            for d in _deletes(q):
+                if d in postings:
+                    candidates.add(d)
+                candidates.update(deletes.get(d, ()))
+            for term in candidates:
+                if term != q and not term.startswith(q) and _within_one_edit(q, term):
+                    yield term, _MATCH_TYPO
+
+    def search(self, query: str, limit: int = 10, kinds: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Best matches for a free-text query, highest score first; kinds filters by document kind."""
+        words = _TERM_RE.findall(query.lower())
+        terms = list(dict.fromkeys(w for w in words if w not in _STOP_WORDS)) or list(dict.fromkeys(words))
+        if not terms:
+            return []
+        scores: Dict[int, float] = {}
+        matched: Dict[int, int] = {}
+        postings, idf = self.postings, self.idf
+        for q in terms:
+            best: Dict[int, float] = {}
+            for term, factor in self._matches(q):
+                weight = factor * idf[term]
+                for doc, w in postings[term]:
+                    s = weight * w
+                    if s > best.get(doc, 0.0):
+                        best[doc] = s
+            for doc, s in best.items():
+                scores[doc] = scores.get(doc, 0.0) + s
+                matched[doc] = matched.get(doc, 0) + 1
+        n = len(terms)
+        norms = self.norms
+        ranked = {doc: s * matched[doc] / (n * norms[doc]) for doc, s in scores.items()}
+        # a query that is exactly a tag, name or FIXML element puts that document first
+        for doc in self.by_key.get("".join(terms), ()):
+            ranked[doc] = ranked.get(doc, 0.0) + 100.0
+        allowed = frozenset(kinds) if kinds else None
+        docs = self.docs
+        top = heapq.nlargest(limit, ((s, -doc) for doc, s in ranked.items()
+                                     if allowed is None or docs[doc]["kind"] in allowed))
+        return [dict(docs[-neg], score=round(s, 3)) for s, neg in top]
+
+
+def search_dictionary(query: str, limit: int = 10, kinds: Optional[Iterable[str]] = None,
+                      fix_version: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Ranked full-text search over a version's data dictionary (default DEFAULT_FIX_VERSION)."""
+    return SpecsRegistry(fix_version).current().search(query, limit, kinds)
+
+
 def _present(payload: Dict[str, Any], tags: List[Any]) -> List[str]:
     """Check which required tags are missing from payload."""
     missing = []
@@ -168,112 +1307,354 @@ def _present(payload: Dict[str, Any], tags: List[Any]) -> List[str]:
     return missing
 
 
+def _value_str(v: Any) -> str:
+    """Stringify a payload value as it appears on the wire (2.0 -> '2')."""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
 def _equation_ok(payload: Dict[str, Any], lhs: List[Any], equals: Any) -> tuple[bool, float, float]:
     """Evaluate equation constraint (e.g., 14 + 151 = 38)."""
-    total = 0.0
-    op = "+"
+    terms = _compile_equation_terms(lhs)
+    return _eval_equation(payload, terms, str(equals))
+
+
+# ---------- Constraint compilation ----------
+#
+# Message specs and rules.json are compiled once into flat lists of closures.
+# A check has the signature check(payload, errors) and appends error strings;
+# a condition has the signature cond(payload) -> bool. Tags are stringified and
+# "in" lists turned into frozensets at compile time, so a validation pass does
+# no JSON interpretation at all.
+
+Check = Callable[[Dict[str, Any], List[str]], None]
+Cond = Callable[[Dict[str, Any]], bool]
+
+
+def _compile_equation_terms(lhs: List[Any]) -> Tuple[Tuple[str, float], ...]:
+    """Turn ["14", "+", "151"] into ((tag, sign), ...)."""
+    terms = []
+    sign = 1.0
     for tok in lhs:
         s = str(tok)
         if s in {"+", "-"}:
-            op = s
+            sign = 1.0 if s == "+" else -1.0
             continue
-        v = float(payload.get(s, 0) or 0)
-        total = total + v if op == "+" else total - v
-    rhs = float(payload.get(str(equals), float("nan")) or float("nan"))
+        terms.append((s, sign))
+    return tuple(terms)
+
+
+def _to_float(v: Any, default: float) -> float:
+    """Best-effort float conversion; None or non-numeric values yield default."""
+    if v is None:
+        return default
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return default
+
+
+def _eval_equation(payload: Dict[str, Any], terms: Tuple[Tuple[str, float], ...], rhs_tag: str) -> tuple[bool, float, float]:
+    """Evaluate precompiled equation terms against payload."""
+    total = 0.0
+    for tag, sign in terms:
+        total += sign * _to_float(payload.get(tag), 0.0)
+    rhs = _to_float(payload.get(rhs_tag), float("nan"))
     return (rhs == total), total, rhs
 
 
-def validate_against_message_spec(spec: Dict[str, Any], payload: Dict[str, Any]) -> List[str]:
-    """Validate payload against message specification."""
-    errors: List[str] = []
-    req = [str(x) for x in spec.get("required", [])]
-    if req:
-        miss = _present(payload, req)
+def _check_present(tags: List[Any]) -> Check:
+    keys = tuple(str(t) for t in tags)
+
+    def check(payload: Dict[str, Any], errors: List[str]) -> None:
+        miss = [t for t in keys if payload.get(t) is None]
         if miss:
             errors.append(f"Missing required: {','.join(miss)}")
-    
-    # very small subset of constraints used in our JSON
+    return check
+
+
+def _check_one_of(tags: List[Any]) -> Check:
+    keys = tuple(str(t) for t in tags)
+    msg = f"One of required: {','.join(keys)}"
+
+    def check(payload: Dict[str, Any], errors: List[str]) -> None:
+        for t in keys:
+            if payload.get(t) is not None:
+                return
+        errors.append(msg)
+    return check
+
+
+def _check_in(mapping: Dict[str, Any]) -> List[Check]:
+    checks = []
+    for tag, arr in mapping.items():
+        key = str(tag)
+        allowed = frozenset(str(x) for x in arr)
+        msg = f"Invalid value for {tag}. Expected one of {','.join(map(str, arr))}"
+
+        def check(payload: Dict[str, Any], errors: List[str], key=key, allowed=allowed, msg=msg) -> None:
+            if _value_str(payload.get(key)) not in allowed:
+                errors.append(msg)
+        checks.append(check)
+    return checks
+
+
+def _check_equals(mapping: Dict[str, Any]) -> List[Check]:
+    checks = []
+    for tag, val in mapping.items():
+        key = str(tag)
+        expected = str(val)
+        msg = f"Invalid value for {tag}. Expected {val}"
+
+        def check(payload: Dict[str, Any], errors: List[str], key=key, expected=expected, msg=msg) -> None:
+            if _value_str(payload.get(key)) != expected:
+                errors.append(msg)
+        checks.append(check)
+    return checks
+
+
+def _check_equation(eq: Dict[str, Any]) -> Check:
+    terms = _compile_equation_terms(eq["lhs"])
+    rhs_tag = str(eq["equals"])
+    prefix = f"Equation failed: {' '.join(map(str, eq['lhs']))} = {eq['equals']}"
+
+    def check(payload: Dict[str, Any], errors: List[str]) -> None:
+        ok, s, r = _eval_equation(payload, terms, rhs_tag)
+        if not ok:
+            errors.append(f"{prefix} ({s} != {r})")
+    return check
+
+
+def _compile_cond(cond: Optional[Dict[str, Any]]) -> Optional[Cond]:
+    """Compile an if-condition; returns None for conditions that can never hold."""
+    if not cond or not isinstance(cond, dict):
+        return None
+    pairs: List[Tuple[str, frozenset]] = []
+    if "equals" in cond or "in" in cond:
+        for tag, val in (cond.get("equals") or {}).items():
+            pairs.append((str(tag), frozenset([str(val)])))
+        for tag, arr in (cond.get("in") or {}).items():
+            pairs.append((str(tag), frozenset(str(x) for x in arr)))
+    else:
+        # shorthand used by message specs: {"40": "2"} means equals
+        for tag, val in cond.items():
+            pairs.append((str(tag), frozenset([str(val)])))
+    if not pairs:
+        return None
+    if len(pairs) == 1:
+        key, allowed = pairs[0]
+        return lambda payload: _value_str(payload.get(key)) in allowed
+    frozen = tuple(pairs)
+    return lambda payload: all(_value_str(payload.get(k)) in a for k, a in frozen)
+
+
+def _compile_then(th: Any) -> List[Check]:
+    """Compile a then/else block (a dict or a list of dicts)."""
+    if not th:
+        return []
+    if isinstance(th, list):
+        checks: List[Check] = []
+        for item in th:
+            checks += _compile_then(item)
+        return checks
+    checks = []
+    if "present" in th:
+        checks.append(_check_present(th["present"]))
+    if "must_have" in th:
+        checks.append(_check_present(th["must_have"]))
+    if "must_have_one_of" in th:
+        checks.append(_check_one_of(th["must_have_one_of"]))
+    if "in" in th:
+        checks += _check_in(th["in"])
+    if "equals" in th:
+        checks += _check_equals(th["equals"])
+    if "equation" in th:
+        checks.append(_check_equation(th["equation"]))
+    return checks
+
+
+def _conditional(cond: Optional[Cond], then: List[Check], otherwise: List[Check]) -> Optional[Check]:
+    """Wrap compiled then/else checks behind a compiled condition."""
+    if cond is None:
+        # the condition can never hold, only the else branch is reachable
+        return _sequence(otherwise) if otherwise else None
+    then_t, else_t = tuple(then), tuple(otherwise)
+
+    def check(payload: Dict[str, Any], errors: List[str]) -> None:
+        for c in (then_t if cond(payload) else else_t):
+            c(payload, errors)
+    return check
+
+
+def _sequence(checks: List[Check]) -> Check:
+    seq = tuple(checks)
+
+    def check(payload: Dict[str, Any], errors: List[str]) -> None:
+        for c in seq:
+            c(payload, errors)
+    return check
+
+
+def _compile_constraint(c: Dict[str, Any]) -> List[Check]:
+    """
+    Compile one constraint (or rule logic block) into flat checks.
+
+    Supports present/must_have/must_have_one_of/in/equals/equation, all_of,
+    if/then/else (including the {"tag": "value"} shorthand), if_any_of, cases,
+    and an unconditional then. Keys that need session or order context
+    (order_state, immutable_fields_unchanged) are left to validate_fix.
+    """
+    if not isinstance(c, dict):
+        return []
+    checks: List[Check] = []
+    if "all_of" in c:
+        for sub in c["all_of"] or []:
+            checks += _compile_constraint(sub)
+    if "present" in c:
+        checks.append(_check_present(c["present"]))
+    if "must_have" in c:
+        checks.append(_check_present(c["must_have"]))
+    if "must_have_one_of" in c:
+        checks.append(_check_one_of(c["must_have_one_of"]))
+    if "at_least_one_of_present_to_replace" in c:
+        checks.append(_check_one_of(c["at_least_one_of_present_to_replace"]))
+    if "equation" in c:
+        checks.append(_check_equation(c["equation"]))
+    if "if" in c:
+        chk = _conditional(_compile_cond(c["if"]), _compile_then(c.get("then")), _compile_then(c.get("else")))
+        if chk:
+            checks.append(chk)
+    elif "if_any_of" in c:
+        conds = [cd for cd in (_compile_cond(x) for x in c["if_any_of"] or []) if cd]
+        if conds:
+            conds_t = tuple(conds)
+            chk = _conditional(lambda payload: any(cd(payload) for cd in conds_t), _compile_then(c.get("then")), [])
+            if chk:
+                checks.append(chk)
+    elif "then" in c and "cases" not in c:
+        checks += _compile_then(c["then"])
+    if "cases" in c:
+        for k in c["cases"] or []:
+            chk = _conditional(_compile_cond(k.get("if")), _compile_then(k.get("then")), [])
+            if chk:
+                checks.append(chk)
+    return checks
+
+
+def _compile_spec_checks(spec: Dict[str, Any], components: Optional[Dict[str, Any]] = None) -> List[Check]:
+    """Compile a message spec's required list and constraints."""
+    components = components or {}
+    checks: List[Check] = []
+    req: List[str] = []
+    for x in spec.get("required", []) or []:
+        comp = components.get(str(x))
+        if comp is None:
+            req.append(str(x))
+            continue
+        # a required component is satisfied by any one of its fields
+        comp_tags = [str(f["tag"]) for f in comp.get("fields", []) if isinstance(f, dict) and "tag" in f]
+        if comp_tags:
+            checks.append(_check_one_of(comp_tags))
+    if req:
+        checks.insert(0, _check_present(req))
     for c in spec.get("constraints", []) or []:
-        if "must_have" in c:
-           miss = _present(payload, c["must_have"])
-           if miss: errors.append(f"Missing required: {','.join(miss)}")
-        if "must_have_one_of" in c:
-           ok = any(payload.get(str(t)) is not None for t in c["must_have_one_of"])
-           if not ok: errors.append(f"One of required: {','.join(map(str,c['must_have_one_of']))}")
-        if "equation" in c:
-           ok, s, r = _equation_ok(payload, c["equation"]["lhs"], c["equation"]["equals"])
-           if not ok: errors.append(f"Equation failed: {' '.join(map(str,c['equation']['lhs']))} = {c['equation']['equals']} ({s} != {r})")
-        
-        # if/then cases (equals / in → present/must_have/must_have_one_of)
-        def _cond_ok(cond: Dict[str, Any]) -> bool:
-            if "equals" in cond:
-                tag, val = next(iter(cond["equals"].items()))
-                return str(payload.get(str(tag))) == str(val)
-            if "in" in cond:
-                tag, arr = next(iter(cond["in"].items()))
-                return str(payload.get(str(tag))) in [str(x) for x in arr]
-            return False
-        
-        def _apply_then(th: Dict[str, Any]):
-            if "present" in th:
-                miss = _present(payload, th["present"])
-                if miss: errors.append(f"Missing required: {','.join(miss)}")
-            if "must_have" in th:
-                miss = _present(payload, th["must_have"])
-                if miss: errors.append(f"Missing required: {','.join(miss)}")
-            if "must_have_one_of" in th:
-                ok = any(payload.get(str(t)) is not None for t in th["must_have_one_of"])
-                if not ok: errors.append(f"One of required: {','.join(map(str, th['must_have_one_of']))}")
-            if "in" in th:
-                tag, arr = next(iter(th["in"].items()))
-                if str(payload.get(str(tag))) not in [str(x) for x in arr]:
-                    errors.append(f"Invalid value for {tag}. Expected one of {','.join(map(str, arr))}")
-        
-        if "if" in c and _cond_ok(c["if"]):
-            _apply_then(c.get("then", {}))
-        if "if_any_of" in c and c.get("then"):
-            if any(_cond_ok(cond) for cond in c["if_any_of"]):
-                _apply_then(c["then"])
-        if "cases" in c:
-            for k in c["cases"]:
-                if _cond_ok(k.get("if", {})):
-                    _apply_then(k.get("then", {}))
-    
+        checks += _compile_constraint(c)
+    return checks
+
+
+def _compile_rules(rules: Optional[Dict[str, Any]], msg_type: str) -> List[Tuple[str, Optional[str], Tuple[Check, ...]]]:
+    """Compile the rules.json entries that apply to msg_type."""
+    compiled = []
+    for r in (rules or {}).get("rules", []):
+        if r.get("applies_to") and msg_type not in r["applies_to"]:
+            continue
+        checks = _compile_constraint(r.get("logic", {}))
+        if checks:
+            compiled.append((r.get("id", ""), r.get("error_on_fail"), tuple(checks)))
+    return compiled
+
+
+class CompiledValidator:
+    """Precompiled message-spec and rule checks for a single MsgType."""
+
+    __slots__ = ("msg_type", "spec_checks", "rules")
+
+    def __init__(self, msg_type: str, spec_checks: List[Check],
+                 rules: List[Tuple[str, Optional[str], Tuple[Check, ...]]]):
+        self.msg_type = msg_type
+        self.spec_checks = tuple(spec_checks)
+        self.rules = tuple(rules)
+
+    def validate_spec(self, payload: Dict[str, Any]) -> List[str]:
+        """Run the message-spec checks only."""
+        errors: List[str] = []
+        for check in self.spec_checks:
+            check(payload, errors)
+        return errors
+
+    def validate_rules(self, payload: Dict[str, Any], failed: Optional[List[str]] = None) -> List[str]:
+        """Run the rule checks only; one error per failing rule (their ids are appended to failed)."""
+        errors: List[str] = []
+        for rule_id, message, checks in self.rules:
+            errs: List[str] = []
+            for check in checks:
+                check(payload, errs)
+            if errs:
+                errors.append(message or "; ".join(errs))
+                if failed is not None:
+                    failed.append(rule_id)
+        return errors
+
+    def validate(self, payload: Dict[str, Any]) -> List[str]:
+        """Run spec checks then rule checks in a single pass."""
+        return self.validate_spec(payload) + self.validate_rules(payload)
+
+
+def compile_validator(msg_type: str, spec: Dict[str, Any], rules: Optional[Dict[str, Any]] = None,
+                      components: Optional[Dict[str, Any]] = None) -> CompiledValidator:
+    """Compile a message spec and its applicable rules into a CompiledValidator."""
+    return CompiledValidator(msg_type, _compile_spec_checks(spec, components), _compile_rules(rules, msg_type))
+
+
+def validate_against_message_spec(spec: Dict[str, Any], payload: Dict[str, Any]) -> List[str]:
+    """Validate payload against message specification."""
+    errors: List[str] = []
+    for check in _compile_spec_checks(spec):
+        check(payload, errors)
     return errors
 
 
 def validate_against_rules(rules: Optional[Dict[str, Any]], msg_type: str, payload: Dict[str, Any]) -> List[str]:
     """Validate payload against cross-field rules."""
     if not rules: return []
-    errors: List[str] = []
-    for r in rules.get("rules", []):
-        if r.get("applies_to") and msg_type not in r["applies_to"]:
-            continue
-        logic = r.get("logic", {})
-        # reuse the same tiny evaluator by wrapping as a "constraint"
-        errs = validate_against_message_spec({"constraints": [logic], "required": []}, payload)
-        if errs:
-            errors.append(r.get("error_on_fail") or "; ".join(errs))
-    return errors
+    return CompiledValidator(msg_type, [], _compile_rules(rules, msg_type)).validate_rules(payload)
 
 
-def validate_fix(msg_type: str, payload: Dict[str, Any],
-                 original: Dict[str, Any] = None, known_live_orders: set = None) -> Dict[str, Any]:
-    """Validate FIX message payload against specifications and rules."""
-    registry = SpecsRegistry()
-    spec = registry.get_message_spec(msg_type)
-    if not spec:
-        return {"ok": False, "errors": [f"Unknown MsgType {msg_type}"]}
+def _observed_validate(validator: CompiledValidator, payload: Dict[str, Any], sink: Any,
+                       failed: List[str]) -> List[str]:
+    """validator.validate with per-stage timings reported to sink; failing rule ids go to failed."""
+    t0 = time.perf_counter()
+    errors = validator.validate_spec(payload)
+    t1 = time.perf_counter()
+    if errors:
+        failed.append("message_spec")
+    errors += validator.validate_rules(payload, failed)
+    t2 = time.perf_counter()
+    sink.observe_stage("validate_spec", t1 - t0)
+    sink.observe_stage("validate_rules", t2 - t1)
+    return errors
 
-    errors = []
-    errors += validate_against_message_spec(spec, payload)
-    errors += validate_against_rules(registry.specs.get("rules"), msg_type, payload)
 
+def _context_errors(msg_type: str, payload: Dict[str, Any], original: Optional[Dict[str, Any]],
+                    known_live_orders: Any, errors: List[str], failed: List[str]) -> None:
+    """Order-context checks that rules.json cannot express (F live order, G immutables)."""
     # Optional: F must reference a known live order
     if msg_type == "F" and known_live_orders is not None:
         oid = str(payload.get("41", ""))
         if not oid or oid not in known_live_orders:
             errors.append("OrigClOrdID(41) does not reference a known live order.")
+            failed.append("known_live_order")
 
     # Optional: G immutables & 'must change something' if original provided
     if msg_type == "G" and original:
@@ -281,24 +1662,149 @@ def validate_fix(msg_type: str, payload: Dict[str, Any],
         for t in immut:
             if t in payload and str(payload.get(t)) != str(original.get(t)):
                 errors.append(f"Immutable field changed: {t}")
+                failed.append("replace_immutable")
 
         changed_fields = ["44", "38", "99", "59", "432", "126", "40"]
         changed = any(str(payload.get(t)) != str(original.get(t)) for t in changed_fields if t in payload or t in original)
         if not changed:
             errors.append("Replace must change at least one of: 44,38,99,59,432,126,40.")
+            failed.append("replace_unchanged")
+
+
+def validate_fix(msg_type: str, payload: Dict[str, Any],
+                 original: Dict[str, Any] = None, known_live_orders: set = None,
+                 order_book: Any = None, fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Validate FIX message payload against specifications and rules.
 
+    fix_version selects the spec set (default DEFAULT_FIX_VERSION).
+    order_book (an order_book.OrderBook) supplies known_live_orders and, for G,
+    the original order when those are not passed explicitly.
+    """
+    registry = SpecsRegistry(fix_version)
+    if order_book is not None:
+        if known_live_orders is None:
+            known_live_orders = order_book
+        if msg_type == "G" and original is None:
+            original = order_book.original_for(_value_str(payload.get("41", "")))
+    validator = registry.get_validator(msg_type)
+    if not validator:
+        return {"ok": False, "errors": [f"Unknown MsgType {msg_type}"]}
+
+    sink = _metrics
+    failed: List[str] = []
+    errors = validator.validate(payload) if sink is None else _observed_validate(validator, payload, sink, failed)
+    if msg_type in ("F", "G"):
+        _context_errors(msg_type, payload, original, known_live_orders, errors, failed)
+
+    if sink is not None and failed:
+        sink.count_failures(msg_type, failed)
     return {"ok": not errors, "errors": errors}
 
 
-def _pad3(n: int) -> str:
-    """Pad number to 3 digits for checksum."""
-    s = str(n % 256)
-    return ("00"+s)[-3:]
+_RESERVED_TAGS = frozenset({"8", "9", "10", "35"})
+_TAG_PREFIX: Dict[str, bytes] = {}
+
+
+def _tag_prefix(tag: str) -> bytes:
+    """Cached b"<tag>=" prefix for a tag."""
+    p = _TAG_PREFIX.get(tag)
+    if p is None:
+        p = _TAG_PREFIX[tag] = f"{tag}=".encode()
+    return p
+
+
+class MessageTemplate:
+    """
+    Precompiled framing for one (BeginString, MsgType, fixed header fields) combination.
+
+    The fixed parts are encoded once along with their byte lengths and checksum
+    contributions; building a message only encodes the variable fields into a
+    bytearray and adds their byte sum to the running totals.
+    """
+
+    __slots__ = ("msg_type", "begin", "begin_sum", "prefix", "prefix_sum", "skip_tags")
+
+    def __init__(self, begin_string: str, msg_type: str, header: Optional[Dict[str, Any]] = None):
+        header = header or {}
+        self.msg_type = str(msg_type)
+        self.begin = f"8={begin_string}{SOH}".encode()
+        self.begin_sum = sum(self.begin)
+        # 35 plus the fixed header fields: everything counted by BodyLength before the body
+        self.prefix = "".join([f"35={msg_type}{SOH}"] + [f"{k}={v}{SOH}" for k, v in header.items()]).encode()
+        self.prefix_sum = sum(self.prefix)
+        self.skip_tags = _RESERVED_TAGS | {str(k) for k in header}
+
+    def _write_body(self, fields: Any, buf: bytearray) -> None:
+        """Encode variable fields (dict or (tag, value) pairs) into buf."""
+        items = fields.items() if isinstance(fields, dict) else fields
+        skip = self.skip_tags
+        for k, v in items:
+            key = str(k)
+            if key in skip:
+                if key == "35" and v and str(v) != self.msg_type:
+                    raise ValueError(f"MsgType (35) mismatch between input '{v}' and inferred template '{self.msg_type}'")
+                continue
+            buf += _tag_prefix(key)
+            buf += v if isinstance(v, bytes) else str(v).encode()
+            buf += b"\x01"
+
+    def _frame(self, body: bytearray) -> bytes:
+        """Wrap an encoded body with BodyLength and CheckSum."""
+        length = b"9=%d\x01" % (len(self.prefix) + len(body))
+        total = self.begin_sum + sum(length) + self.prefix_sum + sum(body)
+        return b"".join((self.begin, length, self.prefix, body, b"10=%03d\x01" % (total % 256)))
+
+    def build(self, fields: Any) -> bytes:
+        """Build one SOH-delimited message."""
+        body = bytearray()
+        self._write_body(fields, body)
+        return self._frame(body)
+
+    def build_many(self, rows: Iterable[Any]) -> List[bytes]:
+        """Build one message per row, reusing a single body buffer."""
+        out: List[bytes] = []
+        body = bytearray()
+        for fields in rows:
+            del body[:]
+            self._write_body(fields, body)
+            out.append(self._frame(body))
+        return out
+
+
+class FixBuilder:
+    """Message builder for one session: caches a MessageTemplate per MsgType."""
+
+    def __init__(self, begin_string: str = "FIX.4.4", header: Optional[Dict[str, Any]] = None):
+        self.begin_string = begin_string
+        self.header = dict(header or {})
+        self._templates: Dict[str, MessageTemplate] = {}
 
+    def template(self, msg_type: str) -> MessageTemplate:
+        """Get (or compile) the template for a message type."""
+        t = self._templates.get(msg_type)
+        if t is None:
+            t = self._templates[msg_type] = MessageTemplate(self.begin_string, msg_type, self.header)
+        return t
 
-def _checksum(s: str) -> str:
-    """Compute FIX checksum."""
-    return _pad3(sum(ord(ch) for ch in s) % 256)
+    def build(self, msg_type: str, fields: Any) -> bytes:
+        """Build one message of msg_type from a dict or (tag, value) pairs."""
+        return self.template(msg_type).build(fields)
+
+    def build_many(self, msg_type: str, rows: Iterable[Any]) -> List[bytes]:
+        """Bulk mode: build many messages of msg_type in one call."""
+        return self.template(msg_type).build_many(rows)
+
+
+_BUILDERS: Dict[str, FixBuilder] = {}
+
+
+def get_builder(begin_string: str = "FIX.4.4") -> FixBuilder:
+    """Shared header-less builder for a BeginString."""
+    b = _BUILDERS.get(begin_string)
+    if b is None:
+        b = _BUILDERS[begin_string] = FixBuilder(begin_string)
+    return b
 
 
 def build_fix(msg_type: str, payload: Dict[str, Any], begin_string: str = "FIX.4.4") -> Dict[str, Any]:
@@ -311,42 +1817,26 @@ def build_fix(msg_type: str, payload: Dict[str, Any], begin_string: str = "FIX.4
     - If no 35 in payload, inject the inferred msg_type
     - Ensure exactly one 35 appears in final message
     """
-    # Filter out reserved tags and prepare payload
-    filtered_payload = {k: v for k, v in payload.items() if k not in ["8", "9", "10"]}
-    
-    # Handle MsgType (35) - client can supply it or we infer it
-    client_msg_type = filtered_payload.get("35")
-    if client_msg_type and str(client_msg_type) != str(msg_type):
-        raise ValueError(f"MsgType (35) mismatch between input '{client_msg_type}' and inferred template '{msg_type}'")
-    
-    # Ensure we have exactly one 35
-    if "35" not in filtered_payload:
-        filtered_payload["35"] = msg_type
-    
-    # Build header and body
-    header = [f"8={begin_string}"]
-    # Remove 35 from body_pairs since we'll add it separately
-    body_pairs = [f"{k}={v}" for k, v in filtered_payload.items() if k != "35"]
-    body_str = SOH.join(body_pairs)
-    
-    # BodyLength counts from after 9=..SOH to before 10=
-    after8 = SOH.join([f"35={filtered_payload['35']}", body_str]) + SOH
-    body_len = len(after8)
-    full_no10 = SOH.join([f"8={begin_string}", f"9={body_len}", f"35={filtered_payload['35']}", body_str]) + SOH
-    csum = _checksum(full_no10)
-    full = full_no10 + f"10={csum}" + SOH
+    full = get_builder(begin_string).build(msg_type, payload).decode("utf-8")
     pretty = normalize_delims(full, to_soh=False)
     return {"raw": full, "pretty": pretty}
 
 
-def explain_exec_report(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """Explain execution report using order state knowledge."""
-    registry = SpecsRegistry()
-    os_doc = registry.specs.get("order_state") or {"states": []}
-    exec_type = str(payload.get("150", ""))
-    ord_status = str(payload.get("39", ""))
-    row = next((s for s in os_doc["states"] if s.get("execType")==exec_type and s.get("ordStatus")==ord_status), None)
-    order_qty = float(payload.get("38", "nan"))
+def explain_exec_report(payload: Dict[str, Any], order_book: Any = None,
+                        fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Explain execution report using order state knowledge.
+
+    fix_version selects the order_state.json to use (default DEFAULT_FIX_VERSION).
+    With an order_book (an order_book.OrderBook), OrderQty falls back to the
+    tracked order when the report omits it, and the tracked state is returned.
+    """
+    registry = SpecsRegistry(fix_version)
+    exec_type = _value_str(payload.get("150", ""))
+    ord_status = _value_str(payload.get("39", ""))
+    row = registry.order_state(exec_type, ord_status)
+    record = order_book.find(payload) if order_book is not None else None
+    order_qty = float(payload.get("38", record.order_qty if record else "nan"))
     cum_qty = float(payload.get("14", "nan"))
     leaves = payload.get("151")
     leaves_calc = None
@@ -358,14 +1848,23 @@ def explain_exec_report(payload: Dict[str, Any]) -> Dict[str, Any]:
     if leaves is not None and not (order_qty != order_qty) and not (cum_qty != cum_qty):
         if abs((cum_qty + float(leaves)) - order_qty) > 1e-9:
             checks.append(f"WARNING: 14 + 151 != 38 ({cum_qty} + {leaves} vs {order_qty})")
-    return {
+    result = {
         "summary": row["explain"] if row else "Execution Report.",
         "execType": exec_type, "ordStatus": ord_status,
         "leavesQty": leaves, "checks": checks
     }
+    if record is not None:
+        result["order"] = record.to_dict()
+    return result
 
 
-def lookup_tag(tag_or_name: str) -> Any:
+def lookup_tag(tag_or_name: str, fix_version: Optional[str] = None) -> Any:
     """Look up field definition by tag or name."""
-    registry = SpecsRegistry()
+    registry = SpecsRegistry(fix_version)
     return registry.lookup_tag(tag_or_name)
+
+
+def lookup_tags(tags_or_names: List[Any], fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """Look up many field definitions by tag or name in one call."""
+    registry = SpecsRegistry(fix_version)
+    return registry.lookup_tags(tags_or_names)
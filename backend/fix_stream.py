@@ -0,0 +1,211 @@
+"""
+Streaming FIX Reader
+
+Frames FIX messages out of session logs, drop-copy files and byte streams using
+BeginString(8) / BodyLength(9) / CheckSum(10), skipping anything between
+messages. Files are memory-mapped and sockets/pipes are read in chunks, so
+memory stays flat regardless of input size; messages are parsed lazily.
+"""
+
+import mmap
+import os
+from typing import Any, BinaryIO, Iterator, Tuple, Union
+
+from .fix_engine import FixMessage, parse_message
+
+_BEGIN = b"8=FIX"
+_MAX_HEADER = 32          # bytes searched after 8= for the first delimiter
+_MAX_LEN_DIGITS = 9       # BodyLength digits accepted before treating as garbage
+_TRAILER_LEN = 7          # "10=NNN" + delimiter
+
+
+def _first_delim(buf: Any, start: int, end: int) -> int:
+    """Position of the first SOH or '|' in buf[start:end], or -1."""
+    soh = buf.find(b"\x01", start, end)
+    pipe = buf.find(b"|", start, end)
+    if soh == -1:
+        return pipe
+    if pipe == -1:
+        return soh
+    return min(soh, pipe)
+
+
+def _checksum_of(buf: Any, start: int, stop: int, sep: bytes) -> int:
+    """FIX checksum of buf[start:stop], computed as if delimiters were SOH."""
+    chunk = buf[start:stop]
+    total = sum(chunk)
+    if sep == b"|":
+        total -= chunk.count(b"|") * (ord("|") - 1)
+    return total % 256
+
+
+def checksum_ok(buf: Any, start: int, stop: int, sep: bytes) -> bool:
+    """Whether the CheckSum(10) of the frame buf[start:stop] (from find_frame) is correct."""
+    cs_at = stop - _TRAILER_LEN
+    return _checksum_of(buf, start, cs_at, sep) == int(buf[cs_at + 3:cs_at + 6])
+
+
+def find_frame(buf: Any, pos: int, end: int, max_message_size: int = 1 << 20,
+               eof: bool = False) -> Tuple[int, int, bytes]:
+    """
+    Locate the next complete FIX message in buf[pos:end].
+
+    Returns (start, stop, sep):
+    - start == -1: no BeginString found in the range
+    - stop == -1: a message starts at start but is not complete yet
+    - otherwise buf[start:stop] is a framed message delimited by sep
+    Candidates whose header or trailer does not line up are skipped as garbage.
+    An incomplete candidate is skipped too when eof says no more bytes will
+    arrive, or when a complete frame with a correct CheckSum already follows it
+    (a corrupt BodyLength), so one bad header cannot hold up the messages behind it.
+    """
+    while True:
+        start = buf.find(_BEGIN, pos, end)
+        if start == -1:
+            return -1, -1, b""
+        pos = start + 1
+
+        hdr_end = min(end, start + _MAX_HEADER)
+        sep_at = _first_delim(buf, start, hdr_end)
+        if sep_at == -1:
+            if hdr_end == end and end - start < _MAX_HEADER:
+                if _abandon(buf, pos, end, max_message_size, eof):
+                    continue
+                return start, -1, b""
+            continue
+        if buf.find(b"=", start + 2, sep_at) != -1:
+            # "8=FIX" inside garbage that runs into a later field
+            continue
+        sep = buf[sep_at:sep_at + 1]
+
+        nine = sep_at + 1
+        if end < nine + 2:
+            if _abandon(buf, pos, end, max_message_size, eof):
+                continue
+            return start, -1, b""
+        if buf[nine:nine + 2] != b"9=":
+            continue
+        len_end = buf.find(sep, nine + 2, min(end, nine + 3 + _MAX_LEN_DIGITS))
+        if len_end == -1:
+            if end - (nine + 2) <= _MAX_LEN_DIGITS:
+                if _abandon(buf, pos, end, max_message_size, eof):
+                    continue
+                return start, -1, b""
+            continue
+        digits = buf[nine + 2:len_end]
+        if not digits.isdigit() or int(digits) > max_message_size:
+            continue
+
+        cs_at = len_end + 1 + int(digits)
+        stop = cs_at + _TRAILER_LEN
+        if stop > end:
+            if _abandon(buf, pos, end, max_message_size, eof):
+                continue
+            return start, -1, b""
+        if (buf[cs_at:cs_at + 3] != b"10=" or buf[stop - 1:stop] != sep
+                or not buf[cs_at + 3:cs_at + 6].isdigit()):
+            continue
+        return start, stop, sep
+
+
+def _abandon(buf: Any, pos: int, end: int, max_message_size: int, eof: bool) -> bool:
+    """Whether an incomplete candidate before pos should be given up (see find_frame)."""
+    if eof:
+        return True
+    while True:
+        start, stop, sep = find_frame(buf, pos, end, max_message_size, eof=True)
+        if start == -1:
+            return False
+        if checksum_ok(buf, start, stop, sep):
+            return True
+        pos = start + 1
+
+
+class FixStreamReader:
+    """
+    Lazily yields FixMessage objects framed from a file path or binary stream.
+
+    A path is memory-mapped; any object with read() or recv() is consumed in
+    chunk_size reads. Counters (messages, garbage_bytes, bad_checksums) are
+    updated as the stream is consumed.
+    """
+
+    def __init__(self, source: Union[str, os.PathLike, BinaryIO, Any], verify_checksum: bool = False,
+                 chunk_size: int = 1 << 20, max_message_size: int = 1 << 20):
+        self.source = source
+        self.verify_checksum = verify_checksum
+        self.chunk_size = chunk_size
+        self.max_message_size = max_message_size
+        self.messages = 0
+        self.garbage_bytes = 0
+        self.bad_checksums = 0
+
+    def __iter__(self) -> Iterator[FixMessage]:
+        for frame in self.frames():
+            yield parse_message(frame)
+
+    def frames(self) -> Iterator[bytes]:
+        """Yield each framed message as bytes (one small copy per message)."""
+        if isinstance(self.source, (str, os.PathLike)):
+            return self._frames_from_path(self.source)
+        return self._frames_from_stream(self.source)
+
+    def _accept(self, buf: Any, start: int, stop: int, sep: bytes) -> bool:
+        """Apply the optional checksum check and update counters for one frame."""
+        if self.verify_checksum and not checksum_ok(buf, start, stop, sep):
+            self.bad_checksums += 1
+            return False
+        self.messages += 1
+        return True
+
+    def _frames_from_path(self, path: Union[str, os.PathLike]) -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = len(mm)
+                pos = 0
+                while pos < end:
+                    start, stop, sep = find_frame(mm, pos, end, self.max_message_size, eof=True)
+                    if start == -1:
+                        # no further message (a truncated one at EOF included)
+                        self.garbage_bytes += end - pos
+                        break
+                    self.garbage_bytes += start - pos
+                    if self._accept(mm, start, stop, sep):
+                        yield mm[start:stop]
+                    pos = stop
+
+    def _frames_from_stream(self, stream: Any) -> Iterator[bytes]:
+        read = stream.recv if hasattr(stream, "recv") else stream.read
+        buf = bytearray()
+        eof = False
+        while not eof:
+            chunk = read(self.chunk_size)
+            if not chunk:
+                eof = True
+            else:
+                buf += chunk
+            pos = 0
+            end = len(buf)
+            while True:
+                start, stop, sep = find_frame(buf, pos, end, self.max_message_size, eof=eof)
+                if start == -1:
+                    # keep a possible partial BeginString at the tail
+                    keep = 0 if eof else min(end - pos, len(_BEGIN) - 1)
+                    self.garbage_bytes += end - pos - keep
+                    pos = end - keep
+                    break
+                self.garbage_bytes += start - pos
+                pos = start
+                if stop == -1:
+                    break
+                if self._accept(buf, start, stop, sep):
+                    yield bytes(buf[start:stop])
+                pos = stop
+            del buf[:pos]
+
+
+def read_fix_log(source: Union[str, os.PathLike, BinaryIO, Any], verify_checksum: bool = False) -> Iterator[FixMessage]:
+    """Iterate parsed messages from a FIX log file or binary stream."""
+    return iter(FixStreamReader(source, verify_checksum=verify_checksum))
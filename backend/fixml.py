@@ -0,0 +1,419 @@
+"""
+FIX <-> FIXML Conversion
+
+Streams tag=value messages to FIXML and FIXML back to tag=value one message at
+a time, so multi-GB files convert in constant memory. Names come from the
+version's FixmlTables (SpecsRegistry.get_fixml_tables()): fields are attributes
+named by their fixml_element ("T<tag>" when the dictionary has none), header
+fields go on <Hdr>, and each repeating group entry is a child element named
+after its NumInGroup field:
+
+    <FIXML v="4.4">
+    <Batch>
+    <Order ClOrdID="A1" Acct="X" T55="AAPL"><Hdr SndCompID="BUY" T56="SELL" SndgTm="..."/></Order>
+    </Batch>
+    </FIXML>
+
+Reading accepts that layout and plain FIXML documents (namespaced, a single
+message or a Batch); component elements such as <Instrmt> are flattened into
+their message.
+
+Usage:
+    python -m backend.fixml to-fixml session.log -o session.xml
+    python -m backend.fixml to-fix session.xml -o session.log [--delimiter '|']
+"""
+
+import argparse
+import contextlib
+import json
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, TextIO, Tuple, Union
+
+from .fix_engine import (BEGIN_STRINGS, SOH, FixMessage, FixmlTables, SpecsRegistry, _value_str,
+                         begin_string_for, get_builder)
+from .fix_stream import FixStreamReader
+from .settings import DEFAULT_FIX_VERSION
+
+_FRAMING_TAGS = frozenset({"8", "9", "10"})
+_ESCAPE_RE = re.compile(r'[&<>"\x00-\x1f]')
+_INVALID_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_ENTITIES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"),
+             ("\t", "&#9;"), ("\n", "&#10;"), ("\r", "&#13;"))
+# Message element for a MsgType with no FIXML name; its MsgType goes in this attribute
+_GENERIC_ELEMENT, _GENERIC_TYPE_ATTR = "Msg", "MsgTyp"
+
+Item = Tuple[Any, ...]   # (tag, value) or (tag, count, [entry items, ...]) for a repeating group
+
+
+class FixmlError(ValueError):
+    """A message that cannot be converted (unknown element/attribute, tag repeated outside a group, bad character)."""
+
+
+def _quote(value: str) -> str:
+    """Escape an attribute value; tabs/newlines become character references so parsers keep them."""
+    if _ESCAPE_RE.search(value) is None:
+        return value
+    if _INVALID_XML_RE.search(value):
+        raise FixmlError(f"Value {value!r} contains characters XML cannot carry")
+    for ch, entity in _ENTITIES:
+        value = value.replace(ch, entity)
+    return value
+
+
+def _local(name: str) -> str:
+    """Element or attribute name without its {namespace}."""
+    return name.rsplit("}", 1)[-1] if name[:1] == "{" else name
+
+
+def _pairs(message: Any) -> Iterable[Tuple[str, str]]:
+    if isinstance(message, FixMessage):
+        return message.items()
+    if isinstance(message, dict):
+        return ((str(k), _value_str(v)) for k, v in message.items())
+    # raw frames: one split is much cheaper than indexing a FixMessage
+    text = bytes(message).decode("utf-8", "replace") if isinstance(message, (bytes, bytearray, memoryview)) else message
+    sep = SOH if SOH in text else "|"
+    return [field.partition("=")[::2] for field in text.split(sep) if field]
+
+
+def _collect(pairs: List[Tuple[str, str]], i: int, group_tags: frozenset) -> Tuple[List[Item], int]:
+    """
+    Fields from pairs[i:] up to the first tag seen twice; returns (items, next index).
+
+    A NumInGroup field takes its entries with it: each entry starts at the
+    group's first tag and runs until that tag (or any tag of the entry) repeats.
+    """
+    items: List[Item] = []
+    seen = set()
+    n = len(pairs)
+    while i < n:
+        tag, value = pairs[i]
+        if tag in seen:
+            break
+        seen.add(tag)
+        i += 1
+        if tag in group_tags and value.isdigit() and int(value) > 0 and i < n:
+            count, delim = int(value), pairs[i][0]
+            entries: List[List[Item]] = []
+            while i < n and len(entries) < count and pairs[i][0] == delim:
+                entry, i = _collect(pairs, i, group_tags)
+                entries.append(entry)
+            items.append((tag, value, entries))
+        else:
+            items.append((tag, value))
+    return items, i
+
+
+def _render(name: str, items: List[Item], tables: FixmlTables, extra: str = "",
+            children: Optional[List[str]] = None) -> str:
+    attrs = [extra]
+    children = children or []
+    for item in items:
+        if len(item) == 2:
+            attrs.append(f' {tables.attr(item[0])}="{_quote(item[1])}"')
+        else:
+            entry_name = tables.attr(item[0])
+            children.extend(_render(entry_name, entry, tables) for entry in item[2])
+    if children:
+        return f"<{name}{''.join(attrs)}>{''.join(children)}</{name}>"
+    return f"<{name}{''.join(attrs)}/>"
+
+
+def message_to_fixml(message: Any, tables: FixmlTables) -> str:
+    """One message (raw str/bytes, FixMessage or dict) as a FIXML message element."""
+    msg_type = None
+    header: List[Tuple[str, str]] = []
+    body: List[Tuple[str, str]] = []
+    for tag, value in _pairs(message):
+        if tag in _FRAMING_TAGS:
+            continue
+        if tag == "35":
+            msg_type = value
+        elif tag in tables.header_tags:
+            header.append((tag, value))
+        else:
+            body.append((tag, value))
+    if not msg_type:
+        raise FixmlError("Missing MsgType(35)")
+    children: List[str] = []
+    if header:
+        hdr, end = _collect(header, 0, frozenset())
+        if end < len(header):
+            raise FixmlError(f"Header tag {header[end][0]} repeats")
+        children.append(_render("Hdr", hdr, tables))
+    items, end = _collect(body, 0, tables.group_tags)
+    if end < len(body):
+        raise FixmlError(f"Tag {body[end][0]} repeats outside a repeating group")
+    element = tables.element(msg_type)
+    if element is None:
+        return _render(_GENERIC_ELEMENT, items, tables, f' {_GENERIC_TYPE_ATTR}="{_quote(msg_type)}"', children)
+    return _render(element, items, tables, children=children)
+
+
+class FixmlWriter:
+    """
+    Incremental FIXML document writer.
+
+    write() appends one message element to out (a text stream) as soon as it
+    is converted; close() ends the document. batch=False writes a single
+    message without the <Batch> wrapper.
+    """
+
+    def __init__(self, out: TextIO, fix_version: Optional[str] = None, batch: bool = True):
+        self.out = out
+        self.fix_version = fix_version or DEFAULT_FIX_VERSION
+        self.tables = SpecsRegistry(fix_version).get_fixml_tables()
+        self.batch = batch
+        self.messages = 0
+        self._started = False
+
+    def _start(self) -> None:
+        self.out.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<FIXML v="{_quote(self.fix_version)}">\n')
+        if self.batch:
+            self.out.write("<Batch>\n")
+        self._started = True
+
+    def write(self, message: Any) -> None:
+        """Convert and write one message; raises FixmlError (writing nothing) if it cannot be converted."""
+        element = message_to_fixml(message, self.tables)
+        if not self._started:
+            self._start()
+        elif not self.batch and self.messages:
+            raise FixmlError("batch=False writes a single message")
+        self.out.write(element)
+        self.out.write("\n")
+        self.messages += 1
+
+    def close(self) -> None:
+        """End the document (an empty document if nothing was written)."""
+        if not self._started:
+            self._start()
+        self.out.write("</Batch>\n</FIXML>\n" if self.batch else "</FIXML>\n")
+
+    def __enter__(self) -> "FixmlWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class FixmlReader:
+    """
+    Streams tag=value messages out of a FIXML document with a pull parser.
+
+    Iterating reads source (a path or binary stream) in chunk_size pieces and
+    yields each message as SOH-delimited FIX bytes; only the message being
+    converted is kept in memory. For push parsing, call feed()/close() instead;
+    they return (index, FIX bytes or FixmlError) per completed message. With
+    strict=False, iteration records unconvertible messages in errors and goes on.
+    """
+
+    def __init__(self, source: Union[str, BinaryIO, None] = None, fix_version: Optional[str] = None,
+                 strict: bool = True, chunk_size: int = 1 << 20):
+        self.source = source
+        self.fix_version = fix_version
+        self.strict = strict
+        self.chunk_size = chunk_size
+        self.tables = SpecsRegistry(fix_version).get_fixml_tables()
+        self.begin_string = begin_string_for(fix_version)
+        self.messages = 0
+        self.errors: List[Tuple[int, str]] = []
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._depth = 0
+        self._msg_depth = 0
+        self._container: Optional[ET.Element] = None
+
+    def __iter__(self):
+        if isinstance(self.source, str):
+            with open(self.source, "rb") as f:
+                yield from self._read(f)
+        else:
+            yield from self._read(self.source)
+
+    def _read(self, stream: BinaryIO):
+        while True:
+            chunk = stream.read(self.chunk_size)
+            if not chunk:
+                break
+            yield from self._results(self.feed(chunk))
+        yield from self._results(self.close())
+
+    def _results(self, items: List[Tuple[int, Union[bytes, FixmlError]]]):
+        for index, out in items:
+            if isinstance(out, FixmlError):
+                if self.strict:
+                    raise out
+                self.errors.append((index, str(out)))
+            else:
+                yield out
+
+    def feed(self, data: bytes) -> List[Tuple[int, Union[bytes, FixmlError]]]:
+        """Push a chunk of the document; raises ET.ParseError on malformed XML."""
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> List[Tuple[int, Union[bytes, FixmlError]]]:
+        """Signal the end of the document."""
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[Tuple[int, Union[bytes, FixmlError]]]:
+        out: List[Tuple[int, Union[bytes, FixmlError]]] = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._depth += 1
+                if self._depth == 1:
+                    self._container = elem
+                    if _local(elem.tag) == "FIXML":
+                        self._msg_depth = 2
+                        version = elem.get("v")
+                        if version in BEGIN_STRINGS:
+                            self.begin_string = BEGIN_STRINGS[version]
+                    else:
+                        self._msg_depth = 1   # a bare message element
+                elif self._depth == 2 and self._msg_depth == 2 and _local(elem.tag) == "Batch":
+                    self._msg_depth = 3
+                    self._container = elem
+                continue
+            if self._depth == self._msg_depth:
+                index = self.messages
+                self.messages += 1
+                try:
+                    out.append((index, self.message(elem)))
+                except FixmlError as e:
+                    out.append((index, e))
+                # drop converted messages so memory stays flat
+                if self._container is not None:
+                    self._container.clear()
+            self._depth -= 1
+        return out
+
+    def message(self, elem: ET.Element) -> bytes:
+        """Convert one FIXML message element to SOH-delimited FIX bytes."""
+        name = _local(elem.tag)
+        msg_type = elem.get(_GENERIC_TYPE_ATTR) if name == _GENERIC_ELEMENT else self.tables.msg_type(name)
+        if not msg_type:
+            raise FixmlError(f"Unknown FIXML message element <{name}>")
+        pairs: List[Tuple[str, str]] = []
+        for child in elem:
+            if _local(child.tag) == "Hdr":
+                self._attrs(child, pairs)
+        self._attrs(elem, pairs, skip=_GENERIC_TYPE_ATTR if name == _GENERIC_ELEMENT else None)
+        self._children([c for c in elem if _local(c.tag) != "Hdr"], pairs)
+        return get_builder(self.begin_string).build(msg_type, pairs)
+
+    def _attrs(self, elem: ET.Element, pairs: List[Tuple[str, str]], skip: Optional[str] = None) -> None:
+        for name, value in elem.attrib.items():
+            if name[:1] == "{" or name == skip:
+                continue   # namespaced attributes (xsi:...) are not fields
+            tag = self.tables.tag(name)
+            if tag is None:
+                raise FixmlError(f"Unknown FIXML attribute {name} on <{_local(elem.tag)}>")
+            pairs.append((tag, value))
+
+    def _children(self, children: List[ET.Element], pairs: List[Tuple[str, str]]) -> None:
+        """Consecutive elements named after a NumInGroup field are one group; others are components."""
+        group_tags = self.tables.group_tags
+        i = 0
+        while i < len(children):
+            name = _local(children[i].tag)
+            tag = self.tables.tag(name)
+            if tag in group_tags:
+                j = i
+                while j < len(children) and _local(children[j].tag) == name:
+                    j += 1
+                pairs.append((tag, str(j - i)))
+                for entry in children[i:j]:
+                    self._attrs(entry, pairs)
+                    self._children(list(entry), pairs)
+                i = j
+            else:
+                self._attrs(children[i], pairs)
+                self._children(list(children[i]), pairs)
+                i += 1
+
+
+def fix_to_fixml(message: Any, fix_version: Optional[str] = None) -> str:
+    """One message as a standalone FIXML document."""
+    tables = SpecsRegistry(fix_version).get_fixml_tables()
+    return f'<FIXML v="{_quote(fix_version or DEFAULT_FIX_VERSION)}">{message_to_fixml(message, tables)}</FIXML>'
+
+
+def fixml_to_fix(document: Union[str, bytes], fix_version: Optional[str] = None) -> List[str]:
+    """Every message in a FIXML document as an SOH-delimited FIX string."""
+    reader = FixmlReader(fix_version=fix_version)
+    items = reader.feed(document.encode() if isinstance(document, str) else document) + reader.close()
+    return [out.decode() for out in reader._results(items)]
+
+
+def convert_fix_to_fixml(messages: Iterable[Any], out: TextIO, fix_version: Optional[str] = None,
+                         show_errors: int = 0) -> Dict[str, Any]:
+    """Write every message (raw frames, FixMessage or dicts) into one FIXML document; unconvertible ones are skipped and counted."""
+    errors = 0
+    start = time.perf_counter()
+    with FixmlWriter(out, fix_version) as writer:
+        for index, msg in enumerate(messages):
+            try:
+                writer.write(msg)
+            except FixmlError as e:
+                errors += 1
+                if errors <= show_errors:
+                    print(json.dumps({"index": index, "error": str(e)}), file=sys.stderr)
+    return _stats(writer.messages, errors, time.perf_counter() - start)
+
+
+def convert_fixml_to_fix(reader: FixmlReader, out: BinaryIO, delimiter: str = "\x01",
+                         show_errors: int = 0) -> Dict[str, Any]:
+    """Write every message of a FIXML document as tag=value, one per line."""
+    written = 0
+    sep = delimiter.encode()
+    start = time.perf_counter()
+    for raw in reader:
+        out.write(raw if sep == b"\x01" else raw.replace(b"\x01", sep))
+        out.write(b"\n")
+        written += 1
+    for index, error in reader.errors[:show_errors]:
+        print(json.dumps({"index": index, "error": error}), file=sys.stderr)
+    return _stats(written, len(reader.errors), time.perf_counter() - start)
+
+
+def _stats(messages: int, errors: int, elapsed: float) -> Dict[str, Any]:
+    return {
+        "messages": messages,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "messagesPerSec": round(messages / elapsed) if elapsed > 0 else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert FIX tag=value logs to FIXML and back, streaming.")
+    parser.add_argument("direction", choices=("to-fixml", "to-fix"))
+    parser.add_argument("path", help="input file, or '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file (default stdout)")
+    parser.add_argument("--fix-version", default=None, help="dictionary version (default: DEFAULT_FIX_VERSION)")
+    parser.add_argument("--delimiter", default="\x01", help="to-fix: field delimiter to write (default SOH)")
+    parser.add_argument("--verify-checksum", action="store_true", help="to-fixml: drop messages whose CheckSum(10) is wrong")
+    parser.add_argument("--show-errors", type=int, default=0, metavar="N", help="print the first N failed messages to stderr")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin.buffer if args.path == "-" else args.path
+    if args.direction == "to-fixml":
+        reader = FixStreamReader(source, verify_checksum=args.verify_checksum)
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="\n")
+        with out if out is not sys.stdout else contextlib.nullcontext(out):
+            stats = convert_fix_to_fixml(reader.frames(), out, args.fix_version, args.show_errors)
+    else:
+        out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        with out if out is not sys.stdout.buffer else contextlib.nullcontext(out):
+            stats = convert_fixml_to_fix(FixmlReader(source, args.fix_version, strict=False), out,
+                                         args.delimiter, args.show_errors)
+    print(json.dumps(stats, indent=2), file=sys.stderr)
+    return 0 if stats["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
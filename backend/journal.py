@@ -0,0 +1,775 @@
+"""
+FIX Message Journal
+
+Append-only store of raw FIX messages in segment files (each segment is a
+plain FIX log that FixStreamReader can read) with memory-mapped side indexes,
+so a resend range or an order's full history costs a few page reads instead
+of a scan:
+
+- messages.idx    one fixed-size record per message: segment, offset, length,
+                  session, MsgSeqNum
+- seq-S-G.idx     per session direction (SenderCompID->TargetCompID) and
+                  sequence generation: (MsgSeqNum, message number) records,
+                  binary-searched in place
+- orders.idx      postings (key hash, message number, previous posting),
+                  chained per ClOrdID(11)/OrigClOrdID(41) and OrderID(37)
+- orders.tbl      open-addressing hash table: key hash -> newest posting
+
+Writes are buffered and fsynced in batches (every fsync_every messages or
+fsync_interval seconds, checked on append, and on sync()/close()); every sync
+records a checkpoint. On open, messages past the last checkpoint are
+re-indexed from the segments and a torn tail is cut off, so a crash loses at
+most the unsynced batch. With start_background_sync() (used by FixSession on
+an event loop) the fsyncs and checkpoint writes of automatic syncs run on a
+flusher thread, so append() never waits on the disk.
+
+    with Journal("/var/lib/fix/journal") as journal:
+        journal.append(raw)
+        for seq, raw in journal.read_range("SELL->BUY", 10, 20): ...
+        history = journal.order_history(cl_ord_id="C1")
+
+Usage:
+    python -m backend.journal DIR append session.log [--verify-checksum]
+    python -m backend.journal DIR range SELL->BUY 10 20
+    python -m backend.journal DIR history --cl-ord-id C1
+    python -m backend.journal DIR replay [--explain] [--track-orders]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from struct import Struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .fix_engine import FixMessage, SpecsRegistry, explain_exec_report, parse_message, validate_fix
+from .fix_stream import FixStreamReader, find_frame
+from .order_book import OrderBook
+from .settings import JOURNAL_FSYNC_EVERY, JOURNAL_FSYNC_INTERVAL, JOURNAL_SEGMENT_MB
+
+logger = logging.getLogger(__name__)
+
+_MSG = Struct("<IIQII")        # segment, length, offset, session id, MsgSeqNum
+_SEQ = Struct("<QQ")           # MsgSeqNum, message number
+_POSTING = Struct("<QQQ")      # key hash, message number, previous posting + 1 (0 = none)
+_SLOT = Struct("<QQ")          # key hash, newest posting + 1 (0 = empty slot)
+
+_CHECKPOINT = "checkpoint.json"
+_SEGMENT_RE = re.compile(r"segment-(\d{8})\.log")
+_SEQ_FILE_RE = re.compile(r"seq-(\d{6})-(\d{6})\.idx")
+_NO_SESSION = 0xFFFFFFFF
+_INITIAL_TABLE = 1 << 16       # slots; doubled at 50% load
+_MAX_READERS = 16              # read-only fds kept open for sealed segments
+_NO_ORDER_ID = "NONE"          # OrderID(37) placeholder on rejects; never indexed
+
+
+def session_name(sender_comp_id: str, target_comp_id: str) -> str:
+    """Journal session key: one direction of a FIX session, i.e. one MsgSeqNum sequence."""
+    return f"{sender_comp_id}->{target_comp_id}"
+
+
+def _key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+def _order_keys(msg: FixMessage) -> List[bytes]:
+    """Index keys of a message; ClOrdID(11) and OrigClOrdID(41) share a namespace, OrderID(37) has its own."""
+    keys: List[bytes] = []
+    for tag, prefix in ((11, b"C"), (41, b"C"), (37, b"O")):
+        v = msg.get(tag)
+        if v and not (tag == 37 and v == _NO_ORDER_ID):
+            key = prefix + v.encode()
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+
+class _AppendFile:
+    """Append-only file: writes are buffered until flush(), reads go through pread or a read-only mmap."""
+
+    __slots__ = ("path", "fd", "size", "synced", "_pending", "_map")
+
+    def __init__(self, path: str, truncate_to: Optional[int] = None):
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self.fd).st_size
+        if truncate_to is not None and size > truncate_to:
+            os.ftruncate(self.fd, truncate_to)
+            size = truncate_to
+        self.size = size              # logical size, buffered bytes included
+        self.synced = size
+        self._pending = bytearray()
+        self._map: Any = None
+
+    def append(self, data: bytes) -> int:
+        """Buffer data at the end of the file; returns its offset."""
+        offset = self.size
+        self._pending += data
+        self.size += len(data)
+        return offset
+
+    def flush(self) -> None:
+        pos = self.size - len(self._pending)
+        while self._pending:
+            n = os.pwrite(self.fd, self._pending, pos)
+            del self._pending[:n]
+            pos += n
+
+    def read(self, offset: int, length: int) -> bytes:
+        if offset + length > self.size - len(self._pending):
+            self.flush()
+        return os.pread(self.fd, length, offset)
+
+    def view(self) -> Any:
+        """Read-only mmap of the whole file, remapped when it has grown."""
+        self.flush()
+        if self._map is None or len(self._map) != self.size:
+            # the previous map is dropped, not closed: readers may still hold it
+            self._map = mmap.mmap(self.fd, self.size, access=mmap.ACCESS_READ) if self.size else b""
+        return self._map
+
+    def close(self) -> None:
+        self.flush()
+        self._map = None
+        os.close(self.fd)
+
+
+class _KeyTable:
+    """mmap'd open-addressing (linear probing) hash table of key hash -> newest posting + 1."""
+
+    __slots__ = ("path", "capacity", "keys", "_map")
+
+    def __init__(self, path: str, capacity: int, keys: int = 0, create: bool = True):
+        self.path = path
+        self.capacity = capacity
+        self.keys = keys
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | (os.O_TRUNC if create else 0), 0o644)
+        try:
+            if create:
+                os.ftruncate(fd, capacity * _SLOT.size)
+            elif os.fstat(fd).st_size != capacity * _SLOT.size:
+                raise ValueError(f"{path} does not match the checkpoint")
+            self._map = mmap.mmap(fd, capacity * _SLOT.size)
+        finally:
+            os.close(fd)
+
+    def find(self, h: int) -> Tuple[int, int]:
+        """(slot, head) for key hash h; head is 0 when absent and slot is where it would go."""
+        mask = self.capacity - 1
+        m = self._map
+        i = h & mask
+        while True:
+            kh, head = _SLOT.unpack_from(m, i * _SLOT.size)
+            if head == 0 or kh == h:
+                return i, head
+            i = (i + 1) & mask
+
+    def set(self, slot: int, h: int, head: int, new: bool) -> None:
+        _SLOT.pack_into(self._map, slot * _SLOT.size, h, head)
+        if new:
+            self.keys += 1
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        m = self._map
+        for i in range(self.capacity):
+            kh, head = _SLOT.unpack_from(m, i * _SLOT.size)
+            if head:
+                yield kh, head
+
+    def grown(self) -> "_KeyTable":
+        """A table of twice the capacity with the same entries, replacing this one on disk."""
+        tmp = self.path + ".tmp"
+        table = _KeyTable(tmp, self.capacity * 2)
+        for h, head in self.items():
+            slot, _ = table.find(h)
+            table.set(slot, h, head, True)
+        os.replace(tmp, self.path)
+        table.path = self.path
+        self.close()
+        return table
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def close(self) -> None:
+        self._map.close()
+
+
+class _Flusher:
+    """Thread running the fsync half of journal syncs in submission order."""
+
+    def __init__(self, commit: Any):
+        self._commit = commit
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self.error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="journal-flusher", daemon=True)
+        self._thread.start()
+
+    def submit(self, batch: Any) -> None:
+        self._queue.put(batch)
+
+    def wait(self) -> None:
+        """Block until every submitted batch is on disk."""
+        self._queue.join()
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    return
+                self._commit(batch)
+            except Exception as e:      # re-raised by the journal's next append/sync
+                logger.exception("Journal sync failed")
+                self.error = e
+            finally:
+                self._queue.task_done()
+
+
+class Journal:
+    """
+    Append-only FIX message journal in directory path (created if missing).
+
+    Message numbers are positions in append order starting at 0. One writer
+    per directory; not thread-safe apart from the background flusher, which
+    only fsyncs data the owner thread has already written.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], segment_size: Optional[int] = None,
+                 fsync_every: Optional[int] = None, fsync_interval: Optional[float] = None):
+        self.path = os.fspath(path)
+        os.makedirs(self.path, exist_ok=True)
+        self.segment_size = segment_size or JOURNAL_SEGMENT_MB << 20
+        self.fsync_every = JOURNAL_FSYNC_EVERY if fsync_every is None else fsync_every
+        self.fsync_interval = JOURNAL_FSYNC_INTERVAL if fsync_interval is None else fsync_interval
+        self.messages = 0
+        self.recovered = 0            # messages re-indexed from the segments on open
+        # session name -> [id, generation, last MsgSeqNum]
+        self._sessions: Dict[str, List[int]] = {}
+        self._seq_files: Dict[Tuple[int, int], _AppendFile] = {}
+        self._readers: "OrderedDict[int, int]" = OrderedDict()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._retired: List[_AppendFile] = []    # rolled segments awaiting their last fsync
+        self._flusher: Optional[_Flusher] = None
+        self._closed = False
+        self._open()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.messages
+
+    # -- files -------------------------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _segment_path(self, segment: int) -> str:
+        return self._file(f"segment-{segment:08d}.log")
+
+    def _segment_numbers(self) -> List[int]:
+        return sorted(int(m.group(1)) for m in map(_SEGMENT_RE.fullmatch, os.listdir(self.path)) if m)
+
+    def _seq_file(self, sid: int, generation: int) -> _AppendFile:
+        f = self._seq_files.get((sid, generation))
+        if f is None:
+            f = self._seq_files[(sid, generation)] = _AppendFile(self._file(f"seq-{sid:06d}-{generation:06d}.idx"))
+        return f
+
+    def _reader(self, segment: int) -> int:
+        fd = self._readers.get(segment)
+        if fd is None:
+            fd = self._readers[segment] = os.open(self._segment_path(segment), os.O_RDONLY)
+            if len(self._readers) > _MAX_READERS:
+                os.close(self._readers.popitem(last=False)[1])
+        else:
+            self._readers.move_to_end(segment)
+        return fd
+
+    # -- open / recovery ---------------------------------------------------
+
+    def _read_checkpoint(self) -> Dict[str, Any]:
+        try:
+            with open(self._file(_CHECKPOINT)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"messages": 0, "segment": 1, "segmentSize": 0, "orders": 0, "sessions": {}, "clean": False}
+
+    def _write_checkpoint(self, clean: bool) -> None:
+        self._store_checkpoint(self._checkpoint_state(clean))
+
+    def _checkpoint_state(self, clean: bool) -> Dict[str, Any]:
+        return {
+            "messages": self.messages,
+            "segment": self._segment_no,
+            "segmentSize": self._segment.size,
+            "orders": self._postings.size // _POSTING.size,
+            "sessions": {name: [sid, gen, last, self._seq_file(sid, gen).size // _SEQ.size]
+                         for name, (sid, gen, last) in self._sessions.items()},
+            "clean": clean,
+            "tableCapacity": self._table.capacity,
+            "orderKeys": self._table.keys,
+        }
+
+    def _store_checkpoint(self, state: Dict[str, Any]) -> None:
+        tmp = self._file(_CHECKPOINT + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._file(_CHECKPOINT))
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _open(self) -> None:
+        ckpt = self._read_checkpoint()
+        self.messages = ckpt["messages"]
+        self._index = _AppendFile(self._file("messages.idx"), self.messages * _MSG.size)
+        self._postings = _AppendFile(self._file("orders.idx"), ckpt["orders"] * _POSTING.size)
+
+        # sequence indexes: drop sessions/generations newer than the checkpoint, cut the rest back to it
+        generations = {}
+        for name, (sid, gen, last, count) in ckpt["sessions"].items():
+            self._sessions[name] = [sid, gen, last]
+            generations[sid] = (gen, count)
+        for fname in os.listdir(self.path):
+            m = _SEQ_FILE_RE.fullmatch(fname)
+            if m is None:
+                continue
+            sid, gen = int(m.group(1)), int(m.group(2))
+            current = generations.get(sid)
+            if current is None or gen > current[0]:
+                os.remove(self._file(fname))
+            elif gen == current[0]:
+                self._seq_files[(sid, gen)] = _AppendFile(self._file(fname), current[1] * _SEQ.size)
+
+        self._segment_no = ckpt["segment"]
+        self._segment = _AppendFile(self._segment_path(self._segment_no))
+        table_path = self._file("orders.tbl")
+        if ckpt["clean"] and os.path.exists(table_path):
+            self._table = _KeyTable(table_path, ckpt["tableCapacity"], ckpt["orderKeys"], create=False)
+            self._write_checkpoint(clean=False)
+        else:
+            # the table may point at postings lost in the crash: rebuild it, then catch up from the segments
+            self._table = self._rebuild_table(table_path)
+            self._recover(ckpt["segmentSize"])
+            self.sync()
+
+    def _rebuild_table(self, path: str) -> _KeyTable:
+        table = _KeyTable(path, _INITIAL_TABLE)
+        view = self._postings.view()
+        for p in range(self._postings.size // _POSTING.size):
+            h = _POSTING.unpack_from(view, p * _POSTING.size)[0]
+            slot, head = table.find(h)
+            table.set(slot, h, p + 1, head == 0)
+            if table.keys * 2 > table.capacity:
+                table = table.grown()
+        return table
+
+    def _recover(self, offset: int) -> None:
+        """Index messages written after the checkpoint and cut off a torn tail."""
+        while self._recover_segment(offset):
+            later = [s for s in self._segment_numbers() if s > self._segment_no]
+            if not later:
+                break
+            self._segment.close()
+            self._segment_no = later[0]
+            self._segment = _AppendFile(self._segment_path(self._segment_no))
+            offset = 0
+        if self.recovered:
+            logger.warning(f"FIX journal {self.path}: re-indexed {self.recovered} messages after the last checkpoint")
+
+    def _recover_segment(self, pos: int) -> bool:
+        """Index complete messages of the active segment from pos; returns False if a torn tail was cut."""
+        f = self._segment
+        size = f.size
+        if size > pos:
+            with mmap.mmap(f.fd, size, access=mmap.ACCESS_READ) as buf:
+                while pos < size:
+                    start, stop, _ = find_frame(buf, pos, size)
+                    if start != pos or stop == -1:
+                        break
+                    self._index_message(parse_message(buf[start:stop]), start, stop - start)
+                    self.recovered += 1
+                    pos = stop
+        if pos >= size:
+            return True
+        logger.warning(f"FIX journal {f.path}: truncating {size - pos} bytes of torn tail")
+        for later in [s for s in self._segment_numbers() if s > self._segment_no]:
+            os.remove(self._segment_path(later))
+        os.ftruncate(f.fd, pos)
+        f.size = f.synced = pos
+        return False
+
+    # -- writing -----------------------------------------------------------
+
+    def _index_session(self, msg: FixMessage, n: int) -> Tuple[int, int]:
+        sender, target = msg.get(49), msg.get(56)
+        try:
+            seq = int(msg.get(34, "0"))
+        except ValueError:
+            seq = 0
+        if not sender or not target or seq <= 0:
+            return _NO_SESSION, 0
+        name = session_name(sender, target)
+        state = self._sessions.get(name)
+        if state is None:
+            state = self._sessions[name] = [len(self._sessions), 0, 0]
+        sid, gen, last = state
+        if seq <= last:
+            if msg.get(43) == "Y":
+                # PossDup copy of an earlier number: kept in the log, not in the sequence index
+                return sid, seq
+            gen = state[1] = gen + 1      # sequence reset starts a new generation
+        state[2] = seq
+        self._seq_file(sid, gen).append(_SEQ.pack(seq, n))
+        return sid, seq
+
+    def _post(self, key: bytes, n: int) -> None:
+        h = _key_hash(key)
+        table = self._table
+        slot, head = table.find(h)
+        p = self._postings.append(_POSTING.pack(h, n, head)) // _POSTING.size
+        table.set(slot, h, p + 1, head == 0)
+        if table.keys * 2 > table.capacity:
+            self._table = table.grown()
+
+    def _index_message(self, msg: FixMessage, offset: int, length: int) -> int:
+        n = self.messages
+        sid, seq = self._index_session(msg, n)
+        self._index.append(_MSG.pack(self._segment_no, length, offset, sid, seq))
+        for key in _order_keys(msg):
+            self._post(key, n)
+        self.messages = n + 1
+        return n
+
+    def _roll(self) -> None:
+        # fsynced and closed by the next sync
+        self._segment.flush()
+        self._retired.append(self._segment)
+        self._segment_no += 1
+        self._segment = _AppendFile(self._segment_path(self._segment_no))
+
+    def append(self, raw: Union[bytes, bytearray, str], msg: Optional[FixMessage] = None) -> int:
+        """
+        Journal one framed FIX message and return its message number.
+
+        msg may pass raw already parsed (e.g. by a session) to skip re-parsing.
+        The entry is durable after the next sync, which runs automatically per
+        fsync_every / fsync_interval.
+        """
+        if self._flusher is not None and self._flusher.error is not None:
+            raise self._flusher.error
+        if isinstance(raw, str):
+            raw = raw.encode()
+        start, stop, _ = find_frame(raw, 0, len(raw))
+        if start != 0 or stop != len(raw):
+            raise ValueError("Journal entries must be exactly one framed FIX message")
+        raw = bytes(raw)
+        if self._segment.size and self._segment.size + len(raw) > self.segment_size:
+            self._roll()
+        offset = self._segment.append(raw)
+        n = self._index_message(msg if msg is not None else parse_message(raw), offset, len(raw))
+        self._unsynced += 1
+        if ((self.fsync_every and self._unsynced >= self.fsync_every)
+                or (self.fsync_interval and time.monotonic() - self._last_sync >= self.fsync_interval)):
+            if self._flusher is not None:
+                self._flusher.submit(self._prepare_sync())
+            else:
+                self.sync()
+        return n
+
+    def start_background_sync(self) -> None:
+        """Run the fsyncs of automatic syncs on a flusher thread (for owners on an event loop)."""
+        if self._flusher is None:
+            self._flusher = _Flusher(self._commit_sync)
+
+    def sync(self) -> None:
+        """Write buffered entries, fsync segment and indexes, and record a checkpoint."""
+        batch = self._prepare_sync()
+        if self._flusher is None:
+            self._commit_sync(batch)
+            return
+        self._flusher.submit(batch)
+        self._flusher.wait()
+        if self._flusher.error is not None:
+            raise self._flusher.error
+
+    def _prepare_sync(self) -> Tuple[List[_AppendFile], List[_AppendFile], Dict[str, Any]]:
+        """Owner-thread half of a sync: write buffered entries and snapshot the checkpoint they complete."""
+        files = []
+        for f in [*self._retired, self._segment, self._index, self._postings, *self._seq_files.values()]:
+            f.flush()
+            if f.synced != f.size:
+                files.append(f)
+                f.synced = f.size
+        retired, self._retired = self._retired, []
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        return files, retired, self._checkpoint_state(clean=False)
+
+    def _commit_sync(self, batch: Tuple[List[_AppendFile], List[_AppendFile], Dict[str, Any]]) -> None:
+        """fsync what _prepare_sync wrote, then record its checkpoint; runs on the flusher thread if there is one."""
+        files, retired, state = batch
+        for f in files:
+            os.fsync(f.fd)
+        self._store_checkpoint(state)
+        for f in retired:
+            f.close()
+
+    def close(self) -> None:
+        """Sync and close; the next open trusts the order table as is."""
+        if self._closed:
+            return
+        self.sync()
+        if self._flusher is not None:
+            self._flusher.stop()
+            self._flusher = None
+        self._table.flush()
+        self._write_checkpoint(clean=True)
+        self._closed = True
+        for f in [self._segment, self._index, self._postings, *self._seq_files.values()]:
+            f.close()
+        for fd in self._readers.values():
+            os.close(fd)
+        self._readers.clear()
+        self._table.close()
+
+    # -- reading -----------------------------------------------------------
+
+    def raw(self, n: int) -> bytes:
+        """Raw bytes of message number n."""
+        if not 0 <= n < self.messages:
+            raise IndexError(f"Message {n} not in journal ({self.messages} messages)")
+        segment, length, offset, _, _ = _MSG.unpack_from(self._index.view(), n * _MSG.size)
+        if segment == self._segment_no:
+            return self._segment.read(offset, length)
+        return os.pread(self._reader(segment), length, offset)
+
+    def message(self, n: int) -> FixMessage:
+        """Message number n, parsed."""
+        return parse_message(self.raw(n))
+
+    def __iter__(self) -> Iterator[FixMessage]:
+        """Every journaled message in append order, streamed from the segments."""
+        self._segment.flush()
+        for segment in self._segment_numbers():
+            yield from FixStreamReader(self._segment_path(segment))
+
+    def sessions(self) -> Dict[str, Dict[str, int]]:
+        """Journaled session directions with their current generation and last MsgSeqNum."""
+        return {name: {"generation": gen, "lastSeqNum": last}
+                for name, (_, gen, last) in self._sessions.items()}
+
+    def last_seq(self, session: str) -> int:
+        """Last MsgSeqNum journaled for session in its current generation (0 if none)."""
+        state = self._sessions.get(session)
+        return state[2] if state else 0
+
+    def read_range(self, session: str, begin: int = 1, end: int = 0,
+                   generation: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+        """
+        (MsgSeqNum, raw) for session's messages begin..end (end 0 = through the last).
+
+        Reads the current generation unless one is given; every sequence reset
+        of a session starts a new generation.
+        """
+        state = self._sessions.get(session)
+        if state is None:
+            return
+        sid, current, _ = state
+        gen = current if generation is None else generation
+        if not 0 <= gen <= current:
+            return
+        f = self._seq_file(sid, gen)
+        view = f.view()
+        count = f.size // _SEQ.size
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _SEQ.unpack_from(view, mid * _SEQ.size)[0] < begin:
+                lo = mid + 1
+            else:
+                hi = mid
+        for i in range(lo, count):
+            seq, n = _SEQ.unpack_from(view, i * _SEQ.size)
+            if end and seq > end:
+                break
+            yield seq, self.raw(n)
+
+    def _postings_for(self, key: bytes) -> List[int]:
+        """Message numbers posted under key's hash, newest first."""
+        h = _key_hash(key)
+        _, p = self._table.find(h)
+        if not p:
+            return []
+        view = self._postings.view()
+        out = []
+        while p:
+            _, n, p = _POSTING.unpack_from(view, (p - 1) * _POSTING.size)
+            out.append(n)
+        return out
+
+    def order_history(self, cl_ord_id: Optional[str] = None, order_id: Optional[str] = None) -> List[FixMessage]:
+        """
+        Every message of an order in append order: its whole cancel/replace chain.
+
+        Starts from a ClOrdID or OrderID and follows ClOrdID(11), OrigClOrdID(41)
+        and OrderID(37) links, so identifiers are assumed unique in the journal.
+        """
+        frontier = []
+        if cl_ord_id:
+            frontier.append(b"C" + str(cl_ord_id).encode())
+        if order_id:
+            frontier.append(b"O" + str(order_id).encode())
+        seen = set(frontier)
+        found: Dict[int, FixMessage] = {}
+        while frontier:
+            key = frontier.pop()
+            for n in self._postings_for(key):
+                if n in found:
+                    continue
+                msg = self.message(n)
+                keys = _order_keys(msg)
+                if key not in keys:
+                    continue          # 64-bit hash collision
+                found[n] = msg
+                for k in keys:
+                    if k not in seen:
+                        seen.add(k)
+                        frontier.append(k)
+        return [found[n] for n in sorted(found)]
+
+
+def replay(journal: Journal, explain: bool = False, order_book: Optional[OrderBook] = None,
+           session: Optional[str] = None, begin: int = 1, end: int = 0,
+           show_errors: int = 0, fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Validate (and optionally explain) journaled messages; returns run statistics.
+
+    session limits the run to that session's begin..end range. With an
+    order_book every message is applied after validation, so F/G are checked
+    against live orders and explanations include the tracked order.
+    """
+    registry = SpecsRegistry(fix_version)
+    if session is not None:
+        messages: Any = (parse_message(raw) for _, raw in journal.read_range(session, begin, end))
+    else:
+        messages = iter(journal)
+    by_type: Dict[str, int] = {}
+    total = valid = invalid = skipped = explained = 0
+    shown = 0
+
+    start = time.perf_counter()
+    for msg in messages:
+        total += 1
+        payload = msg.to_dict()
+        msg_type = payload.get("35", "")
+        by_type[msg_type] = by_type.get(msg_type, 0) + 1
+        if registry.get_validator(msg_type) is None:
+            skipped += 1
+            continue
+        result = validate_fix(msg_type, payload, order_book=order_book, fix_version=fix_version)
+        if result["ok"]:
+            valid += 1
+        else:
+            invalid += 1
+            if shown < show_errors:
+                shown += 1
+                print(json.dumps({"seq": payload.get("34"), "msgType": msg_type,
+                                  "clOrdID": payload.get("11"), "errors": result["errors"]}), file=sys.stderr)
+        if order_book is not None:
+            order_book.apply(msg)
+        if explain and msg_type == "8":
+            explain_exec_report(payload, order_book=order_book, fix_version=fix_version)
+            explained += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "messages": total,
+        "valid": valid,
+        "invalid": invalid,
+        "skipped": skipped,
+        "explained": explained,
+        "byMsgType": by_type,
+        "seconds": round(elapsed, 3),
+        "messagesPerSec": round(total / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Append to, query and replay a FIX message journal.")
+    parser.add_argument("path", help="journal directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("append", help="journal every message of a FIX log")
+    p.add_argument("log", help="FIX log file, or '-' for stdin")
+    p.add_argument("--verify-checksum", action="store_true", help="drop messages whose CheckSum(10) is wrong")
+    p = sub.add_parser("range", help="print a session's messages by MsgSeqNum")
+    p.add_argument("session", help="SenderCompID->TargetCompID")
+    p.add_argument("begin", type=int)
+    p.add_argument("end", type=int, nargs="?", default=0, help="last MsgSeqNum (default: through the last)")
+    p.add_argument("--generation", type=int, default=None, help="sequence generation (default: current)")
+    p = sub.add_parser("history", help="print every message of an order's cancel/replace chain")
+    p.add_argument("--cl-ord-id", default=None)
+    p.add_argument("--order-id", default=None)
+    p = sub.add_parser("replay", help="validate (and explain) journaled messages")
+    p.add_argument("--fix-version", default=None, help="spec version to validate against (default: DEFAULT_FIX_VERSION)")
+    p.add_argument("--explain", action="store_true", help="also run explain_exec_report on ExecutionReports")
+    p.add_argument("--track-orders", action="store_true", help="validate F/G against an order book built during replay")
+    p.add_argument("--session", default=None, help="replay one session's range only")
+    p.add_argument("--begin", type=int, default=1)
+    p.add_argument("--end", type=int, default=0)
+    p.add_argument("--show-errors", type=int, default=0, metavar="N", help="print the first N invalid messages to stderr")
+    sub.add_parser("stats", help="print message count and sessions")
+    args = parser.parse_args(argv)
+
+    with Journal(args.path) as journal:
+        if args.command == "append":
+            source = sys.stdin.buffer if args.log == "-" else args.log
+            before = len(journal)
+            for frame in FixStreamReader(source, verify_checksum=args.verify_checksum).frames():
+                journal.append(frame)
+            print(json.dumps({"appended": len(journal) - before, "messages": len(journal)}))
+        elif args.command == "range":
+            for _, raw in journal.read_range(args.session, args.begin, args.end, args.generation):
+                print(raw.decode("utf-8", "replace").replace("\x01", "|"))
+        elif args.command == "history":
+            if not (args.cl_ord_id or args.order_id):
+                parser.error("history needs --cl-ord-id or --order-id")
+            for msg in journal.order_history(args.cl_ord_id, args.order_id):
+                print(bytes(msg.buf).decode("utf-8", "replace").replace("\x01", "|"))
+        elif args.command == "replay":
+            book = OrderBook(args.fix_version) if args.track_orders else None
+            stats = replay(journal, explain=args.explain, order_book=book, session=args.session,
+                           begin=args.begin, end=args.end, show_errors=args.show_errors,
+                           fix_version=args.fix_version)
+            print(json.dumps(stats, indent=2))
+            return 0 if stats["invalid"] == 0 else 1
+        else:
+            print(json.dumps({"messages": len(journal), "recovered": journal.recovered,
+                              "sessions": journal.sessions()}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
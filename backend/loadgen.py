@@ -0,0 +1,355 @@
+"""
+HTTP Load Generator
+
+Open-loop load against the FIX API: requests are issued on a fixed schedule
+at the target rate no matter how slowly responses come back, over a pool of
+keep-alive connections, in a mix of /fix/build, /fix/parse, /fix/validate,
+/fix/explain and /fix/lookup calls shaped like the chat server's tools.js
+(pipe-delimited messages from backend.synthetic).
+
+Latency is measured from each request's scheduled start, so time spent
+waiting behind a slow response counts (corrected for coordinated omission);
+service time from the actual send is reported alongside. A large gap
+between the two means the server (or the connection pool) is saturated.
+
+Usage:
+    python -m backend.loadgen --url http://127.0.0.1:8000 --rate 2000 --duration 30
+    python -m backend.loadgen --spawn-workers 1,2,4 --rate 1000,2000,4000 --duration 20
+    python -m backend.loadgen --rate 500 --mix validate=6,parse=2,lookup=2 --arrival poisson
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .fix_engine import SpecsRegistry
+from .synthetic import message_mix, raw_messages
+
+ENDPOINTS = ("build", "parse", "validate", "explain", "lookup")
+# Roughly what the chat assistant sends: validate-heavy, with a parse/explain per answer
+DEFAULT_MIX = {"build": 1, "parse": 2, "validate": 4, "explain": 2, "lookup": 1}
+# Tags/names the assistant looks up; only those in the local dictionary are requested
+LOOKUP_TAGS = ("11", "35", "38", "39", "40", "44", "54", "55", "59", "150", "OrdType", "Side", "TimeInForce")
+PERCENTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999))
+
+Request = Tuple[str, bytes]   # (endpoint, encoded HTTP request)
+
+
+def _http_request(method: str, path: str, host: str, body: Optional[Dict[str, Any]] = None) -> bytes:
+    """A complete keep-alive HTTP/1.1 request, encoded once up front."""
+    head = f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n"
+    if body is None:
+        return (head + "\r\n").encode()
+    data = json.dumps(body, separators=(",", ":")).encode()
+    return (head + f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n").encode() + data
+
+
+def build_requests(host: str, prefix: str = "", n_messages: int = 2000, seed: int = 0,
+                   fix_version: Optional[str] = None) -> Dict[str, List[bytes]]:
+    """Encoded requests per endpoint from synthetic order flow."""
+    mix = message_mix(n_messages, seed)
+    raws = raw_messages(mix, fix_version, delimiter="|")
+    extra = {"fix_version": fix_version} if fix_version else {}
+    query = f"&fix_version={fix_version}" if fix_version else ""
+    registry = SpecsRegistry(fix_version)
+    lookups = [t for t in LOOKUP_TAGS if registry.lookup_tag(t)]
+    post = lambda path, body: _http_request("POST", prefix + path, host, dict(body, **extra))
+    return {
+        "build": [post("/fix/build", {"fields": dict(f, **{"35": mt}), "delimiter": "|"}) for mt, f in mix],
+        "parse": [post("/fix/parse", {"raw_fix": r, "delimiter": "|"}) for r in raws],
+        "validate": [post("/fix/validate", {"raw_fix": r, "delimiter": "|"}) for r in raws],
+        "explain": [post("/fix/explain", {"raw_fix": r, "delimiter": "|"})
+                    for (mt, _), r in zip(mix, raws) if mt == "8"],
+        "lookup": [_http_request("GET", f"{prefix}/fix/lookup?tag={t}{query}", host) for t in lookups],
+    }
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """'validate=4,parse=2' -> {"validate": 4.0, "parse": 2.0}."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r} in mix (expected one of {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class _Connection:
+    """Minimal HTTP/1.1 keep-alive client connection; reconnects after errors or Connection: close."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, data: bytes) -> int:
+        """Send one encoded request and read the whole response; returns the status code."""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._writer.write(data)
+        head = await self._reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        length, chunked, close = 0, False, False
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            name = name.lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding":
+                chunked = "chunked" in value.lower()
+            elif name == "connection":
+                close = value.strip().lower() == "close"
+        if chunked:
+            while True:
+                size = int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await self._reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif length:
+            await self._reader.readexactly(length)
+        if close:
+            self.close()
+        return status
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+def _percentiles(samples: array) -> Dict[str, Optional[float]]:
+    """Latency percentiles in milliseconds."""
+    if not samples:
+        return {name: None for name, _ in PERCENTILES} | {"max": None}
+    ordered = sorted(samples)
+    n = len(ordered)
+    out = {name: round(ordered[min(n - 1, int(q * n))] * 1000, 3) for name, q in PERCENTILES}
+    out["max"] = round(ordered[-1] * 1000, 3)
+    return out
+
+
+class _Recorder:
+    """Corrected/service latencies and outcomes for requests scheduled after warmup."""
+
+    def __init__(self) -> None:
+        self.latency: Dict[str, array] = {}
+        self.service: Dict[str, array] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.requests: Dict[str, int] = {}
+
+    def record(self, endpoint: str, latency: float, service: float, outcome: Optional[str]) -> None:
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        if outcome is not None:
+            errors = self.errors.setdefault(endpoint, {})
+            errors[outcome] = errors.get(outcome, 0) + 1
+            return
+        self.latency.setdefault(endpoint, array("d")).append(latency)
+        self.service.setdefault(endpoint, array("d")).append(service)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        total = sum(self.requests.values())
+        errors: Dict[str, int] = {}
+        for by_kind in self.errors.values():
+            for kind, n in by_kind.items():
+                errors[kind] = errors.get(kind, 0) + n
+        n_errors = sum(errors.values())
+        latency, service = array("d"), array("d")
+        for endpoint in self.latency:
+            latency.extend(self.latency[endpoint])
+            service.extend(self.service[endpoint])
+        return {
+            "requests": total,
+            "ok": total - n_errors,
+            "errors": errors,
+            "errorRate": round(n_errors / total, 5) if total else None,
+            "throughput": round((total - n_errors) / elapsed, 1) if elapsed > 0 else None,
+            "latencyMs": _percentiles(latency),
+            "serviceMs": _percentiles(service),
+            "byEndpoint": {
+                endpoint: {
+                    "requests": n,
+                    "errors": sum(self.errors.get(endpoint, {}).values()),
+                    "latencyMs": _percentiles(self.latency.get(endpoint, array("d"))),
+                }
+                for endpoint, n in sorted(self.requests.items())
+            },
+        }
+
+
+async def run_load(url: str, rate: float, duration: float, connections: int = 64,
+                   mix: Optional[Dict[str, float]] = None, warmup: float = 2.0, arrival: str = "uniform",
+                   timeout: float = 10.0, seed: int = 0, fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Drive url at rate requests/sec for warmup + duration seconds; returns the run report.
+
+    arrival "uniform" spaces requests evenly, "poisson" draws exponential gaps.
+    Requests still queued or unanswered timeout seconds after the run are
+    counted as timeouts. Warmup requests are sent but not recorded.
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    mix = mix or DEFAULT_MIX
+    pools = build_requests(parts.netloc, parts.path.rstrip("/"), seed=seed, fix_version=fix_version)
+    names = [name for name in mix if mix[name] > 0 and pools[name]]
+    weights = [mix[name] for name in names]
+    rng = random.Random(seed)
+    recorder = _Recorder()
+    queue: "asyncio.Queue[Optional[Tuple[float, str, bytes]]]" = asyncio.Queue()
+    lag = array("d")
+    loop_time = time.perf_counter
+    start = loop_time() + 0.05
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    inflight: List[Optional[Tuple[float, str, bytes]]] = [None] * connections
+
+    async def worker(slot: int) -> None:
+        conn = _Connection(host, port)
+        while True:
+            item = inflight[slot] = await queue.get()
+            if item is None:
+                break
+            intended, endpoint, data = item
+            sent = loop_time()
+            outcome: Optional[str] = None
+            try:
+                status = await asyncio.wait_for(conn.request(data), timeout)
+                if status >= 400:
+                    outcome = str(status)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                conn.close()
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                outcome = "connection"
+                conn.close()
+            done = loop_time()
+            inflight[slot] = None
+            if intended >= measure_from:
+                recorder.record(endpoint, done - intended, done - sent, outcome)
+        conn.close()
+
+    tasks = [asyncio.create_task(worker(slot)) for slot in range(connections)]
+    t = start
+    while t < stop_at:
+        now = loop_time()
+        if t > now:
+            await asyncio.sleep(t - now)
+            now = loop_time()
+        endpoint = rng.choices(names, weights)[0]
+        pool = pools[endpoint]
+        queue.put_nowait((t, endpoint, pool[rng.randrange(len(pool))]))
+        if t >= measure_from:
+            lag.append(now - t)
+        t += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+
+    for _ in tasks:
+        queue.put_nowait(None)
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    # whatever was still in flight or queued when we gave up never got an answer
+    unanswered = list(inflight)
+    while not queue.empty():
+        unanswered.append(queue.get_nowait())
+    for item in unanswered:
+        if item is not None and item[0] >= measure_from:
+            recorder.record(item[1], 0.0, 0.0, "timeout")
+
+    report = recorder.summary(duration)
+    report["target"] = {"url": url, "rate": rate, "duration": duration, "warmup": warmup,
+                        "connections": connections, "arrival": arrival, "mix": dict(zip(names, weights))}
+    # how late the generator itself issued requests; large values mean the client, not the server, is the limit
+    report["sendLagMs"] = {k: v for k, v in _percentiles(lag).items() if k in ("p99", "max")}
+    return report
+
+
+def spawn_server(workers: int, port: int, env: Optional[Dict[str, str]] = None,
+                 startup_timeout: float = 30.0) -> subprocess.Popen:
+    """Start `uvicorn backend.api:app` with workers processes on port and wait for /healthz."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--no-access-log", "--log-level", "warning"],
+        cwd=root, env=dict(os.environ, LOG_LEVEL="WARNING", **(env or {})),
+    )
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"uvicorn did not answer /healthz within {startup_timeout}s")
+
+
+def _print_row(workers: Optional[int], report: Dict[str, Any]) -> None:
+    lat = report["latencyMs"]
+    print(f"workers={workers or '-':<3} rate={report['target']['rate']:<8g} "
+          f"throughput={report['throughput'] or 0:<9g} errors={report['errorRate'] or 0:<8g} "
+          f"p50={lat['p50']}ms p99={lat['p99']}ms p999={lat['p999']}ms max={lat['max']}ms",
+          file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop HTTP load test of the FIX API with latency percentiles.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of a running server")
+    parser.add_argument("--spawn-workers", default=None, metavar="N[,N...]",
+                        help="start a local uvicorn per worker count instead of using --url")
+    parser.add_argument("--port", type=int, default=8799, help="port for spawned servers")
+    parser.add_argument("--rate", default="1000", metavar="R[,R...]", help="target requests/sec (sweep with a list)")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each run")
+    parser.add_argument("--connections", type=int, default=64, help="keep-alive connections")
+    parser.add_argument("--mix", default=None, help="endpoint weights, e.g. validate=4,parse=2,lookup=1")
+    parser.add_argument("--arrival", choices=("uniform", "poisson"), default="uniform")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument("--fix-version", default=None, help="send fix_version (default: server default)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", default=None, help="also write the reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix) if args.mix else None
+    rates = [float(r) for r in args.rate.split(",")]
+    worker_counts: List[Optional[int]] = ([int(w) for w in args.spawn_workers.split(",")]
+                                          if args.spawn_workers else [None])
+    reports = []
+    for workers in worker_counts:
+        proc = spawn_server(workers, args.port) if workers else None
+        url = f"http://127.0.0.1:{args.port}" if workers else args.url
+        try:
+            for rate in rates:
+                report = asyncio.run(run_load(url, rate, args.duration, args.connections, mix, args.warmup,
+                                              args.arrival, args.timeout, args.seed, args.fix_version))
+                report["target"]["workers"] = workers
+                _print_row(workers, report)
+                reports.append(report)
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=30)
+
+    print(json.dumps(reports, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 0 if all(r["errorRate"] == 0 for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
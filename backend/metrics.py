@@ -0,0 +1,254 @@
+"""
+Metrics
+
+Low-overhead counters and latency histograms for the API and the FIX engine,
+rendered in the Prometheus text exposition format at /metrics. Histograms use
+fixed buckets from 5µs to 10s so sub-millisecond stages stay visible. Each
+observation is a bisect plus two additions under an uncontended lock.
+
+Set FIX_METRICS=0 to disable collection entirely.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import fix_engine
+from .fix_engine import SpecsRegistry, _value_str
+from .settings import METRICS_ENABLED
+
+# Upper bounds in seconds (the +Inf bucket is implicit)
+LATENCY_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Label sets beyond this are folded into "other" so untrusted values can't grow memory
+MAX_SERIES = 500
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_INF = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """Base for labelled metrics: series keyed by a tuple of label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if labels in self._series or len(self._series) < MAX_SERIES:
+            return labels
+        return ("other",) * len(self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._series.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._series.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values (seconds)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager observing the elapsed time of its block."""
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._series.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, _INF)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class GaugeFunc(_Metric):
+    """Gauge whose samples are read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str],
+                 collect: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]):
+        super().__init__(name, help_text, labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in self.collect()]
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "start")
+
+    def __init__(self, hist: Histogram, labels: Tuple[str, ...]):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.hist.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _spec_load_times() -> List[Tuple[Tuple[str, ...], float]]:
+    return [((v,), SpecsRegistry._instances[v].load_seconds) for v in SpecsRegistry.loaded_versions()]
+
+
+def _spec_versions() -> List[Tuple[Tuple[str, ...], float]]:
+    return [((v, SpecsRegistry._instances[v].spec_version), 1.0) for v in SpecsRegistry.loaded_versions()]
+
+
+REQUEST_LATENCY = Histogram("fix_api_request_duration_seconds",
+                            "HTTP request latency by route.", ("method", "route", "status"))
+STAGE_LATENCY = Histogram("fix_engine_stage_duration_seconds",
+                          "FIX engine stage latency (normalize, parse, validate, validate_spec, validate_rules, build, explain, convert).",
+                          ("stage",))
+MESSAGES = Counter("fix_messages_total", "FIX messages handled by endpoint and MsgType.", ("endpoint", "msg_type"))
+VALIDATION_FAILURES = Counter("fix_validation_failures_total",
+                              "Validation failures by MsgType and rule id.", ("msg_type", "rule_id"))
+SHED = Counter("fix_engine_shed_total", "Requests rejected with 503 because the engine queue was full.")
+SPEC_LOAD = GaugeFunc("fix_spec_load_seconds", "Time taken to load each FIX version's specs.",
+                      ("fix_version",), _spec_load_times)
+SPEC_INFO = GaugeFunc("fix_spec_info", "Spec snapshot currently served for each FIX version (always 1).",
+                      ("fix_version", "spec_version"), _spec_versions)
+
+ALL_METRICS: List[_Metric] = [REQUEST_LATENCY, STAGE_LATENCY, MESSAGES, VALIDATION_FAILURES, SHED, SPEC_LOAD, SPEC_INFO]
+
+
+def register(metric: _Metric) -> _Metric:
+    """Add a metric to the /metrics output."""
+    ALL_METRICS.append(metric)
+    return metric
+
+
+def stage(name: str):
+    """Context manager timing one engine stage (a no-op when metrics are disabled)."""
+    return STAGE_LATENCY.time(name) if METRICS_ENABLED else _NULL_TIMER
+
+
+def count_message(endpoint: str, msg_type: Optional[str]) -> None:
+    """Count one message handled by an endpoint."""
+    if METRICS_ENABLED:
+        MESSAGES.inc(endpoint, _value_str(msg_type) if msg_type else "unknown")
+
+
+def count_shed() -> None:
+    """Count one request shed because the engine queue was full."""
+    if METRICS_ENABLED:
+        SHED.inc()
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    """Record one HTTP request."""
+    if METRICS_ENABLED:
+        REQUEST_LATENCY.observe(seconds, method, route, str(status))
+
+
+class EngineSink:
+    """Receives stage timings and rule failures from fix_engine."""
+
+    def observe_stage(self, name: str, seconds: float) -> None:
+        STAGE_LATENCY.observe(seconds, name)
+
+    def count_failures(self, msg_type: str, rule_ids: List[str]) -> None:
+        for rule_id in rule_ids:
+            VALIDATION_FAILURES.inc(str(msg_type), rule_id)
+
+
+def install() -> None:
+    """Hook the engine up to these metrics (no-op when FIX_METRICS=0)."""
+    if METRICS_ENABLED:
+        fix_engine.set_metrics_sink(EngineSink())
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format."""
+    lines: List[str] = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
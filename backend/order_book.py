@@ -0,0 +1,222 @@
+"""
+Order State Tracker
+
+Applies a stream of D/F/G/8 messages to an in-memory order book keyed by
+ClOrdID (every id in a cancel/replace chain), OrigClOrdID and OrderID, tracking
+OrdStatus, CumQty, LeavesQty and AvgPx per order. Records use __slots__ so
+millions of live orders stay compact.
+
+The book plugs into the engine as a context:
+    validate_fix("F", payload, order_book=book)
+    explain_exec_report(payload, order_book=book)
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .fix_engine import SpecsRegistry, _to_float, _value_str
+
+# Order fields kept per record: the G immutables plus the replaceable fields
+TRACKED_TAGS = ("55", "54", "48", "22", "44", "38", "99", "59", "432", "126", "40")
+# OrdStatus values after which an order is no longer live
+# (Filled, DoneForDay, Canceled, Rejected, Expired)
+TERMINAL_STATUSES = frozenset({"2", "3", "4", "8", "C"})
+PENDING_NEW = "A"
+
+
+def _field(msg: Any, tag: str) -> Optional[str]:
+    """Tag value as a wire string (accepts dicts with legacy float values and FixMessage)."""
+    v = msg.get(tag)
+    return None if v is None else _value_str(v)
+
+
+class OrderRecord:
+    """State of one order across its cancel/replace chain."""
+
+    __slots__ = ("cl_ord_id", "order_id", "ord_status", "exec_type", "state",
+                 "order_qty", "cum_qty", "leaves_qty", "avg_px", "values", "pending")
+
+    def __init__(self, cl_ord_id: str, values: Tuple[Optional[str], ...], order_qty: float):
+        self.cl_ord_id = cl_ord_id            # latest accepted ClOrdID
+        self.order_id: Optional[str] = None
+        self.ord_status = PENDING_NEW
+        self.exec_type: Optional[str] = None
+        self.state: Optional[str] = None      # order_state.json name for the last report
+        self.order_qty = order_qty
+        self.cum_qty = 0.0
+        self.leaves_qty = order_qty
+        self.avg_px = 0.0
+        self.values = values                  # aligned with TRACKED_TAGS
+        self.pending: Optional[Tuple[Optional[str], ...]] = None  # values from an unacknowledged G
+
+    @property
+    def is_live(self) -> bool:
+        """Whether the order can still be canceled/replaced or filled."""
+        return self.ord_status not in TERMINAL_STATUSES
+
+    def original(self) -> Dict[str, str]:
+        """Tracked order fields as the `original` dict validate_fix expects for G."""
+        return {t: v for t, v in zip(TRACKED_TAGS, self.values) if v is not None}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly snapshot of the record."""
+        return {
+            "clOrdID": self.cl_ord_id, "orderID": self.order_id,
+            "ordStatus": self.ord_status, "execType": self.exec_type, "state": self.state,
+            "orderQty": self.order_qty, "cumQty": self.cum_qty,
+            "leavesQty": self.leaves_qty, "avgPx": self.avg_px, "live": self.is_live,
+        }
+
+
+def _tracked_values(msg: Any, base: Optional[Tuple[Optional[str], ...]] = None) -> Tuple[Optional[str], ...]:
+    """Tracked tag values from msg, falling back to base for tags msg omits."""
+    if base is None:
+        return tuple(_field(msg, t) for t in TRACKED_TAGS)
+    return tuple(_field(msg, t) if msg.get(t) is not None else b for t, b in zip(TRACKED_TAGS, base))
+
+
+class OrderBook:
+    """
+    Incremental order state built from D/F/G/8 messages.
+
+    `cl_ord_id in book` is True only for live orders, so the book can be passed
+    directly as validate_fix's known_live_orders.
+    """
+
+    def __init__(self, fix_version: Optional[str] = None):
+        self._by_cl_ord_id: Dict[str, OrderRecord] = {}
+        self._by_order_id: Dict[str, OrderRecord] = {}
+        self._count = 0
+        self._registry = SpecsRegistry(fix_version)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, cl_ord_id: Any) -> bool:
+        rec = self._by_cl_ord_id.get(str(cl_ord_id))
+        return rec is not None and rec.is_live
+
+    def get(self, cl_ord_id: Any) -> Optional[OrderRecord]:
+        """Record for any ClOrdID in an order's chain."""
+        return self._by_cl_ord_id.get(str(cl_ord_id))
+
+    def get_by_order_id(self, order_id: Any) -> Optional[OrderRecord]:
+        """Record for a sell-side OrderID."""
+        return self._by_order_id.get(str(order_id))
+
+    def find(self, msg: Any) -> Optional[OrderRecord]:
+        """Locate the order a message refers to via ClOrdID(11), OrigClOrdID(41) or OrderID(37)."""
+        for tag, index in (("11", self._by_cl_ord_id), ("41", self._by_cl_ord_id), ("37", self._by_order_id)):
+            key = _field(msg, tag)
+            if key is not None:
+                rec = index.get(key)
+                if rec is not None:
+                    return rec
+        return None
+
+    def original_for(self, cl_ord_id: Any) -> Optional[Dict[str, str]]:
+        """Original order fields for a G referencing cl_ord_id (None if unknown)."""
+        rec = self.get(cl_ord_id)
+        return rec.original() if rec is not None else None
+
+    def live_orders(self) -> Iterator[OrderRecord]:
+        """Iterate live orders (each once)."""
+        seen = set()
+        for rec in self._by_cl_ord_id.values():
+            if rec.is_live and id(rec) not in seen:
+                seen.add(id(rec))
+                yield rec
+
+    def apply(self, msg: Any) -> Optional[OrderRecord]:
+        """Apply one message (dict or FixMessage); returns the affected record."""
+        msg_type = _field(msg, "35")
+        if msg_type == "D":
+            return self._on_new(msg)
+        if msg_type == "F":
+            return self._on_cancel_request(msg)
+        if msg_type == "G":
+            return self._on_replace_request(msg)
+        if msg_type == "8":
+            return self._on_exec_report(msg)
+        return None
+
+    def purge_done(self) -> int:
+        """Drop terminal orders from the book; returns how many were removed."""
+        done = {id(r) for r in self._by_cl_ord_id.values() if not r.is_live}
+        self._by_cl_ord_id = {k: r for k, r in self._by_cl_ord_id.items() if id(r) not in done}
+        self._by_order_id = {k: r for k, r in self._by_order_id.items() if id(r) not in done}
+        self._count -= len(done)
+        return len(done)
+
+    def _on_new(self, msg: Any) -> Optional[OrderRecord]:
+        cl = _field(msg, "11")
+        if cl is None:
+            return None
+        rec = OrderRecord(cl, _tracked_values(msg), _to_float(msg.get("38"), 0.0))
+        if cl not in self._by_cl_ord_id:
+            self._count += 1
+        self._by_cl_ord_id[cl] = rec
+        return rec
+
+    def _on_cancel_request(self, msg: Any) -> Optional[OrderRecord]:
+        rec = self.get(_field(msg, "41"))
+        cl = _field(msg, "11")
+        if rec is not None and cl is not None:
+            self._by_cl_ord_id[cl] = rec
+        return rec
+
+    def _on_replace_request(self, msg: Any) -> Optional[OrderRecord]:
+        rec = self.get(_field(msg, "41"))
+        cl = _field(msg, "11")
+        if rec is not None and cl is not None:
+            self._by_cl_ord_id[cl] = rec
+            rec.pending = _tracked_values(msg, rec.values)
+        return rec
+
+    def _on_exec_report(self, msg: Any) -> OrderRecord:
+        rec = self.find(msg)
+        if rec is None:
+            # first sight of this order (e.g. drop copy): seed it from the report
+            rec = OrderRecord(_field(msg, "11") or _field(msg, "37") or "", _tracked_values(msg),
+                              _to_float(msg.get("38"), 0.0))
+            self._count += 1
+        for cl in (_field(msg, "11"), rec.cl_ord_id):
+            if cl:
+                self._by_cl_ord_id[cl] = rec
+        order_id = _field(msg, "37")
+        if order_id:
+            rec.order_id = order_id
+            self._by_order_id[order_id] = rec
+
+        exec_type = _field(msg, "150")
+        ord_status = _field(msg, "39") or rec.ord_status
+        row = self._registry.order_state(exec_type, ord_status)
+        rec.exec_type, rec.ord_status = exec_type, ord_status
+        rec.state = row.get("name") if row else None
+
+        if exec_type == "5" and rec.pending is not None:
+            rec.values, rec.pending = rec.pending, None
+            rec.cl_ord_id = _field(msg, "11") or rec.cl_ord_id
+            rec.order_qty = _to_float(dict(zip(TRACKED_TAGS, rec.values)).get("38"), rec.order_qty)
+        elif exec_type in ("4", "8"):
+            rec.pending = None
+        if msg.get("38") is not None:
+            rec.order_qty = _to_float(msg.get("38"), rec.order_qty)
+
+        last_qty = _to_float(msg.get("32"), 0.0)
+        prev_cum = rec.cum_qty
+        if msg.get("14") is not None:
+            rec.cum_qty = _to_float(msg.get("14"), prev_cum)
+        elif last_qty:
+            rec.cum_qty = prev_cum + last_qty
+        if msg.get("6") is not None:
+            rec.avg_px = _to_float(msg.get("6"), rec.avg_px)
+        elif last_qty and rec.cum_qty:
+            last_px = _to_float(msg.get("31"), 0.0)
+            rec.avg_px = (rec.avg_px * prev_cum + last_px * last_qty) / rec.cum_qty
+        if msg.get("151") is not None:
+            rec.leaves_qty = _to_float(msg.get("151"), rec.leaves_qty)
+        elif not rec.is_live:
+            rec.leaves_qty = 0.0
+        else:
+            rec.leaves_qty = max(0.0, rec.order_qty - rec.cum_qty)
+        return rec
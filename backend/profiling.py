@@ -0,0 +1,206 @@
+"""
+Request Profiling
+
+Opt-in cProfile profiles of the engine work behind an API request. The API
+runs a selected request's engine call under run_profiled() on the worker that
+executes it; the raw stats come back to the event loop, where RequestProfile
+turns them into a per-engine-function breakdown (and a Server-Timing header)
+and SampledProfiler folds sampled requests into rotating pstats files, which
+open with `python -m pstats` or snakeviz.
+
+The API installs its profiling middleware only when FIX_PROFILE_REQUESTS=1 or
+FIX_PROFILE_SAMPLE_RATE > 0, so requests pay nothing while profiling is off.
+"""
+
+import cProfile
+import glob
+import os
+import pstats
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Engine functions broken out in every report; validate_spec/validate_rules are the compiled
+# forms of validate_against_message_spec/validate_against_rules that validate_fix runs
+ENGINE_FUNCTIONS = (
+    "parse_fix", "parse_message", "validate_fix", "validate_spec", "validate_rules",
+    "validate_against_message_spec", "validate_against_rules", "build_fix", "explain_exec_report",
+)
+_ENGINE_FILE = "fix_engine.py"
+TOP_FUNCTIONS = 20
+
+RawStats = Dict[Tuple[str, int, str], Tuple[Any, ...]]
+
+
+def run_profiled(fn: Callable[..., Any], *args: Any) -> Tuple[Any, Optional[RawStats], float]:
+    """
+    Run fn(*args) under cProfile; returns (result, raw stats, wall seconds).
+
+    Runs on the engine worker (thread or process), so the raw stats are a
+    plain picklable dict. If another profiler is already active on this
+    thread the call still runs and the stats are None.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        start = time.perf_counter()
+        return fn(*args), None, time.perf_counter() - start
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        profiler.disable()
+    profiler.create_stats()
+    return result, profiler.stats, elapsed
+
+
+class _Raw:
+    """Lets pstats.Stats load a raw stats dict returned by run_profiled."""
+
+    def __init__(self, stats: RawStats):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def _label(func: Tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{lineno}({name})"
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 4)
+
+
+class RequestProfile:
+    """Profile of one request: engine stats collected across its engine calls."""
+
+    __slots__ = ("report", "sampled", "stats", "engine_seconds", "calls")
+
+    def __init__(self, report: bool = False, sampled: bool = False):
+        self.report = report          # return the breakdown to the client
+        self.sampled = sampled        # fold into the sampled profile files
+        self.stats: Optional[pstats.Stats] = None
+        self.engine_seconds = 0.0
+        self.calls = 0
+
+    def add(self, raw: Optional[RawStats], seconds: float) -> None:
+        """Merge the stats of one run_profiled call."""
+        self.engine_seconds += seconds
+        self.calls += 1
+        if not raw:
+            return
+        if self.stats is None:
+            self.stats = pstats.Stats(_Raw(raw))
+        else:
+            self.stats.add(_Raw(raw))
+
+    def functions(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, cumulative and own time of each engine function that ran."""
+        out: Dict[str, Dict[str, Any]] = {}
+        if self.stats is None:
+            return out
+        for func, (cc, nc, tt, ct, _callers) in self.stats.stats.items():
+            if func[2] in ENGINE_FUNCTIONS and func[0].endswith(_ENGINE_FILE):
+                entry = out.setdefault(func[2], {"calls": 0, "totalMs": 0.0, "ownMs": 0.0})
+                entry["calls"] += nc
+                entry["totalMs"] = round(entry["totalMs"] + _ms(ct), 4)
+                entry["ownMs"] = round(entry["ownMs"] + _ms(tt), 4)
+        return {name: out[name] for name in ENGINE_FUNCTIONS if name in out}
+
+    def to_dict(self, top: int = TOP_FUNCTIONS) -> Dict[str, Any]:
+        """Breakdown returned with a profiled response."""
+        hot: List[Dict[str, Any]] = []
+        if self.stats is not None:
+            rows = sorted(self.stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:top]
+            hot = [{"function": _label(func), "calls": nc, "totalMs": _ms(ct), "ownMs": _ms(tt)}
+                   for func, (cc, nc, tt, ct, _callers) in rows]
+        return {
+            "engineMs": _ms(self.engine_seconds),
+            "engineCalls": self.calls,
+            "functions": self.functions(),
+            "top": hot,
+        }
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (shown by browser dev tools)."""
+        parts = [f"engine;dur={_ms(self.engine_seconds)}"]
+        parts += [f"{name};dur={entry['totalMs']}" for name, entry in self.functions().items()]
+        return ", ".join(parts)
+
+
+class SampledProfiler:
+    """
+    Profiles a fraction of live requests into rotating pstats files.
+
+    Sampled request stats are merged in memory; every flush_every samples (and
+    on flush()) they are written to engine-<pid>-<time>-<n>.prof in directory,
+    keeping the newest `keep` files across all workers.
+    """
+
+    def __init__(self, rate: float, directory: str, flush_every: int = 1000, keep: int = 20):
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Profile sample rate must be between 0 and 1, got {rate}")
+        self.rate = rate
+        self.directory = directory
+        self.flush_every = max(1, flush_every)
+        self.keep = max(1, keep)
+        self._lock = threading.Lock()
+        self._stats: Optional[pstats.Stats] = None
+        self._pending = 0
+        self._files = 0
+
+    def sample(self) -> bool:
+        """Decide whether the next request is profiled."""
+        return self.rate > 0 and random.random() < self.rate
+
+    def record(self, profile: RequestProfile) -> Optional[str]:
+        """Merge a sampled request; returns the file written if this sample triggered a flush."""
+        if profile.stats is None:
+            return None
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats()
+            self._stats.add(profile.stats)
+            self._pending += 1
+            if self._pending < self.flush_every:
+                return None
+            return self._flush_locked()
+
+    def flush(self) -> Optional[str]:
+        """Write the samples merged so far, if any."""
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> Optional[str]:
+        if not self._pending or self._stats is None:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        self._files += 1
+        path = os.path.join(self.directory,
+                            f"engine-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}-{self._files:04d}.prof")
+        self._stats.dump_stats(path)
+        self._stats = None
+        self._pending = 0
+        self._rotate()
+        return path
+
+    def _rotate(self) -> None:
+        files = []
+        for path in glob.glob(os.path.join(self.directory, "engine-*.prof")):
+            try:
+                files.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue  # removed by another worker's rotation
+        files.sort()
+        for _mtime, path in files[:-self.keep]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,127 @@
+"""
+FIX Log Replay
+
+Command-line runner that streams a FIX log through validate_fix (and optionally
+explain_exec_report) and reports throughput.
+
+Usage:
+    python -m backend.replay session.log [--explain] [--verify-checksum]
+    cat session.log | python -m backend.replay -
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, Any, Optional
+
+from .bulk import BulkValidationEngine
+from .fix_engine import SpecsRegistry, validate_fix, explain_exec_report
+from .fix_stream import FixStreamReader
+
+
+def replay(reader: FixStreamReader, explain: bool = False, show_errors: int = 0,
+           fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """Validate (and optionally explain) every message from reader; returns run statistics."""
+    registry = SpecsRegistry(fix_version)
+    by_type: Dict[str, int] = {}
+    valid = invalid = skipped = explained = 0
+    shown = 0
+
+    start = time.perf_counter()
+    for msg in reader:
+        payload = msg.to_dict()
+        msg_type = payload.get("35", "")
+        by_type[msg_type] = by_type.get(msg_type, 0) + 1
+        if registry.get_validator(msg_type) is None:
+            # admin/session messages have no spec to validate against
+            skipped += 1
+            continue
+        result = validate_fix(msg_type, payload, fix_version=fix_version)
+        if result["ok"]:
+            valid += 1
+        else:
+            invalid += 1
+            if shown < show_errors:
+                shown += 1
+                print(json.dumps({"seq": payload.get("34"), "msgType": msg_type,
+                                  "clOrdID": payload.get("11"), "errors": result["errors"]}), file=sys.stderr)
+        if explain and msg_type == "8":
+            explain_exec_report(payload, fix_version=fix_version)
+            explained += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "messages": reader.messages,
+        "valid": valid,
+        "invalid": invalid,
+        "skipped": skipped,
+        "explained": explained,
+        "byMsgType": by_type,
+        "garbageBytes": reader.garbage_bytes,
+        "badChecksums": reader.bad_checksums,
+        "seconds": round(elapsed, 3),
+        "messagesPerSec": round(reader.messages / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def replay_parallel(reader: FixStreamReader, workers: int, show_errors: int = 0,
+                    fix_version: Optional[str] = None) -> Dict[str, Any]:
+    """Validate every message from reader across a process pool; returns run statistics."""
+    registry = SpecsRegistry(fix_version)
+    by_type: Dict[str, int] = {}
+    valid = invalid = skipped = 0
+    shown = 0
+
+    start = time.perf_counter()
+    with BulkValidationEngine(workers=workers, fix_version=fix_version) as engine:
+        for res in engine.validate(reader.frames()):
+            msg_type = res["msgType"] or ""
+            by_type[msg_type] = by_type.get(msg_type, 0) + 1
+            if registry.get_validator(msg_type) is None:
+                skipped += 1
+            elif res["ok"]:
+                valid += 1
+            else:
+                invalid += 1
+                if shown < show_errors:
+                    shown += 1
+                    print(json.dumps({"index": res["index"], "msgType": msg_type, "errors": res["errors"]}), file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "messages": reader.messages,
+        "valid": valid,
+        "invalid": invalid,
+        "skipped": skipped,
+        "workers": workers,
+        "byMsgType": by_type,
+        "garbageBytes": reader.garbage_bytes,
+        "badChecksums": reader.bad_checksums,
+        "seconds": round(elapsed, 3),
+        "messagesPerSec": round(reader.messages / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Validate/explain a FIX log as a stream and report messages/sec.")
+    parser.add_argument("path", help="FIX log file, or '-' for stdin")
+    parser.add_argument("--fix-version", default=None, help="spec version to validate against (default: DEFAULT_FIX_VERSION)")
+    parser.add_argument("--explain", action="store_true", help="also run explain_exec_report on ExecutionReports")
+    parser.add_argument("--verify-checksum", action="store_true", help="drop messages whose CheckSum(10) is wrong")
+    parser.add_argument("--workers", type=int, default=1, help="validate across N processes (explain is single-process only)")
+    parser.add_argument("--show-errors", type=int, default=0, metavar="N", help="print the first N invalid messages to stderr")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin.buffer if args.path == "-" else args.path
+    reader = FixStreamReader(source, verify_checksum=args.verify_checksum)
+    if args.workers > 1:
+        stats = replay_parallel(reader, args.workers, show_errors=args.show_errors, fix_version=args.fix_version)
+    else:
+        stats = replay(reader, explain=args.explain, show_errors=args.show_errors, fix_version=args.fix_version)
+    print(json.dumps(stats, indent=2))
+    return 0 if stats["invalid"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
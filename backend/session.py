@@ -0,0 +1,563 @@
+"""
+FIX Session Layer
+
+asyncio acceptor/initiator speaking FIX over TCP on top of the engine: frames
+inbound bytes with fix_stream.find_frame, parses with parse_message, builds with
+a per-session FixBuilder and (optionally) validates application messages with
+validate_fix before they are sent or delivered.
+
+Each FixSession manages Logon/Logout, MsgSeqNum(34) in both directions,
+Heartbeat/TestRequest, gap detection with ResendRequest, and answering
+ResendRequests (stored application messages are resent with PossDupFlag,
+admin messages are replaced by SequenceReset-GapFill). Outbound messages are
+queued and written once per event-loop iteration, so a burst of send() calls
+costs one transport write.
+
+With a journal (journal.Journal), every message sent and every in-sequence
+message received is journaled, sequence numbers resume from it on restart,
+and ResendRequests beyond the in-memory store are answered from it. The
+session switches the journal to background sync, so its batched fsyncs run
+on a flusher thread rather than the event loop.
+
+    acceptor = FixAcceptor("SELL", port=9878, on_message=handle)
+    await acceptor.start()
+
+    initiator = FixInitiator("BUY", "SELL", "127.0.0.1", 9878)
+    session = await initiator.connect()
+    session.send("D", {"11": "A1", "55": "AAPL", "54": "1", "38": "100", "40": "1", "60": "..."})
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .fix_engine import FixBuilder, FixMessage, SpecsRegistry, begin_string_for, parse_message, validate_fix
+from .fix_stream import checksum_ok, find_frame
+from .journal import Journal, session_name
+
+logger = logging.getLogger(__name__)
+
+ADMIN_MSG_TYPES = frozenset({"0", "1", "2", "3", "4", "5", "A"})
+# Tags the session owns; values supplied by the application are ignored
+_SESSION_TAGS = frozenset({"8", "9", "10", "34", "35", "43", "49", "52", "56", "97", "122"})
+_READ_SIZE = 1 << 16
+_MAX_MESSAGE_SIZE = 1 << 20
+
+# Session states
+DISCONNECTED = "DISCONNECTED"
+LOGON_SENT = "LOGON_SENT"
+ACTIVE = "ACTIVE"
+LOGOUT_SENT = "LOGOUT_SENT"
+
+MessageHandler = Callable[["FixSession", FixMessage], Any]
+
+
+class SessionError(Exception):
+    """Raised for protocol violations and rejected outbound messages."""
+
+
+_ts_cache: Tuple[int, str] = (-1, "")
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as a FIX UTCTimestamp with milliseconds (cached per millisecond)."""
+    global _ts_cache
+    now = time.time()
+    ms = int(now * 1000)
+    if ms != _ts_cache[0]:
+        _ts_cache = (ms, time.strftime("%Y%m%d-%H:%M:%S", time.gmtime(now)) + ".%03d" % (ms % 1000))
+    return _ts_cache[1]
+
+
+class FixSession:
+    """
+    One FIX session between sender_comp_id and target_comp_id.
+
+    Sequence numbers and the resend store survive reconnects of the same
+    FixSession object. on_message(session, msg) is called synchronously for
+    every in-sequence application message and must not block.
+    """
+
+    def __init__(self, sender_comp_id: str, target_comp_id: str, fix_version: Optional[str] = None,
+                 heartbeat_interval: int = 30, on_message: Optional[MessageHandler] = None,
+                 validate_outbound: bool = True, validate_inbound: bool = False,
+                 reset_on_logon: bool = False, store_size: int = 100_000,
+                 journal: Optional[Journal] = None):
+        self.sender_comp_id = sender_comp_id
+        self.target_comp_id = target_comp_id
+        self.fix_version = fix_version
+        self.begin_string = begin_string_for(fix_version)
+        self.heartbeat_interval = heartbeat_interval
+        self.on_message = on_message
+        self.validate_outbound = validate_outbound
+        self.validate_inbound = validate_inbound
+        self.reset_on_logon = reset_on_logon
+        self.store_size = store_size
+        self.journal = journal
+
+        self.state = DISCONNECTED
+        self.next_out_seq = 1
+        self.next_in_seq = 1
+        if journal is not None:
+            journal.start_background_sync()
+            self.next_out_seq = journal.last_seq(session_name(sender_comp_id, target_comp_id)) + 1
+            self.next_in_seq = journal.last_seq(session_name(target_comp_id, sender_comp_id)) + 1
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.bad_checksums = 0
+        self._builder = FixBuilder(self.begin_string, {"49": sender_comp_id, "56": target_comp_id})
+        self._registry = SpecsRegistry(fix_version)
+        # seq -> (msg_type, fields, original SendingTime) for resends
+        self._store: "OrderedDict[int, Tuple[str, List[Tuple[str, Any]], str]]" = OrderedDict()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: List[bytes] = []
+        self._flush_scheduled = False
+        self._last_sent = 0.0
+        self._last_received = 0.0
+        self._test_request_id: Optional[str] = None
+        self._test_request_sent = 0.0
+        self._resend_target = 0
+        self._logged_on = asyncio.Event()
+        self._closed = asyncio.Event()
+
+    # -- sending -----------------------------------------------------------
+
+    def send(self, msg_type: str, fields: Any, validate: Optional[bool] = None) -> int:
+        """
+        Queue an application message; returns its MsgSeqNum.
+
+        fields is a dict or (tag, value) pairs. With validation on (the default
+        when the MsgType has a spec) a failing message raises SessionError and
+        consumes no sequence number.
+        """
+        if self.state not in (ACTIVE, LOGON_SENT):
+            raise SessionError(f"Session {self.sender_comp_id}->{self.target_comp_id} is not logged on")
+        msg_type = str(msg_type)
+        items = [(str(k), v) for k, v in (fields.items() if isinstance(fields, dict) else fields)
+                 if str(k) not in _SESSION_TAGS]
+        if (self.validate_outbound if validate is None else validate) and self._registry.get_validator(msg_type):
+            payload = dict(items)
+            payload["35"] = msg_type
+            result = validate_fix(msg_type, payload, fix_version=self.fix_version)
+            if not result["ok"]:
+                raise SessionError("; ".join(result["errors"]))
+        return self._send(msg_type, items)
+
+    def _send(self, msg_type: str, items: List[Tuple[str, Any]]) -> int:
+        seq = self.next_out_seq
+        self.next_out_seq += 1
+        sending_time = utc_timestamp()
+        if msg_type not in ADMIN_MSG_TYPES:
+            self._store[seq] = (msg_type, items, sending_time)
+            if len(self._store) > self.store_size:
+                self._store.popitem(last=False)
+        data = self._builder.build(msg_type, [("34", seq), ("52", sending_time)] + items)
+        if self.journal is not None:
+            self.journal.append(data)
+        self._queue(data)
+        return seq
+
+    def _send_possdup(self, seq: int, msg_type: str, items: List[Tuple[str, Any]], orig_time: str) -> None:
+        header = [("34", seq), ("43", "Y"), ("52", utc_timestamp()), ("122", orig_time)]
+        self._queue(self._builder.build(msg_type, header + items))
+
+    def _queue(self, data: bytes) -> None:
+        self._pending.append(data)
+        self.messages_sent += 1
+        self._last_sent = time.monotonic()
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if self._pending and self._writer is not None and not self._writer.is_closing():
+            self._writer.write(b"".join(self._pending))
+        self._pending.clear()
+
+    async def drain(self) -> None:
+        """Write queued messages, wait for the transport buffer to drain (backpressure) and yield to the loop."""
+        self._flush()
+        if self._writer is not None:
+            await self._writer.drain()
+        await asyncio.sleep(0)
+
+    # -- admin messages ----------------------------------------------------
+
+    def _send_logon(self) -> None:
+        items: List[Tuple[str, Any]] = [("98", 0), ("108", self.heartbeat_interval)]
+        if self.reset_on_logon:
+            items.append(("141", "Y"))
+        self._send("A", items)
+
+    def send_heartbeat(self, test_req_id: Optional[str] = None) -> None:
+        """Send a Heartbeat, echoing TestReqID(112) when answering a TestRequest."""
+        self._send("0", [("112", test_req_id)] if test_req_id else [])
+
+    def send_test_request(self) -> str:
+        """Send a TestRequest; returns its TestReqID."""
+        self._test_request_id = f"TEST-{self.next_out_seq}"
+        self._test_request_sent = time.monotonic()
+        self._send("1", [("112", self._test_request_id)])
+        return self._test_request_id
+
+    def _send_reject(self, ref_seq: int, ref_msg_type: str, reason: str, text: str) -> None:
+        """Session-level Reject with SessionRejectReason(373)."""
+        self._send("3", [("45", ref_seq), ("372", ref_msg_type), ("373", reason), ("58", text[:200])])
+
+    def _send_business_reject(self, ref_seq: int, ref_msg_type: str, reason: str, text: str) -> None:
+        """BusinessMessageReject with BusinessRejectReason(380)."""
+        self._send("j", [("45", ref_seq), ("372", ref_msg_type), ("380", reason), ("58", text[:200])])
+
+    async def logout(self, text: Optional[str] = None, timeout: float = 2.0) -> None:
+        """Send Logout and wait (up to timeout) for the counterparty to confirm and disconnect."""
+        if self.state in (ACTIVE, LOGON_SENT):
+            self.state = LOGOUT_SENT
+            self._send("5", [("58", text)] if text else [])
+            await self.drain()
+            try:
+                await asyncio.wait_for(self._closed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.close()
+
+    def close(self) -> None:
+        """Drop the connection without a Logout."""
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+        self.state = DISCONNECTED
+
+    # -- session loop ------------------------------------------------------
+
+    async def wait_logged_on(self, timeout: Optional[float] = None) -> None:
+        """Wait until the Logon handshake completes."""
+        await asyncio.wait_for(self._logged_on.wait(), timeout)
+
+    async def run(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                  initiate: bool = False, initial: bytes = b"") -> None:
+        """Drive the session over a connection until it closes; initiate sends the Logon."""
+        self._writer = writer
+        self._logged_on.clear()
+        self._closed.clear()
+        self._test_request_id = None
+        self._resend_target = 0
+        self._last_received = time.monotonic()
+        if initiate:
+            if self.reset_on_logon:
+                self.next_out_seq = self.next_in_seq = 1
+                self._store.clear()
+            self.state = LOGON_SENT
+            self._send_logon()
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        buf = bytearray(initial)
+        try:
+            while True:
+                pos, end = 0, len(buf)
+                while pos < end:
+                    start, stop, sep = find_frame(buf, pos, end, _MAX_MESSAGE_SIZE)
+                    if start == -1:
+                        pos = max(pos, end - 4)   # keep a possible partial "8=FIX"
+                        break
+                    if stop == -1:
+                        pos = start
+                        break
+                    if checksum_ok(buf, start, stop, sep):
+                        self._on_message(parse_message(bytes(buf[start:stop])))
+                    else:
+                        # garbled: dropped unprocessed, its MsgSeqNum is recovered by gap fill
+                        self.bad_checksums += 1
+                        logger.warning(f"FIX session {self.sender_comp_id}->{self.target_comp_id}: dropped message with bad CheckSum")
+                    pos = stop
+                del buf[:pos]
+                if self.state == DISCONNECTED:
+                    break
+                data = await reader.read(_READ_SIZE)
+                if not data:
+                    break
+                buf += data
+        except SessionError as e:
+            logger.warning(f"FIX session {self.sender_comp_id}->{self.target_comp_id}: {e}")
+            if self.state in (ACTIVE, LOGON_SENT):
+                self._send("5", [("58", str(e))])
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            heartbeat.cancel()
+            self.close()
+            self._closed.set()
+
+    async def _heartbeat_loop(self) -> None:
+        interval = self.heartbeat_interval
+        tick = min(1.0, interval / 2) if interval > 0 else 1.0
+        while True:
+            await asyncio.sleep(tick)
+            if self.state != ACTIVE or interval <= 0:
+                continue
+            now = time.monotonic()
+            if now - self._last_sent >= interval:
+                self.send_heartbeat()
+            silent = now - self._last_received
+            if self._test_request_id is not None:
+                if now - self._test_request_sent >= interval:
+                    logger.warning(f"FIX session {self.sender_comp_id}->{self.target_comp_id}: TestRequest unanswered")
+                    self.close()
+                    return
+            elif silent >= interval * 1.2:
+                self.send_test_request()
+
+    # -- inbound -----------------------------------------------------------
+
+    def _on_message(self, msg: FixMessage) -> None:
+        self.messages_received += 1
+        self._last_received = time.monotonic()
+        msg_type = msg.msg_type or ""
+        try:
+            seq = int(msg.get(34, "0"))
+        except ValueError:
+            raise SessionError("Invalid MsgSeqNum(34)")
+
+        if msg.get(56) not in (None, self.sender_comp_id):
+            raise SessionError(f"TargetCompID(56) {msg.get(56)} does not match {self.sender_comp_id}")
+        if msg_type == "A" and msg.get(141) == "Y":
+            self.next_in_seq = seq
+            if self.state != LOGON_SENT:
+                # counterparty reset: our side restarts at 1 as well
+                self.next_out_seq = 1
+                self._store.clear()
+        if msg_type == "4" and msg.get(123) != "Y":
+            self._on_sequence_reset(msg)
+            return
+
+        if seq > self.next_in_seq:
+            if msg_type == "A":
+                self._on_logon(msg)
+            elif msg_type == "5":
+                self._on_logout(msg)
+                return
+            elif msg_type == "2":
+                self._on_resend_request(msg)
+            if self._resend_target == 0:
+                self._send("2", [("7", self.next_in_seq), ("16", 0)])
+            self._resend_target = max(self._resend_target, seq)
+            return
+        if seq < self.next_in_seq:
+            if msg.get(43) == "Y":
+                return
+            raise SessionError(f"MsgSeqNum too low, expecting {self.next_in_seq} but received {seq}")
+
+        self.next_in_seq = seq + 1
+        if self.journal is not None:
+            self.journal.append(msg.buf, msg)
+        if self._resend_target and self.next_in_seq > self._resend_target:
+            self._resend_target = 0
+        if msg_type in ADMIN_MSG_TYPES:
+            self._on_admin(msg_type, msg)
+            return
+        if self.state != ACTIVE:
+            raise SessionError(f"Application message {msg_type} before Logon")
+        validator = self._registry.get_validator(msg_type) if self.validate_inbound else None
+        if validator is not None:
+            payload = msg.to_dict()
+            result = validate_fix(msg_type, payload, fix_version=self.fix_version)
+            if not result["ok"]:
+                self._reject_invalid(seq, msg_type, validator.validate_spec(payload), result["errors"])
+                return
+        if self.on_message is not None:
+            self.on_message(self, msg)
+
+    def _reject_invalid(self, seq: int, msg_type: str, spec_errors: List[str], errors: List[str]) -> None:
+        """
+        Reject an application message that failed validate_fix.
+
+        A message the message spec rejects is malformed and gets a session
+        Reject (373: 1 required tag missing, 5 value incorrect); one that only
+        fails rules.json or order-context checks gets a BusinessMessageReject
+        (380: 5 conditionally required field missing, 0 other).
+        """
+        if spec_errors:
+            reason = "1" if any(e.startswith("Missing required") for e in spec_errors) else "5"
+            self._send_reject(seq, msg_type, reason, "; ".join(spec_errors))
+        else:
+            reason = "5" if any(e.startswith("Missing required") for e in errors) else "0"
+            self._send_business_reject(seq, msg_type, reason, "; ".join(errors))
+
+    def _on_admin(self, msg_type: str, msg: FixMessage) -> None:
+        if msg_type == "0":
+            if self._test_request_id is not None and msg.get(112) == self._test_request_id:
+                self._test_request_id = None
+        elif msg_type == "1":
+            self.send_heartbeat(msg.get(112))
+        elif msg_type == "2":
+            self._on_resend_request(msg)
+        elif msg_type == "4":
+            self._on_sequence_reset(msg)
+        elif msg_type == "5":
+            self._on_logout(msg)
+        elif msg_type == "A":
+            self._on_logon(msg)
+        elif msg_type == "3":
+            logger.warning(f"FIX session {self.sender_comp_id}->{self.target_comp_id}: Reject for seq {msg.get(45)}: {msg.get(58)}")
+
+    def _on_logon(self, msg: FixMessage) -> None:
+        if self.state == LOGON_SENT:
+            self.state = ACTIVE
+        elif self.state == DISCONNECTED:
+            # acceptor side: answer with our Logon using the counterparty's interval
+            self.heartbeat_interval = int(msg.get(108, self.heartbeat_interval))
+            self.reset_on_logon = msg.get(141) == "Y"
+            self.state = ACTIVE
+            self._send_logon()
+        self._logged_on.set()
+
+    def _on_logout(self, msg: FixMessage) -> None:
+        if self.state != LOGOUT_SENT:
+            self._send("5", [])
+        self._flush()
+        self.state = DISCONNECTED
+
+    def _on_sequence_reset(self, msg: FixMessage) -> None:
+        new_seq = int(msg.get(36, "0"))
+        if new_seq < self.next_in_seq and msg.get(123) != "Y":
+            raise SessionError(f"SequenceReset NewSeqNo {new_seq} below expected {self.next_in_seq}")
+        if new_seq > self.next_in_seq:
+            self.next_in_seq = new_seq
+        if self._resend_target and self.next_in_seq > self._resend_target:
+            self._resend_target = 0
+
+    def _on_resend_request(self, msg: FixMessage) -> None:
+        begin = int(msg.get(7, "1"))
+        end = int(msg.get(16, "0"))
+        last = self.next_out_seq - 1
+        if end == 0 or end > last:
+            end = last
+        gap_start = None
+        journaled = None
+        for seq in range(begin, end + 1):
+            stored = self._store.get(seq)
+            if stored is None and self.journal is not None:
+                if journaled is None:
+                    journaled = self._journaled(begin, end)
+                stored = journaled.get(seq)
+            if stored is None:
+                if gap_start is None:
+                    gap_start = seq
+                continue
+            if gap_start is not None:
+                self._send_gap_fill(gap_start, seq)
+                gap_start = None
+            self._send_possdup(seq, *stored)
+        if gap_start is not None:
+            self._send_gap_fill(gap_start, end + 1)
+
+    def _journaled(self, begin: int, end: int) -> Dict[int, Tuple[str, List[Tuple[str, Any]], str]]:
+        """Application messages begin..end we sent, read back from the journal in the resend store's shape."""
+        out = {}
+        for seq, raw in self.journal.read_range(session_name(self.sender_comp_id, self.target_comp_id), begin, end):
+            msg = parse_message(raw)
+            msg_type = msg.msg_type or ""
+            if msg_type not in ADMIN_MSG_TYPES:
+                out[seq] = (msg_type, [(t, v) for t, v in msg.items() if t not in _SESSION_TAGS], msg.get(52, ""))
+        return out
+
+    def _send_gap_fill(self, seq: int, new_seq: int) -> None:
+        header = [("34", seq), ("43", "Y"), ("52", utc_timestamp()), ("123", "Y"), ("36", new_seq)]
+        self._queue(self._builder.build("4", header))
+
+
+class FixAcceptor:
+    """
+    TCP acceptor: each inbound Logon is bound to a FixSession keyed by the
+    counterparty's SenderCompID (created on first Logon, reused on reconnect).
+    """
+
+    def __init__(self, sender_comp_id: str, host: str = "0.0.0.0", port: int = 9878,
+                 fix_version: Optional[str] = None, on_message: Optional[MessageHandler] = None,
+                 allowed_counterparties: Optional[List[str]] = None, **session_kwargs: Any):
+        self.sender_comp_id = sender_comp_id
+        self.host = host
+        self.port = port
+        self.fix_version = fix_version
+        self.on_message = on_message
+        self.allowed_counterparties = set(allowed_counterparties) if allowed_counterparties else None
+        self.session_kwargs = session_kwargs
+        self.sessions: Dict[str, FixSession] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """Start listening (port 0 picks a free port, reflected in self.port)."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Log out every active session and stop listening."""
+        await asyncio.gather(*(s.logout("Acceptor shutting down") for s in self.sessions.values()
+                               if s.state == ACTIVE))
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        buf = bytearray()
+        try:
+            while True:
+                start, stop, _ = find_frame(buf, 0, len(buf), _MAX_MESSAGE_SIZE)
+                if stop != -1:
+                    break
+                data = await reader.read(_READ_SIZE)
+                if not data or len(buf) > _MAX_MESSAGE_SIZE:
+                    writer.close()
+                    return
+                buf += data
+            first = parse_message(bytes(buf[start:stop]))
+            counterparty = first.get(49)
+            if (first.msg_type != "A" or not counterparty
+                    or (self.allowed_counterparties is not None and counterparty not in self.allowed_counterparties)):
+                logger.warning(f"FIX acceptor: rejecting connection (first message {first.msg_type} from {counterparty})")
+                writer.close()
+                return
+            session = self.sessions.get(counterparty)
+            if session is None:
+                session = self.sessions[counterparty] = FixSession(
+                    self.sender_comp_id, counterparty, self.fix_version,
+                    on_message=self.on_message, **self.session_kwargs)
+            elif session.state != DISCONNECTED:
+                logger.warning(f"FIX acceptor: {counterparty} already logged on")
+                writer.close()
+                return
+            await session.run(reader, writer, initiate=False, initial=bytes(buf[start:]))
+        except ConnectionError:
+            writer.close()
+
+
+class FixInitiator:
+    """TCP initiator for one session; connect() returns once the Logon handshake completes."""
+
+    def __init__(self, sender_comp_id: str, target_comp_id: str, host: str, port: int,
+                 fix_version: Optional[str] = None, on_message: Optional[MessageHandler] = None,
+                 **session_kwargs: Any):
+        self.host = host
+        self.port = port
+        self.session = FixSession(sender_comp_id, target_comp_id, fix_version,
+                                  on_message=on_message, **session_kwargs)
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self, timeout: float = 10.0) -> FixSession:
+        """Open the connection, log on, and return the session."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        self._task = asyncio.create_task(self.session.run(reader, writer, initiate=True))
+        await self.session.wait_logged_on(timeout)
+        return self.session
+
+    async def close(self) -> None:
+        """Log out and wait for the session loop to finish."""
+        await self.session.logout()
+        if self._task is not None:
+            await self._task
@@ -10,6 +10,41 @@ APP_NAME = os.getenv("APP_NAME", "fix-api")
 DEFAULT_FIX_VERSION = os.getenv("DEFAULT_FIX_VERSION", "4.4")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# Bulk validation (0 workers = one per CPU)
+BULK_WORKERS = int(os.getenv("BULK_WORKERS", "0"))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "2000"))
+BULK_COLUMNAR = os.getenv("BULK_COLUMNAR", "0") == "1"  # validate chunks column-wise (numpy)
+
+# Engine execution: "thread", "process" or "inline"; in-flight work is capped at
+# workers + queue and excess requests get 503 with Retry-After (0 workers = one per CPU)
+ENGINE_EXECUTOR = os.getenv("ENGINE_EXECUTOR", "thread")
+ENGINE_WORKERS = int(os.getenv("ENGINE_WORKERS", "0"))
+ENGINE_MAX_QUEUE = int(os.getenv("ENGINE_MAX_QUEUE", "64"))
+ENGINE_RETRY_AFTER = int(os.getenv("ENGINE_RETRY_AFTER", "1"))
+
+# WebSocket sessions (/fix/ws): commands running per connection before reads pause
+WS_MAX_INFLIGHT = int(os.getenv("FIX_WS_MAX_INFLIGHT", "256"))
+
+# Spec hot reload: poll the spec sources every N seconds (0 = only POST /specs/reload)
+SPECS_WATCH_INTERVAL = float(os.getenv("FIX_SPECS_WATCH_INTERVAL", "0"))
+
+# FIX journal: segment roll size, and fsync every N appends or N seconds (0 disables either trigger)
+JOURNAL_SEGMENT_MB = int(os.getenv("FIX_JOURNAL_SEGMENT_MB", "256"))
+JOURNAL_FSYNC_EVERY = int(os.getenv("FIX_JOURNAL_FSYNC_EVERY", "1000"))
+JOURNAL_FSYNC_INTERVAL = float(os.getenv("FIX_JOURNAL_FSYNC_INTERVAL", "0.1"))
+
+# Request profiling (cProfile): FIX_PROFILE_REQUESTS=1 honours ?profile=1 / X-Fix-Profile: 1 per request;
+# a sample rate > 0 profiles that fraction of requests into rotating pstats files under FIX_PROFILE_DIR
+# (one file per FIX_PROFILE_FLUSH_EVERY samples, newest FIX_PROFILE_KEEP files kept)
+PROFILE_REQUESTS = os.getenv("FIX_PROFILE_REQUESTS", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("FIX_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("FIX_PROFILE_DIR", "profiles")
+PROFILE_FLUSH_EVERY = int(os.getenv("FIX_PROFILE_FLUSH_EVERY", "1000"))
+PROFILE_KEEP = int(os.getenv("FIX_PROFILE_KEEP", "20"))
+
+# Metrics (Prometheus /metrics); 0 disables collection
+METRICS_ENABLED = os.getenv("FIX_METRICS", "1") != "0"
+
 # FIX version support
-FixVersion = Literal["4.4"]  # Prepare for future versions
+FixVersion = Literal["4.2", "4.4", "5.0SP2"]  # each needs a specs/fix{version} tree
 Delimiter = Literal["|"]     # Clients send | only; server converts to SOH internally
@@ -0,0 +1,123 @@
+"""
+Synthetic FIX Order Flow
+
+Deterministic generators of realistic D/F/G/8 traffic for benchmarks, load
+tests and demos. Each order goes through New -> (partial fills) -> optional
+Cancel/Replace -> fill or cancel, with consistent ClOrdID chains, OrderIDs and
+CumQty/LeavesQty/AvgPx on every ExecutionReport.
+"""
+
+import random
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .fix_engine import begin_string_for, get_builder
+
+SYMBOLS = ("AAPL", "MSFT", "AMZN", "GOOG", "META", "NVDA", "TSLA", "JPM", "XOM", "KO")
+_TRANSACT_TIME = "20250101-14:30:00.000"
+
+Message = Tuple[str, Dict[str, str]]
+
+
+def _px(value: float) -> str:
+    return f"{value:.2f}"
+
+
+def _qty(value: float) -> str:
+    return str(int(value))
+
+
+def order_flow(n_orders: int, seed: int = 0, symbols: Tuple[str, ...] = SYMBOLS) -> Iterator[Message]:
+    """Yield (msg_type, fields) for n_orders complete order lifecycles, interleaved as they would be on the wire."""
+    rng = random.Random(seed)
+    live: List[dict] = []
+    exec_seq = 0
+    started = 0
+
+    def report(o: dict, exec_type: str, ord_status: str, last_qty: float = 0.0, last_px: float = 0.0) -> Message:
+        nonlocal exec_seq
+        exec_seq += 1
+        if last_qty:
+            o["avg_px"] = (o["avg_px"] * o["cum"] + last_px * last_qty) / (o["cum"] + last_qty)
+            o["cum"] += last_qty
+        leaves = 0.0 if ord_status in ("2", "4", "8") else o["qty"] - o["cum"]
+        # ExecType 1 (Partial fill) / F (Fill) / 5 (Replaced) / 4 (Canceled) follow the engine's order_state.json
+        fields = {
+            "37": o["order_id"], "11": o["cl"], "17": f"E{exec_seq}", "150": exec_type, "39": ord_status,
+            "55": o["symbol"], "54": o["side"], "38": _qty(o["qty"]), "40": o["ord_type"],
+            "32": _qty(last_qty), "31": _px(last_px), "14": _qty(o["cum"]), "151": _qty(leaves),
+            "6": f"{o['avg_px']:.6f}", "60": _TRANSACT_TIME,
+        }
+        if o["ord_type"] == "2":
+            fields["44"] = _px(o["px"])
+        if o.get("orig_cl"):
+            fields["41"] = o["orig_cl"]
+        return "8", fields
+
+    while started < n_orders or live:
+        if started < n_orders and (not live or rng.random() < 0.35):
+            started += 1
+            o = {
+                "cl": f"C{seed}-{started}", "order_id": f"O{seed}-{started}", "symbol": rng.choice(symbols),
+                "side": rng.choice("12"), "qty": float(rng.choice((100, 200, 500, 1000, 2500))),
+                "ord_type": "2" if rng.random() < 0.8 else "1", "px": round(rng.uniform(20, 500), 2),
+                "cum": 0.0, "avg_px": 0.0, "replaces": 0,
+            }
+            fields = {"11": o["cl"], "55": o["symbol"], "54": o["side"], "38": _qty(o["qty"]),
+                      "40": o["ord_type"], "59": "0", "60": _TRANSACT_TIME}
+            if o["ord_type"] == "2":
+                fields["44"] = _px(o["px"])
+            yield "D", fields
+            yield report(o, "0", "0")
+            live.append(o)
+            continue
+
+        o = rng.choice(live)
+        roll = rng.random()
+        leaves = o["qty"] - o["cum"]
+        if roll < 0.6:
+            last = min(leaves, float(rng.choice((50, 100, 200, 500))))
+            last_px = o["px"] + rng.uniform(-0.05, 0.05)
+            done = last >= leaves
+            yield report(o, "F" if done else "1", "2" if done else "1", last, round(last_px, 2))
+            if done:
+                live.remove(o)
+        elif roll < 0.8 and o["replaces"] < 2 and o["ord_type"] == "2":
+            new_cl = f"{o['cl'].split('/')[0]}/R{o['replaces'] + 1}"
+            px = round(o["px"] * rng.uniform(0.99, 1.01), 2)
+            # a replace must change something (R-004)
+            o["px"] = px if px != o["px"] else round(px + 0.01, 2)
+            yield "G", {"41": o["cl"], "11": new_cl, "55": o["symbol"], "54": o["side"], "38": _qty(o["qty"]),
+                        "40": "2", "44": _px(o["px"]), "59": "0", "60": _TRANSACT_TIME}
+            o["orig_cl"], o["cl"] = o["cl"], new_cl
+            o["replaces"] += 1
+            yield report(o, "5", "5")
+        else:
+            new_cl = f"{o['cl'].split('/')[0]}/X"
+            yield "F", {"41": o["cl"], "11": new_cl, "55": o["symbol"], "54": o["side"],
+                        "38": _qty(o["qty"]), "60": _TRANSACT_TIME}
+            o["orig_cl"], o["cl"] = o["cl"], new_cl
+            yield report(o, "4", "4")
+            live.remove(o)
+
+
+def message_mix(n_messages: int, seed: int = 0) -> List[Message]:
+    """Exactly n_messages (msg_type, fields) pairs from order_flow."""
+    out: List[Message] = []
+    flow = order_flow(n_messages, seed)
+    for msg in flow:
+        out.append(msg)
+        if len(out) == n_messages:
+            break
+    return out
+
+
+def raw_messages(messages: List[Message], fix_version: Optional[str] = None, delimiter: str = "\x01",
+                 sender: str = "BUY", target: str = "SELL") -> List[str]:
+    """Wire-format messages with a session header (49/56/34/52), BodyLength and CheckSum."""
+    builder = get_builder(begin_string_for(fix_version))
+    out = []
+    for seq, (msg_type, fields) in enumerate(messages, 1):
+        header = [("49", sender), ("56", target), ("34", seq), ("52", _TRANSACT_TIME)]
+        raw = builder.build(msg_type, header + list(fields.items())).decode()
+        out.append(raw if delimiter == "\x01" else raw.replace("\x01", delimiter))
+    return out
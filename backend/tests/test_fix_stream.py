@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+from backend.fix_stream import FixStreamReader, find_frame
+from backend.synthetic import message_mix, raw_messages
+
+GOOD = [m.encode() for m in raw_messages(message_mix(4))]
+# BodyLength claims far more bytes than follow before the next message
+BOGUS = b"8=FIX.4.4\x019=5000\x0135=D\x01"
+
+
+def _frames(data, mode, chunk_size=1 << 20):
+    if mode == "path":
+        return list(FixStreamReader(data).frames())
+    return list(FixStreamReader(io.BytesIO(data), chunk_size=chunk_size).frames())
+
+
+@pytest.fixture(params=["path", "stream", "stream-small-chunks"])
+def read(request, tmp_path):
+    def run(data):
+        if request.param == "path":
+            path = tmp_path / "session.log"
+            path.write_bytes(data)
+            return _frames(str(path), "path")
+        return _frames(data, "stream", 16 if request.param == "stream-small-chunks" else 1 << 20)
+    return run
+
+
+def test_corrupt_body_length_does_not_drop_later_messages(read):
+    data = GOOD[0] + BOGUS + b"".join(GOOD[1:])
+    assert read(data) == GOOD
+
+
+def test_torn_tail_is_dropped(read):
+    data = b"".join(GOOD) + GOOD[0][:-10]
+    assert read(data) == GOOD
+
+
+def test_incomplete_frame_waits_without_a_later_message():
+    buf = GOOD[0][:-5]
+    assert find_frame(buf, 0, len(buf)) == (0, -1, b"")
+    assert find_frame(buf, 0, len(buf), eof=True) == (-1, -1, b"")
+
+
+def test_incomplete_frame_gives_way_to_a_later_complete_one():
+    buf = BOGUS + GOOD[1]
+    start, stop, _ = find_frame(buf, 0, len(buf))
+    assert buf[start:stop] == GOOD[1]
@@ -0,0 +1,90 @@
+import asyncio
+import io
+
+from backend.fix_engine import FixBuilder, begin_string_for, parse_message
+from backend.fix_stream import FixStreamReader
+from backend.session import FixSession
+
+BUY = FixBuilder(begin_string_for(None), {"49": "BUY", "56": "SELL"})
+ORDER = [("11", "A1"), ("55", "AAPL"), ("54", "1"), ("38", "100"), ("40", "1"), ("60", "20250101-14:30:00.000")]
+
+
+def _msg(msg_type, seq, items=()):
+    return BUY.build(msg_type, [("34", seq), ("52", "20250101-14:30:00.000")] + list(items))
+
+
+class _Writer:
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    def is_closing(self):
+        return False
+
+    def close(self):
+        pass
+
+    async def drain(self):
+        pass
+
+    def sent(self):
+        return [parse_message(f) for f in FixStreamReader(io.BytesIO(bytes(self.data))).frames()]
+
+
+def _run(chunks, **kwargs):
+    """Run an acceptor-side session on chunks (the first holds the Logon) without EOF; returns (session, delivered, writer)."""
+    delivered = []
+
+    async def main():
+        session = FixSession("SELL", "BUY", on_message=lambda s, m: delivered.append(m), **kwargs)
+        reader, writer = asyncio.StreamReader(), _Writer()
+        task = asyncio.create_task(session.run(reader, writer, initial=chunks[0]))
+        for chunk in chunks[1:]:
+            reader.feed_data(chunk)
+            await asyncio.sleep(0.01)
+        session._flush()
+        reader.feed_eof()
+        await task
+        return session, writer
+
+    session, writer = asyncio.run(main())
+    return session, delivered, writer
+
+
+def test_corrupt_body_length_does_not_stall_later_messages():
+    bogus = b"8=FIX.4.4\x019=5000\x0135=D\x01"
+    session, delivered, _ = _run([_msg("A", 1, [("98", 0), ("108", 30)]), _msg("D", 2, ORDER), bogus,
+                                  _msg("D", 3, ORDER)])
+    assert [m.get(34) for m in delivered] == ["2", "3"]
+    assert session.next_in_seq == 4
+
+
+def test_bad_checksum_is_dropped_without_consuming_the_sequence_number():
+    good = _msg("D", 2, ORDER)
+    garbled = good[:-4] + (b"%03d" % ((int(good[-4:-1]) + 1) % 256)) + b"\x01"
+    session, delivered, _ = _run([_msg("A", 1, [("98", 0), ("108", 30)]), garbled])
+    assert delivered == []
+    assert session.bad_checksums == 1
+    assert session.next_in_seq == 2
+
+
+def test_failed_business_rule_gets_business_message_reject():
+    # passes the message spec; R-001 wants StopPx(99) for a Stop order
+    stop_without_stop_px = [(t, "3" if t == "40" else v) for t, v in ORDER]
+    _, delivered, writer = _run([_msg("A", 1, [("98", 0), ("108", 30)]), _msg("D", 2, stop_without_stop_px)],
+                                validate_inbound=True)
+    assert delivered == []
+    reject = [m for m in writer.sent() if m.msg_type == "j"]
+    assert len(reject) == 1
+    assert (reject[0].get(45), reject[0].get(372), reject[0].get(380)) == ("2", "D", "5")
+
+
+def test_malformed_message_gets_session_reject():
+    missing_transact_time = [(t, v) for t, v in ORDER if t != "60"]
+    _, _, writer = _run([_msg("A", 1, [("98", 0), ("108", 30)]), _msg("D", 2, missing_transact_time)],
+                        validate_inbound=True)
+    reject = [m for m in writer.sent() if m.msg_type == "3"]
+    assert len(reject) == 1
+    assert (reject[0].get(45), reject[0].get(372), reject[0].get(373)) == ("2", "D", "1")
@@ -132,6 +132,37 @@ async function fixExplain(raw) {
     }
 }
 
+/**
+ * Validate many FIX messages in one request
+ * @param {string[]} raws - Raw FIX messages
+ * @returns {Promise<Object>} Response with per-message results ({index, result} or {index, error})
+ */
+async function fixValidateBatch(raws) {
+    try {
+        const headers = { 'Content-Type': 'application/json' };
+        
+        // Add bearer token if available
+        if (FIX_API_TOKEN) {
+            headers['Authorization'] = `Bearer ${FIX_API_TOKEN}`;
+        }
+        
+        const response = await fetch(`${FIX_API_BASE}/fix/validate/batch`, {
+            method: 'POST',
+            headers,
+            body: JSON.stringify({ messages: raws, delimiter: '|' })
+        });
+        
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.detail?.error?.message || `HTTP ${response.status}`);
+        }
+        
+        return await response.json();
+    } catch (error) {
+        throw new Error(`Validate batch failed: ${error.message}`);
+    }
+}
+
 /**
  * Look up FIX field information by tag
  * @param {string} tag - FIX tag number
@@ -165,6 +196,7 @@ export {
     fixBuild,
     fixParse,
     fixValidate,
+    fixValidateBatch,
     fixExplain,
     fixLookup
 };